@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Command-line interface for the cross-sectional volatility screener
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.analysis.volatility_screener import run_screener, DEFAULT_SCREENER_METRICS
+from src.database.metrics_snapshot import metrics_store, METRIC_COLUMNS
+from src.config import SCREENER_WORKERS, SCREENER_LOOKBACK_DAYS
+
+
+def print_page(page, columns):
+    """Print a screener page as a table."""
+    print(f"{'ticker':<8}" + ''.join(f"{col[:18]:>20}" for col in columns))
+    for row in page['rows']:
+        values = ''.join(f"{row[col]:>20.4f}" if row[col] is not None else f"{'-':>20}" for col in columns)
+        print(f"{row['ticker']:<8}{values}")
+
+
+def main():
+    """Main function for running and querying the screener via CLI."""
+    parser = argparse.ArgumentParser(description='Volatility screener over all stored tickers')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Compute metrics for every active ticker')
+    run_parser.add_argument('--metrics', default=','.join(DEFAULT_SCREENER_METRICS),
+                            help=f"Comma-separated metrics (available: {', '.join(METRIC_COLUMNS)})")
+    run_parser.add_argument('--lookback', type=int, default=SCREENER_LOOKBACK_DAYS,
+                            help='Trading days per ticker (0 for full history)')
+    run_parser.add_argument('--workers', type=int, default=SCREENER_WORKERS, help='Worker processes')
+    run_parser.add_argument('--tickers', help='Comma-separated subset of tickers')
+
+    top_parser = subparsers.add_parser('top', help='Show the latest screener results')
+    top_parser.add_argument('sort', nargs='?', default='annualized_volatility', help='Metric to sort by')
+    top_parser.add_argument('-n', type=int, default=20, help='Number of rows')
+    top_parser.add_argument('--asc', action='store_true', help='Lowest values first')
+    top_parser.add_argument('--sector', help='Only this sector')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'run':
+            print("📊 Running volatility screener...")
+            summary = run_screener(
+                metrics=[m.strip() for m in args.metrics.split(',') if m.strip()],
+                lookback_days=args.lookback or None,
+                workers=max(1, args.workers),
+                tickers=args.tickers.split(',') if args.tickers else None
+            )
+            print(f"✅ Stored {summary['tickers_stored']}/{summary['tickers_requested']} tickers "
+                  f"as of {summary['asof']} in {summary['time_ms'] / 1000:.1f}s")
+            return 0
+
+        page = metrics_store.load_page(sort_by=args.sort, order='asc' if args.asc else 'desc',
+                                       limit=args.n, sector=args.sector)
+        if page['asof'] is None:
+            print("⚠️ No screener snapshot yet. Run: python screener_cli.py run")
+            return 1
+
+        print(f"📈 Screener as of {page['asof']} ({page['total']} tickers)")
+        print("-" * 40)
+        columns = [args.sort] if args.sort in METRIC_COLUMNS else []
+        columns += [c for c in DEFAULT_SCREENER_METRICS if c not in columns]
+        print_page(page, columns)
+        return 0
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
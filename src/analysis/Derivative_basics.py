@@ -1,7 +1,103 @@
+import math
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
 from scipy.optimize import brentq
 
+from src.analysis.monte_carlo import price_european_mc
+
+
+SQRT_2 = math.sqrt(2.0)
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+SCALAR_TYPES = (float, int, np.number)
+
+
+def _greeks_from_terms(S, K, r, sigma, q, tau, sqrt_tau, d1, d2,
+                       N_d1, N_d2, N_minus_d1, N_minus_d2, N_prime_d1,
+                       div_discount, rate_discount):
+    """Prices and Greeks from the shared BSM terms (floats or arrays alike)."""
+    S_disc = S * div_discount
+    K_disc = K * rate_discount
+    sigma_sqrt_tau = sigma * sqrt_tau
+
+    vega = S_disc * sqrt_tau * N_prime_d1
+    theta_decay = -S_disc * N_prime_d1 * sigma / (2 * sqrt_tau)
+
+    return {
+        'd1': d1,
+        'd2': d2,
+        'call_price': S_disc * N_d1 - K_disc * N_d2,
+        'put_price': K_disc * N_minus_d2 - S_disc * N_minus_d1,
+        'call_delta': div_discount * N_d1,
+        'put_delta': -div_discount * N_minus_d1,
+        'gamma': div_discount * N_prime_d1 / (S * sigma_sqrt_tau),
+        'vega': vega,
+        'call_theta': theta_decay + q * S_disc * N_d1 - r * K_disc * N_d2,
+        'put_theta': theta_decay - q * S_disc * N_minus_d1 + r * K_disc * N_minus_d2,
+        'call_rho': K_disc * tau * N_d2,
+        'put_rho': -K_disc * tau * N_minus_d2,
+        'vanna': -div_discount * N_prime_d1 * d2 / sigma,
+        'volga': vega * d1 * d2 / sigma
+    }
+
+
+def _bsm_price_greeks_scalar(S, K, T, r, sigma, q, t):
+    """Fused scalar kernel on the math module (no array dispatch per operation)."""
+    tau = T - t
+    sqrt_tau = math.sqrt(tau)
+    sigma_sqrt_tau = sigma * sqrt_tau
+
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma * sigma) * tau) / sigma_sqrt_tau
+    d2 = d1 - sigma_sqrt_tau
+
+    # N(x) = erfc(-x / sqrt(2)) / 2 keeps full precision in both tails
+    N_d1 = 0.5 * math.erfc(-d1 / SQRT_2)
+    N_d2 = 0.5 * math.erfc(-d2 / SQRT_2)
+    N_minus_d1 = 0.5 * math.erfc(d1 / SQRT_2)
+    N_minus_d2 = 0.5 * math.erfc(d2 / SQRT_2)
+    N_prime_d1 = math.exp(-0.5 * d1 * d1) * INV_SQRT_2PI
+
+    return _greeks_from_terms(S, K, r, sigma, q, tau, sqrt_tau, d1, d2,
+                              N_d1, N_d2, N_minus_d1, N_minus_d2, N_prime_d1,
+                              math.exp(-q * tau), math.exp(-r * tau))
+
+
+def bsm_price_greeks(S, K, T, r, sigma, q=0.0, t=0.0):
+    """
+    Array-native Black-Scholes-Merton prices and Greeks for calls and puts.
+
+    All inputs broadcast against each other, so a whole chain or scenario grid
+    is priced in one call. d1, d2, N(±d1), N(±d2), N'(d1) and the discount
+    factors are computed once and shared by every output. The normal CDF is
+    scipy.special.ndtr; all-scalar inputs take a fused math-module kernel
+    and return floats.
+
+    Returns:
+        dict of arrays (floats for scalar inputs): d1, d2, call_price, put_price,
+        call_delta, put_delta, gamma, vega, call_theta, put_theta, call_rho,
+        put_rho, vanna, volga
+    """
+    inputs = (S, K, T, r, sigma, q, t)
+    if all(isinstance(x, SCALAR_TYPES) for x in inputs):
+        return _bsm_price_greeks_scalar(*(float(x) for x in inputs))
+
+    S, K, T, r, sigma, q, t = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in inputs))
+
+    tau = T - t
+    sqrt_tau = np.sqrt(tau)
+    sigma_sqrt_tau = sigma * sqrt_tau
+
+    d1 = (np.log(S / K) + (r - q + (sigma ** 2) / 2) * tau) / sigma_sqrt_tau
+    d2 = d1 - sigma_sqrt_tau
+
+    N_d1, N_d2 = ndtr(d1), ndtr(d2)
+    N_minus_d1, N_minus_d2 = ndtr(-d1), ndtr(-d2)
+    N_prime_d1 = np.exp((-d1 ** 2) / 2) * INV_SQRT_2PI
+
+    return _greeks_from_terms(S, K, r, sigma, q, tau, sqrt_tau, d1, d2,
+                              N_d1, N_d2, N_minus_d1, N_minus_d2, N_prime_d1,
+                              np.exp(-q * tau), np.exp(-r * tau))
+
 
 class VIII_Solvers:
     def __init__(self,S0 = None,K = None,T = None,r = None,sigma = None,n_sim = 0,t = 0, q = 0):
@@ -15,32 +111,38 @@ class VIII_Solvers:
         self.q = q  # Continuous dividend yield
         return
 
-    def mc_call(self):
-        random_vals = np.random.normal(0, 1, self.n_sim, )
+    def mc_price(self, rng=None, seed=None, workers=1, executor='thread',
+                 time_budget=None, target_error=None, generator='pseudo'):
+        """
+        Monte Carlo call and put prices from one shared simulation.
 
-        shock = self.sigma * np.sqrt(self.T) * random_vals
-        drift = (self.r - self.q - (self.sigma ** 2) / 2)
-        S_T = self.S0 * np.exp(drift * self.T + shock)
+        Uses antithetic and control variates, pseudo-random or scrambled Sobol
+        draws, and can split the paths across a worker pool; see price_european_mc.
 
-        call_payoff = np.maximum(S_T - self.K, 0)
-        call_price = np.average(call_payoff) * np.exp(-self.r * self.T)
+        Returns:
+            dict with call_price, put_price, call_stderr, put_stderr, n_paths and seed
+        """
+        return price_european_mc(self.S0, self.K, self.T - self.t, self.r, self.sigma, self.q,
+                                 n_sim=self.n_sim, rng=rng, seed=seed, workers=workers,
+                                 executor=executor, time_budget=time_budget,
+                                 target_error=target_error, generator=generator)
 
-        return float(call_price)
+    def mc_call(self):
+        return self.mc_price()['call_price']
 
     def mc_put(self):
+        return self.mc_price()['put_price']
 
-        random_vals = np.random.normal(0, 1, self.n_sim, )
-
-        shock = self.sigma * np.sqrt(self.T) * random_vals
-        drift = (self.r - self.q - (self.sigma ** 2) / 2)
-
-        S_T = self.S0 * np.exp(drift * self.T + shock)
-
-        put_payoff = np.maximum(self.K - S_T, 0)
-
-        put_price = np.average(put_payoff) * np.exp(-self.r * self.T)
+    def price_and_greeks(self):
+        """
+        BSM prices plus first- and second-order Greeks for call and put in one pass.
 
-        return float(put_price)
+        Works for scalar or array attributes; scalars come back as floats.
+        """
+        results = bsm_price_greeks(self.S0, self.K, self.T, self.r, self.sigma, self.q, self.t)
+        if isinstance(next(iter(results.values())), float):
+            return results
+        return {name: float(value) if value.ndim == 0 else value for name, value in results.items()}
 
     def d1(self):
         d1 = (np.log(self.S0 / self.K) + (self.r - self.q + (self.sigma ** 2) / 2) * (self.T - self.t)) / (
@@ -55,14 +157,14 @@ class VIII_Solvers:
         d1 = self.d1()
         d2 = self.d2()
         tau = self.T - self.t
-        call_price = self.S0 * np.exp(-self.q * tau) * norm.cdf(d1) - self.K * np.exp(-self.r * tau) * norm.cdf(d2)
+        call_price = self.S0 * np.exp(-self.q * tau) * ndtr(d1) - self.K * np.exp(-self.r * tau) * ndtr(d2)
         return call_price
 
     def BSM_put(self):
         d1 = self.d1()
         d2 = self.d2()
         tau = self.T - self.t
-        put_price = self.K * np.exp(-self.r * tau) * norm.cdf(-d2) - self.S0 * np.exp(-self.q * tau) * norm.cdf(-d1)
+        put_price = self.K * np.exp(-self.r * tau) * ndtr(-d2) - self.S0 * np.exp(-self.q * tau) * ndtr(-d1)
         return put_price
 
     def objective(self,sigma,market_price):
@@ -85,7 +187,7 @@ class VIII_Solvers:
         """
         d1 = self.d1()
         tau = self.T - self.t
-        delta = np.exp(-self.q * tau) * norm.cdf(d1)
+        delta = np.exp(-self.q * tau) * ndtr(d1)
         return delta
 
     def call_gamma(self):
@@ -115,12 +217,12 @@ class VIII_Solvers:
         """
         tau = self.T - self.t
         d1 = self.d1()
-        d2 = self.d2()
+        d2 = d1 - self.sigma * np.sqrt(tau)
         N_prime_d1 = np.exp((-d1 ** 2) / 2) / np.sqrt(2 * np.pi)
 
         term1 = -np.exp(-self.q * tau) * self.S0 * N_prime_d1 * self.sigma / (2 * np.sqrt(tau))
-        term2 = self.q * self.S0 * np.exp(-self.q * tau) * norm.cdf(d1)
-        term3 = -self.r * self.K * np.exp(-self.r * tau) * norm.cdf(d2)
+        term2 = self.q * self.S0 * np.exp(-self.q * tau) * ndtr(d1)
+        term3 = -self.r * self.K * np.exp(-self.r * tau) * ndtr(d2)
 
         theta = term1 + term2 + term3
         return theta
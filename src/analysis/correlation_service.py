@@ -0,0 +1,361 @@
+"""
+Correlation Service Module
+Date-aligned log-return matrices for many tickers from one bulk read, and
+their covariance/correlation computed with matrix products: pairwise-
+complete sample estimates, Ledoit-Wolf shrinkage, EWMA and rolling windows.
+Results are cached by (universe, parameters, data version)
+"""
+
+import time
+import sqlite3
+import threading
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from src.config import (
+    DATABASE_PATH, CORRELATION_CACHE_SIZE, CORRELATION_MAX_TICKERS, CORRELATION_MAX_ROLLING_TICKERS
+)
+from src.database.price_reader import read_price_histories
+
+logger = logging.getLogger(__name__)
+
+CORRELATION_METHODS = ('sample', 'ewma')
+SHRINKAGE_METHODS = ('none', 'ledoit_wolf')
+DEFAULT_LOOKBACK_DAYS = 252
+EWMA_LAMBDA = 0.94
+TRADING_DAYS_PER_YEAR = 252
+
+correlation_cache = {}
+correlation_cache_lock = threading.Lock()
+
+
+def align_closes(histories: Dict[str, Dict[str, np.ndarray]], tickers: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Place each ticker's closes on the union of their dates.
+
+    Returns:
+        (dates, closes): sorted date strings and a (dates x tickers) matrix, NaN where missing
+    """
+    dates = np.unique(np.concatenate([histories[t]['date'] for t in tickers])) if tickers else np.array([])
+    closes = np.full((len(dates), len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        rows = np.searchsorted(dates, histories[ticker]['date'])
+        closes[rows, j] = histories[ticker]['close']
+    return dates, closes
+
+
+def log_closes(closes: np.ndarray) -> np.ndarray:
+    """Natural log of closes; NaN where the close is missing or not positive."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.log(np.where(closes > 0, closes, np.nan))
+
+
+def log_returns(closes: np.ndarray) -> np.ndarray:
+    """Log returns down the rows; NaN where either close is missing or not positive."""
+    return np.diff(log_closes(closes), axis=0)
+
+
+def pairwise_covariance(returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete sample covariance and correlation with matrix products.
+
+    For each pair only the rows where both series are present are used, like
+    pandas' DataFrame.cov/corr, but as five BLAS products instead of a loop
+    over pairs.
+
+    Returns:
+        (covariance, correlation, n_obs) matrices; NaN where a pair has fewer than 2 common rows
+    """
+    present = np.isfinite(returns)
+    mask = present.astype(float)
+    x = np.where(present, returns, 0.0)
+    # Center by column means first for numerical stability (cancels exactly below)
+    with np.errstate(invalid='ignore'):
+        x -= np.where(present, np.nanmean(np.where(present, returns, np.nan), axis=0), 0.0)
+
+    counts = mask.T @ mask
+    sums = x.T @ mask          # sums[i, j]: sum of x_i over rows where j is present too
+    squares = (x * x).T @ mask
+    cross = x.T @ x
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dof = np.where(counts > 1, counts - 1, np.nan)
+        cov = (cross - sums * sums.T / counts) / dof
+        var_i = (squares - sums ** 2 / counts) / dof
+        corr = cov / np.sqrt(var_i * var_i.T)
+    np.fill_diagonal(corr, np.where(np.diag(counts) > 1, 1.0, np.nan))
+    return cov, np.clip(corr, -1.0, 1.0), counts
+
+
+def ledoit_wolf(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf shrinkage of the sample covariance toward a scaled identity.
+
+    Args:
+        returns: Complete (rows x assets) return matrix
+
+    Returns:
+        (shrunk covariance, shrinkage intensity)
+    """
+    n, p = returns.shape
+    x = returns - returns.mean(axis=0)
+    x2 = x * x
+    emp_cov = x.T @ x / n
+    trace = x2.sum(axis=0) / n
+    mu = trace.sum() / p
+
+    beta_ = np.sum(x2.T @ x2)
+    delta_ = np.sum(emp_cov ** 2)
+    beta = (beta_ / n - delta_) / (p * n)
+    delta = (delta_ - 2 * mu * trace.sum() + p * mu ** 2) / p
+    beta = min(beta, delta)
+    shrinkage = 0.0 if beta == 0 else beta / delta
+
+    shrunk = (1 - shrinkage) * emp_cov
+    shrunk.flat[::p + 1] += shrinkage * mu
+    # Sample (n - 1) scaling, consistent with pairwise_covariance
+    return shrunk * n / (n - 1), float(shrinkage)
+
+
+def ewma_covariance(returns: np.ndarray, lam: float = EWMA_LAMBDA) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    RiskMetrics EWMA covariance (zero mean) at the last row, as one weighted product.
+
+    Missing returns contribute nothing; each pair's weights are renormalized
+    over the rows where both are present.
+
+    Returns:
+        (covariance, correlation)
+    """
+    present = np.isfinite(returns)
+    x = np.where(present, returns, 0.0)
+    weights = lam ** np.arange(len(returns) - 1, -1, -1.0)
+
+    mask = present.astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = ((x * weights[:, np.newaxis]).T @ x) / ((mask * weights[:, np.newaxis]).T @ mask)
+        sd = np.sqrt(np.diag(cov))
+        corr = np.clip(cov / np.outer(sd, sd), -1.0, 1.0)
+    return cov, corr
+
+
+def rolling_correlation(returns: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling pairwise correlation from prefix sums of cross products.
+
+    Args:
+        returns: (rows x assets) returns, NaN where missing
+        window: Window length in rows
+
+    Returns:
+        (rows - window + 1, pairs) correlations for the upper-triangle pairs
+        (np.triu_indices order), aligned to the window end
+    """
+    n, p = returns.shape
+    if window < 2 or window > n:
+        raise ValueError(f'rolling window must be between 2 and {n}')
+    i, j = np.triu_indices(p, k=1)
+
+    present = np.isfinite(returns)
+    x = np.where(present, returns - np.nanmean(returns, axis=0), 0.0)
+    m = present.astype(float)
+    xi, xj, mi, mj = x[:, i], x[:, j], m[:, i], m[:, j]
+
+    def window_sums(values):
+        prefix = np.concatenate((np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)))
+        return prefix[window:] - prefix[:-window]
+
+    count = window_sums(mi * mj)
+    sum_i, sum_j = window_sums(xi * mj), window_sums(xj * mi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = window_sums(xi * xj) - sum_i * sum_j / count
+        var_i = window_sums(xi * xi * mj) - sum_i ** 2 / count
+        var_j = window_sums(xj * xj * mi) - sum_j ** 2 / count
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[count < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def stock_entries(tickers: List[str], db_path=None) -> List[Dict]:
+    """
+    stocks_master rows (table and data version fields) for the requested tickers.
+
+    Raises:
+        ValueError: If any ticker is not stored
+    """
+    conn = sqlite3.connect(str(db_path or DATABASE_PATH))
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(f'''
+            SELECT ticker, table_name, last_updated, total_records, date_range_end
+            FROM stocks_master
+            WHERE ticker IN ({', '.join(['?'] * len(tickers))})
+        ''', tickers).fetchall()
+    finally:
+        conn.close()
+
+    entries = {row['ticker']: dict(row) for row in rows}
+    missing = [t for t in tickers if t not in entries]
+    if missing:
+        raise ValueError(f"Stock(s) not found: {', '.join(missing)}")
+    return [entries[t] for t in tickers]
+
+
+def load_log_prices(entries: List[Dict], lookback_days: Optional[int] = DEFAULT_LOOKBACK_DAYS,
+                    db_path=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Date-aligned log closes for stored tickers from one bulk read.
+
+    Args:
+        entries: Rows from stock_entries
+        lookback_days: Latest trading days of returns to cover, i.e. lookback_days + 1
+            closes of the aligned calendar (None for full history)
+        db_path: Database path (default DATABASE_PATH)
+
+    Returns:
+        (dates, log_prices): price dates and a (dates x tickers) matrix in entry order, NaN where missing
+
+    Raises:
+        ValueError: If a ticker has no price rows
+    """
+    tables = {e['ticker']: e['table_name'] for e in entries}
+    histories = read_price_histories(tables, lookback_days=lookback_days + 1 if lookback_days else None,
+                                     columns=('date', 'close'), db_path=str(db_path or DATABASE_PATH))
+    empty = [t for t in tables if t not in histories]
+    if empty:
+        raise ValueError(f"No price data for: {', '.join(empty)}")
+
+    dates, closes = align_closes(histories, list(tables))
+    if lookback_days:
+        dates, closes = dates[-(lookback_days + 1):], closes[-(lookback_days + 1):]
+    return dates, log_closes(closes)
+
+
+def load_return_matrix(entries: List[Dict], lookback_days: Optional[int] = DEFAULT_LOOKBACK_DAYS,
+                       db_path=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Date-aligned daily log returns for stored tickers from one bulk read.
+
+    Args:
+        entries: Rows from stock_entries
+        lookback_days: Latest trading days of the aligned calendar (None for full history)
+        db_path: Database path (default DATABASE_PATH)
+
+    Returns:
+        (dates, returns): return dates and a (dates x tickers) matrix in entry order, NaN where missing
+
+    Raises:
+        ValueError: If a ticker has no price rows
+    """
+    dates, log_prices = load_log_prices(entries, lookback_days, db_path)
+    return dates[1:], np.diff(log_prices, axis=0)
+
+
+def correlation_matrix(tickers: List[str], lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+                       method: str = 'sample', shrinkage: str = 'none', ewma_lambda: float = EWMA_LAMBDA,
+                       rolling_window: Optional[int] = None, db_path=None) -> Dict:
+    """
+    Covariance and correlation of daily log returns for a set of stored tickers.
+
+    Args:
+        tickers: Ticker symbols
+        lookback_days: Latest trading days of the aligned calendar
+        method: 'sample' (pairwise-complete) or 'ewma'
+        shrinkage: 'none' or 'ledoit_wolf' (sample method, complete rows only)
+        ewma_lambda: EWMA decay factor
+        rolling_window: Optional window for rolling pairwise correlations
+        db_path: Database path (default DATABASE_PATH)
+
+    Returns:
+        dict with tickers, date range, daily covariance, correlation, per-pair
+        observation counts and (optionally) rolling correlations
+
+    Raises:
+        ValueError: For unknown tickers or methods, or too little data
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    if len(tickers) < 2:
+        raise ValueError('At least 2 tickers are required')
+    if len(tickers) > CORRELATION_MAX_TICKERS:
+        raise ValueError(f'At most {CORRELATION_MAX_TICKERS} tickers are supported')
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"method must be one of: {', '.join(CORRELATION_METHODS)}")
+    if shrinkage not in SHRINKAGE_METHODS:
+        raise ValueError(f"shrinkage must be one of: {', '.join(SHRINKAGE_METHODS)}")
+    if rolling_window and len(tickers) > CORRELATION_MAX_ROLLING_TICKERS:
+        raise ValueError(f'Rolling correlation supports at most {CORRELATION_MAX_ROLLING_TICKERS} tickers')
+    db_path = str(db_path or DATABASE_PATH)
+
+    entries = stock_entries(tickers, db_path)
+
+    # Any data update changes the version and so the cache key
+    version = tuple(sorted((e['ticker'], e['last_updated'], e['total_records'], e['date_range_end'])
+                           for e in entries))
+    key = (tuple(sorted(tickers)), lookback_days, method, shrinkage, ewma_lambda, rolling_window,
+           db_path, version)
+    with correlation_cache_lock:
+        cached = correlation_cache.get(key)
+    if cached is not None:
+        return _reorder(cached, tickers)
+
+    start = time.perf_counter()
+    ordered = sorted(tickers)
+    dates, returns = load_return_matrix(sorted(entries, key=lambda e: e['ticker']), lookback_days, db_path)
+    if len(returns) < 2:
+        raise ValueError('Not enough overlapping data')
+
+    result = {'shrinkage_intensity': None}
+    if method == 'ewma':
+        cov, corr = ewma_covariance(returns, ewma_lambda)
+        counts = (np.isfinite(returns).astype(float).T @ np.isfinite(returns).astype(float))
+    else:
+        cov, corr, counts = pairwise_covariance(returns)
+        if shrinkage == 'ledoit_wolf':
+            complete = returns[np.all(np.isfinite(returns), axis=1)]
+            if len(complete) < 2:
+                raise ValueError('Ledoit-Wolf shrinkage needs at least 2 dates with data for every ticker')
+            cov, intensity = ledoit_wolf(complete)
+            sd = np.sqrt(np.diag(cov))
+            corr = cov / np.outer(sd, sd)
+            counts = np.full(cov.shape, float(len(complete)))
+            result['shrinkage_intensity'] = intensity
+
+    result.update({
+        'tickers': ordered,
+        'start_date': dates[0],
+        'end_date': dates[-1],
+        'n_dates': len(returns),
+        'method': method,
+        'shrinkage': shrinkage,
+        'covariance': cov,
+        'correlation': corr,
+        'n_obs': counts,
+        'annualization_factor': TRADING_DAYS_PER_YEAR,
+        'time_ms': (time.perf_counter() - start) * 1000
+    })
+    if rolling_window:
+        i, j = np.triu_indices(len(ordered), k=1)
+        # dates are return dates (one per row), so window k ends on dates[k + rolling_window - 1]
+        result['rolling'] = {
+            'window': rolling_window,
+            'dates': dates[rolling_window - 1:].tolist(),
+            'pairs': [[ordered[a], ordered[b]] for a, b in zip(i, j)],
+            'correlation': rolling_correlation(returns, rolling_window)
+        }
+
+    with correlation_cache_lock:
+        correlation_cache[key] = result
+        while len(correlation_cache) > CORRELATION_CACHE_SIZE:
+            correlation_cache.pop(next(iter(correlation_cache)))
+    return _reorder(result, tickers)
+
+
+def _reorder(result: Dict, tickers: List[str]) -> Dict:
+    """Copy of a cached result with matrices in the caller's ticker order."""
+    if result['tickers'] == tickers:
+        return dict(result)
+    order = [result['tickers'].index(t) for t in tickers]
+    reordered = dict(result, tickers=tickers)
+    for name in ('covariance', 'correlation', 'n_obs'):
+        reordered[name] = result[name][np.ix_(order, order)]
+    return reordered
@@ -1,164 +1,192 @@
 """
 Cumulative Returns Analysis Module
-Calculates overnight and intraday cumulative returns from stock price data
+Calculates overnight and intraday cumulative returns from stock price data.
+Works on NumPy columns (as read from the price tables); rolling compounded
+returns come from prefix sums of log(1 + r), so every window costs O(1)
 """
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 
+TRADING_DAYS_PER_YEAR = 252
 
-def calculate_cumulative_returns(prices: List[Dict], ticker: str) -> Dict:
+# Price data: a list of row dicts, or columns {'date': ..., 'open': ..., 'close': ...}
+PriceData = Union[List[Dict], Dict[str, np.ndarray]]
+
+
+def _price_columns(prices: PriceData) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Date-sorted dates (datetime64[D]), opens and closes, without rows missing open or close.
+    """
+    columns = prices if isinstance(prices, dict) else pd.DataFrame(prices)
+
+    # Ensure we have the required columns
+    if not all(name in columns for name in ('date', 'open', 'close')):
+        raise ValueError("Price data must contain date, open, and close columns")
+
+    dates = np.asarray(columns['date'])
+    try:
+        dates = dates.astype('datetime64[D]')
+    except ValueError:
+        dates = pd.to_datetime(dates).values.astype('datetime64[D]')
+    opens = np.asarray(columns['open'], dtype=float)
+    closes = np.asarray(columns['close'], dtype=float)
+
+    order = np.argsort(dates, kind='stable')
+    valid = ~(np.isnan(opens[order]) | np.isnan(closes[order]))
+    order = order[valid]
+    return dates[order], opens[order], closes[order]
+
+
+def daily_returns(opens: np.ndarray, closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Overnight and intraday simple returns.
+
+    Overnight: Open / Previous Close - 1 (0 on the first day)
+    Intraday: Close / Open - 1
+
+    Returns:
+        (overnight, intraday) arrays, one value per day
+    """
+    overnight = np.zeros(len(opens))
+    overnight[1:] = opens[1:] / closes[:-1] - 1
+    intraday = closes / opens - 1
+    return overnight, intraday
+
+
+def rolling_compounded_returns(returns: np.ndarray, window: int) -> np.ndarray:
+    """
+    Compounded return of every trailing window in O(n).
+
+    prod(1 + r) over a window is exp of the difference of two prefix sums
+    of log1p(r).
+
+    Args:
+        returns: Simple returns
+        window: Window length in days
+
+    Returns:
+        Array aligned with returns; NaN for the first window - 1 days
+    """
+    result = np.full(len(returns), np.nan)
+    if window < 1 or window > len(returns):
+        return result
+    prefix = np.concatenate(([0.0], np.cumsum(np.log1p(returns))))
+    result[window - 1:] = np.expm1(prefix[window:] - prefix[:-window])
+    return result
+
+
+def calculate_cumulative_returns(prices: PriceData, ticker: str, rolling_window: Optional[int] = None) -> Dict:
     """
     Calculate overnight and intraday cumulative returns from price data.
-    
+
     Args:
-        prices: List of price dictionaries with date, open, close, high, low, volume
+        prices: List of price dictionaries with date, open and close, or a dict
+            of date/open/close columns (e.g. NumPy arrays from the price table)
         ticker: Stock ticker symbol
-        
+        rolling_window: Optional window (days) for rolling compounded returns
+
     Returns:
         Dictionary containing cumulative returns data and statistics
     """
-    
-    # Convert to DataFrame for easier processing
-    df = pd.DataFrame(prices)
-    
-    # Ensure we have the required columns
-    if 'date' not in df.columns or 'open' not in df.columns or 'close' not in df.columns:
-        raise ValueError("Price data must contain date, open, and close columns")
-    
-    # Sort by date
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date').reset_index(drop=True)
-    
-    # Remove any rows with NaN values in critical columns
-    df = df.dropna(subset=['open', 'close'])
-    
-    if len(df) < 2:
+    dates, opens, closes = _price_columns(prices)
+
+    if len(dates) < 2:
         raise ValueError("Insufficient data for calculation (need at least 2 trading days)")
-    
-    # Calculate returns
-    # Intraday returns: (Close / Open) - 1
-    intraday_returns = (df['close'] / df['open']) - 1
-    
-    # Overnight returns: (Open / Previous Close) - 1
-    # First day has no overnight return
-    overnight_returns = pd.Series([0.0])
-    overnight_calc = pd.Series((df['open'].iloc[1:].values / df['close'].iloc[:-1].values) - 1)
-    overnight_returns = pd.concat([overnight_returns, overnight_calc], ignore_index=True)
-    
+
+    overnight_returns, intraday_returns = daily_returns(opens, closes)
+
     # Calculate cumulative returns
-    cumulative_overnight = (1 + overnight_returns).cumprod()
-    cumulative_intraday = (1 + intraday_returns).cumprod()
-    
+    cumulative_overnight = np.cumprod(1 + overnight_returns)
+    cumulative_intraday = np.cumprod(1 + intraday_returns)
+
     # Calculate statistics
-    total_overnight_return = (cumulative_overnight.iloc[-1] - 1) * 100
-    total_intraday_return = (cumulative_intraday.iloc[-1] - 1) * 100
-    
+    total_overnight_return = (cumulative_overnight[-1] - 1) * 100
+    total_intraday_return = (cumulative_intraday[-1] - 1) * 100
+
     # Calculate annualized returns
-    trading_days = len(df)
-    years = trading_days / 252  # Approximate trading days per year
-    
-    if years > 0:
-        annualized_overnight = (np.power(cumulative_overnight.iloc[-1], 1/years) - 1) * 100
-        annualized_intraday = (np.power(cumulative_intraday.iloc[-1], 1/years) - 1) * 100
-    else:
-        annualized_overnight = 0
-        annualized_intraday = 0
-    
+    trading_days = len(dates)
+    years = trading_days / TRADING_DAYS_PER_YEAR
+    annualized_overnight = (np.power(cumulative_overnight[-1], 1 / years) - 1) * 100
+    annualized_intraday = (np.power(cumulative_intraday[-1], 1 / years) - 1) * 100
+
     # Calculate win rates
-    overnight_wins = (overnight_returns > 0).sum()
-    intraday_wins = (intraday_returns > 0).sum()
-    overnight_win_rate = (overnight_wins / len(overnight_returns)) * 100
-    intraday_win_rate = (intraday_wins / len(intraday_returns)) * 100
-    
+    overnight_win_rate = np.count_nonzero(overnight_returns > 0) / trading_days * 100
+    intraday_win_rate = np.count_nonzero(intraday_returns > 0) / trading_days * 100
+
     # Find best and worst days
-    best_overnight_idx = overnight_returns.idxmax()
-    worst_overnight_idx = overnight_returns.idxmin()
-    best_intraday_idx = intraday_returns.idxmax()
-    worst_intraday_idx = intraday_returns.idxmin()
-    
+    best_overnight_idx = int(np.argmax(overnight_returns))
+    worst_overnight_idx = int(np.argmin(overnight_returns))
+    best_intraday_idx = int(np.argmax(intraday_returns))
+    worst_intraday_idx = int(np.argmin(intraday_returns))
+
     # Prepare return data
     result = {
         'success': True,
         'ticker': ticker,
-        'dates': df['date'].dt.strftime('%Y-%m-%d').tolist(),
+        'dates': dates.astype(str).tolist(),
         'cumulative_overnight': cumulative_overnight.tolist(),
         'cumulative_intraday': cumulative_intraday.tolist(),
         'overnight_returns': overnight_returns.tolist(),
         'intraday_returns': intraday_returns.tolist(),
         'statistics': {
-            'total_overnight_return': round(total_overnight_return, 2),
-            'total_intraday_return': round(total_intraday_return, 2),
-            'annualized_overnight': round(annualized_overnight, 2),
-            'annualized_intraday': round(annualized_intraday, 2),
+            'total_overnight_return': round(float(total_overnight_return), 2),
+            'total_intraday_return': round(float(total_intraday_return), 2),
+            'annualized_overnight': round(float(annualized_overnight), 2),
+            'annualized_intraday': round(float(annualized_intraday), 2),
             'overnight_win_rate': round(overnight_win_rate, 1),
             'intraday_win_rate': round(intraday_win_rate, 1),
             'best_overnight': {
-                'return': round(overnight_returns.iloc[best_overnight_idx] * 100, 2),
-                'date': df['date'].iloc[best_overnight_idx].strftime('%Y-%m-%d')
+                'return': round(float(overnight_returns[best_overnight_idx]) * 100, 2),
+                'date': str(dates[best_overnight_idx])
             },
             'worst_overnight': {
-                'return': round(overnight_returns.iloc[worst_overnight_idx] * 100, 2),
-                'date': df['date'].iloc[worst_overnight_idx].strftime('%Y-%m-%d')
+                'return': round(float(overnight_returns[worst_overnight_idx]) * 100, 2),
+                'date': str(dates[worst_overnight_idx])
             },
             'best_intraday': {
-                'return': round(intraday_returns.iloc[best_intraday_idx] * 100, 2),
-                'date': df['date'].iloc[best_intraday_idx].strftime('%Y-%m-%d')
+                'return': round(float(intraday_returns[best_intraday_idx]) * 100, 2),
+                'date': str(dates[best_intraday_idx])
             },
             'worst_intraday': {
-                'return': round(intraday_returns.iloc[worst_intraday_idx] * 100, 2),
-                'date': df['date'].iloc[worst_intraday_idx].strftime('%Y-%m-%d')
+                'return': round(float(intraday_returns[worst_intraday_idx]) * 100, 2),
+                'date': str(dates[worst_intraday_idx])
             },
             'trading_days': trading_days,
-            'start_date': df['date'].iloc[0].strftime('%Y-%m-%d'),
-            'end_date': df['date'].iloc[-1].strftime('%Y-%m-%d')
+            'start_date': str(dates[0]),
+            'end_date': str(dates[-1])
         }
     }
-    
+
+    if rolling_window:
+        # None (JSON null) for the days before the first full window
+        rolling_overnight = rolling_compounded_returns(overnight_returns, rolling_window)
+        rolling_intraday = rolling_compounded_returns(intraday_returns, rolling_window)
+        result['rolling_window'] = rolling_window
+        result['rolling_overnight'] = np.where(np.isnan(rolling_overnight), None, rolling_overnight).tolist()
+        result['rolling_intraday'] = np.where(np.isnan(rolling_intraday), None, rolling_intraday).tolist()
+
     return result
 
 
-def calculate_rolling_returns(prices: List[Dict], window: int = 20) -> Dict:
+def calculate_rolling_returns(prices: PriceData, window: int = 20) -> Dict:
     """
     Calculate rolling cumulative returns for a given window size.
-    
+
     Args:
-        prices: List of price dictionaries
+        prices: List of price dictionaries, or a dict of date/open/close columns
         window: Rolling window size in days
-        
+
     Returns:
         Dictionary with rolling returns data
     """
-    
-    df = pd.DataFrame(prices)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date').reset_index(drop=True)
-    df = df.dropna(subset=['open', 'close'])
-    
-    # Calculate daily returns
-    intraday_returns = (df['close'] / df['open']) - 1
-    overnight_returns = pd.Series([0.0], index=[0])
-    overnight_returns = pd.concat([
-        overnight_returns,
-        (df['open'].iloc[1:].values / df['close'].iloc[:-1].values) - 1
-    ]).reset_index(drop=True)
-    
-    # Calculate rolling cumulative returns
-    rolling_overnight = pd.Series(index=df.index, dtype=float)
-    rolling_intraday = pd.Series(index=df.index, dtype=float)
-    
-    for i in range(window - 1, len(df)):
-        window_overnight = overnight_returns.iloc[i-window+1:i+1]
-        window_intraday = intraday_returns.iloc[i-window+1:i+1]
-        
-        rolling_overnight.iloc[i] = (1 + window_overnight).prod() - 1
-        rolling_intraday.iloc[i] = (1 + window_intraday).prod() - 1
-    
+    dates, opens, closes = _price_columns(prices)
+    overnight_returns, intraday_returns = daily_returns(opens, closes)
+
     return {
-        'dates': df['date'].dt.strftime('%Y-%m-%d').tolist(),
-        'rolling_overnight': rolling_overnight.tolist(),
-        'rolling_intraday': rolling_intraday.tolist(),
+        'dates': dates.astype(str).tolist(),
+        'rolling_overnight': rolling_compounded_returns(overnight_returns, window).tolist(),
+        'rolling_intraday': rolling_compounded_returns(intraday_returns, window).tolist(),
         'window': window
-    }
\ No newline at end of file
+    }
@@ -1,23 +1,35 @@
-import yfinance as yf
 import datetime as dt
-from dateutil.relativedelta import relativedelta
-import jax.numpy as jnp
-from jax import grad
-from jax.scipy.stats import norm as jnorm
+import json
+import zlib
 from scipy.interpolate import griddata
+from scipy.special import ndtr
 import numpy as np
+import pandas as pd
 import logging
+from src.database.option_snapshots import snapshot_timestamp
+from src.analysis.option_chain_cache import chain_cache
+from src.analysis.svi_surface import fit_svi_surface, SVISurface
+from src.analysis.Derivative_basics import bsm_price_greeks
 
 logger = logging.getLogger(__name__)
 
+# Option chain columns used to build the surface
+CHAIN_COLUMNS = ['strike', 'lastPrice', 'bid', 'ask', 'volume']
+
+# Surface engines: scattered-point triangulation or parametric SVI smiles
+SURFACE_METHODS = ('griddata', 'svi')
+
+# Grid resolution per axis
+DEFAULT_GRID_SIZE = 30
+COARSE_GRID_SIZE = 10
+MIN_GRID_SIZE = 2
+MAX_GRID_SIZE = 200
+
 """------------------------------------------------------------------------------------------------------------------"""
 
 class IVSurfaceCalculator:
     """Calculate implied volatility surface for options."""
 
-    def __init__(self):
-        self.loss_grad = grad(self._loss, argnums=5)  # Differentiate with respect to sigma_guess
-
     @staticmethod
     def get_options_data(ticker, min_expiry_index=0, max_expiry_index=10):
         """
@@ -32,75 +44,41 @@ class IVSurfaceCalculator:
             dict: Contains calls and puts data with time to expiry, strikes, and prices
         """
         try:
-            yf_ticker = yf.Ticker(ticker)
-
             # Get available expiration dates
-            if not hasattr(yf_ticker, 'options') or len(yf_ticker.options) == 0:
+            expirations = chain_cache.get_expirations(ticker)
+            if len(expirations) == 0:
                 raise ValueError(f"{ticker} does not have listed options")
 
-            valid_dates = yf_ticker.options[min_expiry_index:max_expiry_index]
+            valid_dates = expirations[min_expiry_index:max_expiry_index]
 
             if len(valid_dates) == 0:
                 raise ValueError(f"No valid expiration dates found for {ticker}")
 
             # Get current stock price and info
-            spot_price = yf_ticker.history(period="1d")['Close'].iloc[-1]
-
-            # Initialize data structures
-            calls_data = {'T': [], 'K': [], 'prices': [], 'expiries': []}
-            puts_data = {'T': [], 'K': [], 'prices': [], 'expiries': []}
+            spot_price = chain_cache.get_spot_price(ticker)
 
-            today = dt.datetime.now()
+            asof = snapshot_timestamp()
+            frames = []
 
             for expiry_date_str in valid_dates:
                 try:
-                    # Fetch option chain for this expiry
-                    option_chain = yf_ticker.option_chain(expiry_date_str)
-
-                    # Calculate time to expiry in years
-                    expiry_date = dt.datetime.strptime(expiry_date_str, '%Y-%m-%d')
-                    time_to_expiry = (expiry_date - today).days / 365.25
-
-                    if time_to_expiry <= 0:
-                        continue  # Skip expired options
-
-                    # Process calls
-                    calls_df = option_chain.calls[['strike', 'lastPrice', 'bid', 'ask', 'volume']]
-                    valid_calls = calls_df[
-                        (calls_df['lastPrice'] > 0.01) &  # Has valid price
-                        (calls_df['volume'] > 0)  # Has some volume
-                    ]
-
-                    for _, row in valid_calls.iterrows():
-                        calls_data['T'].append(time_to_expiry)
-                        calls_data['K'].append(row['strike'])
-                        # Use last price if available, otherwise use bid-ask midpoint
-                        price = row['lastPrice'] if row['lastPrice'] > 0 else (row['bid'] + row['ask']) / 2
-                        calls_data['prices'].append(price)
-                        calls_data['expiries'].append(expiry_date_str)
-
-                    # Process puts
-                    puts_df = option_chain.puts[['strike', 'lastPrice', 'bid', 'ask', 'volume']]
-                    valid_puts = puts_df[
-                        (puts_df['lastPrice'] > 0.01) &  # Has valid price
-                        (puts_df['volume'] > 0)  # Has some volume
-                    ]
-
-                    for _, row in valid_puts.iterrows():
-                        puts_data['T'].append(time_to_expiry)
-                        puts_data['K'].append(row['strike'])
-                        # Use last price if available, otherwise use bid-ask midpoint
-                        price = row['lastPrice'] if row['lastPrice'] > 0 else (row['bid'] + row['ask']) / 2
-                        puts_data['prices'].append(price)
-                        puts_data['expiries'].append(expiry_date_str)
+                    # Shared chain cache; fresh fetches are recorded under one asof
+                    calls, puts = chain_cache.get_chain(ticker, expiry_date_str,
+                                                        spot_price=spot_price, asof=asof)
+
+                    for option_type, chain in (('calls', calls), ('puts', puts)):
+                        chain = chain[CHAIN_COLUMNS].assign(type=option_type, expiry=expiry_date_str)
+                        frames.append(chain)
 
                 except Exception as e:
                     logger.warning(f"Failed to process expiry {expiry_date_str}: {e}")
                     continue
 
+            chains = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+                columns=CHAIN_COLUMNS + ['type', 'expiry'])
+
             return {
-                'calls': calls_data,
-                'puts': puts_data,
+                **IVSurfaceCalculator.prepare_chain_arrays(chains, dt.datetime.now()),
                 'spot_price': spot_price,
                 'ticker': ticker
             }
@@ -110,50 +88,104 @@ class IVSurfaceCalculator:
             raise
 
     @staticmethod
-    def black_scholes(S, K, T, r, q, sigma, otype="call"):
-        """Calculate Black-Scholes option price."""
-        d1 = (jnp.log(S/K) + (r - q + (sigma**2)/2) * T) / (sigma * jnp.sqrt(T))
-        d2 = d1 - (sigma * jnp.sqrt(T))
+    def prepare_chain_arrays(chains, today):
+        """
+        Turn a long option-chain frame (all expiries, both types) into contiguous arrays.
+
+        Args:
+            chains: DataFrame with strike, lastPrice, bid, ask, volume, type and expiry columns
+            today: Valuation datetime
+
+        Returns:
+            dict: 'calls' and 'puts' entries of T, K, prices and expiries arrays
+        """
+        expiry_dates = pd.to_datetime(chains['expiry'])
+        time_to_expiry = (expiry_dates - pd.Timestamp(today)).dt.days.to_numpy(dtype=float) / 365.25
+
+        last = chains['lastPrice'].to_numpy(dtype=float, na_value=np.nan)
+        mid = (chains['bid'].to_numpy(dtype=float, na_value=np.nan)
+               + chains['ask'].to_numpy(dtype=float, na_value=np.nan)) / 2
+        volume = chains['volume'].to_numpy(dtype=float, na_value=np.nan)
+
+        # Skip expired options and keep contracts with a valid price and some volume
+        liquid = (time_to_expiry > 0) & (last > 0.01) & (volume > 0)
+        # Use last price if available, otherwise use bid-ask midpoint
+        prices = np.where(last > 0, last, mid)
+
+        strikes = chains['strike'].to_numpy(dtype=float)
+        expiries = chains['expiry'].to_numpy(dtype=str)
+        types = chains['type'].to_numpy(dtype=str)
+
+        result = {}
+        for option_type in ('calls', 'puts'):
+            mask = liquid & (types == option_type)
+            result[option_type] = {
+                'T': np.ascontiguousarray(time_to_expiry[mask]),
+                'K': np.ascontiguousarray(strikes[mask]),
+                'prices': np.ascontiguousarray(prices[mask]),
+                'expiries': expiries[mask]
+            }
+        return result
+
+    @staticmethod
+    def price_and_vega(S, K, T, r, q, sigma, otype="call"):
+        """
+        NumPy Black-Scholes price and vega (the gradient of the price w.r.t. sigma) for arrays.
+
+        Float64 and shape-agnostic, so chains of any length are priced in one call.
+        """
+        sqrt_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + (sigma ** 2) / 2) * T) / (sigma * sqrt_T)
+        d2 = d1 - sigma * sqrt_T
+        S_disc = S * np.exp(-q * T)
+        K_disc = K * np.exp(-r * T)
 
         if otype == "call":
-            return S * jnp.exp(-q * T) * jnorm.cdf(d1) - K * jnp.exp(-r * T) * jnorm.cdf(d2)
+            price = S_disc * ndtr(d1) - K_disc * ndtr(d2)
         else:
-            return K * jnp.exp(-r * T) * jnorm.cdf(-d2) - S * jnp.exp(-q * T) * jnorm.cdf(-d1)
+            price = K_disc * ndtr(-d2) - S_disc * ndtr(-d1)
 
-    def _loss(self, S, K, T, r, q, sigma_guess, price, otype):
-        """Loss function for IV optimization."""
-        theoretical_price = self.black_scholes(S, K, T, r, q, sigma_guess, otype)
-        return theoretical_price - price
+        vega = S_disc * sqrt_T * np.exp(-d1 ** 2 / 2) / np.sqrt(2 * np.pi)
+        return price, vega
 
     def solve_for_iv(self, S, K, T, r, q, price, otype="call", sigma_guess=0.2,
                      n_iter=100, epsilon=0.001):
         """
-        Solve for implied volatility using Newton-Raphson method with JAX gradients.
+        Solve for implied volatility using Newton-Raphson method.
+
+        K, T and price may be scalars or arrays; all contracts are iterated in
+        lockstep and each one is frozen once it converges. The Newton step uses
+        the closed-form vega as the derivative of the pricing error.
         """
-        sigma = sigma_guess
+        K, T, price = np.broadcast_arrays(np.asarray(K, dtype=float),
+                                          np.asarray(T, dtype=float),
+                                          np.asarray(price, dtype=float))
+        sigma = np.full(K.shape, sigma_guess, dtype=float)
+        active = np.ones(K.shape, dtype=bool)
 
         for i in range(n_iter):
-            loss_val = self._loss(S, K, T, r, q, sigma, price, otype)
+            theoretical_price, loss_grad_val = self.price_and_vega(S, K, T, r, q, sigma, otype)
+            loss_val = theoretical_price - price
 
-            if abs(loss_val) < epsilon:
+            active &= np.abs(loss_val) >= epsilon
+            if not active.any():
                 break
 
-            loss_grad_val = self.loss_grad(S, K, T, r, q, sigma, price, otype)
+            # Newton-Raphson update with bounds, avoiding division by zero
+            active &= np.abs(loss_grad_val) > 1e-10
+            step = np.divide(loss_val, loss_grad_val, out=np.zeros_like(sigma), where=active)
+            # Keep sigma in reasonable bounds [0.01, 5.0]
+            sigma = np.clip(sigma - step, 0.01, 5.0)
 
-            # Newton-Raphson update with bounds
-            if abs(loss_grad_val) > 1e-10:  # Avoid division by zero
-                sigma = sigma - loss_val / loss_grad_val
-                # Keep sigma in reasonable bounds [0.01, 5.0]
-                sigma = float(np.clip(sigma, 0.01, 5.0))
-            else:
-                break
-
-        return float(sigma)
+        return float(sigma) if sigma.ndim == 0 else sigma
 
-    def calculate_surface(self, ticker, risk_free_rate=None, dividend_yield=None,
-                         min_expiry_index=0, max_expiry_index=10):
+    def fit_surface(self, ticker, risk_free_rate=None, dividend_yield=None,
+                    min_expiry_index=0, max_expiry_index=10, method='griddata'):
         """
-        Calculate IV surface for both calls and puts.
+        Fetch option chains, solve implied vols and fit the surface model.
+
+        The returned fit holds everything needed to evaluate a grid of any
+        resolution or region later, without refetching or re-solving.
 
         Args:
             ticker: Stock ticker symbol
@@ -161,10 +193,14 @@ class IVSurfaceCalculator:
             dividend_yield: Dividend yield (if None, fetches from ticker info)
             min_expiry_index: Starting index for expiration dates
             max_expiry_index: Ending index for expiration dates
+            method: 'griddata' (linear triangulation) or 'svi' (per-expiry SVI smiles)
 
         Returns:
-            dict: Contains surface data for calls and puts
+            dict: Market parameters plus per-type fitted slices (None when insufficient data)
         """
+        if method not in SURFACE_METHODS:
+            raise ValueError(f"Unknown surface method '{method}', expected one of {SURFACE_METHODS}")
+
         try:
             # Fetch options data
             options_data = self.get_options_data(ticker, min_expiry_index, max_expiry_index)
@@ -175,7 +211,7 @@ class IVSurfaceCalculator:
             # Fetch risk-free rate if not provided
             if risk_free_rate is None:
                 try:
-                    r = yf.Ticker("^TNX").history(period="1d")['Close'].iloc[-1] / 100
+                    r = chain_cache.get_risk_free_rate()
                 except:
                     r = 0.05  # Default to 5% if fetch fails
                     logger.warning("Failed to fetch risk-free rate, using 5% default")
@@ -185,7 +221,7 @@ class IVSurfaceCalculator:
             # Fetch dividend yield if not provided
             if dividend_yield is None:
                 try:
-                    q = yf.Ticker(ticker).info.get('dividendYield', 0) or 0
+                    q = chain_cache.get_dividend_yield(ticker)
                 except:
                     q = 0
                     logger.warning("Failed to fetch dividend yield, using 0% default")
@@ -193,63 +229,38 @@ class IVSurfaceCalculator:
                 q = dividend_yield
 
             # Calculate IV for calls and puts
-            surfaces = {}
+            fits = {}
 
             for option_type in ['calls', 'puts']:
                 data = options_data[option_type]
 
                 if len(data['T']) == 0:
                     logger.warning(f"No valid {option_type} data for {ticker}")
-                    surfaces[option_type] = None
+                    fits[option_type] = None
                     continue
 
-                # Calculate IV for each option
-                iv_values = []
-                valid_T = []
-                valid_K = []
-
-                for i in range(len(data['T'])):
-                    try:
-                        T = data['T'][i]
-                        K = data['K'][i]
-                        price = data['prices'][i]
-
-                        # Skip if price is too low or time to expiry is too short
-                        if price < 0.01 or T < 0.01:
-                            continue
+                # Skip if price is too low or time to expiry is too short
+                usable = (data['prices'] >= 0.01) & (data['T'] >= 0.01)
+                valid_T = data['T'][usable]
+                valid_K = data['K'][usable]
 
-                        # Calculate IV
-                        iv = self.solve_for_iv(S, K, T, r, q, price,
+                # Calculate IV for all contracts at once
+                iv_values = self.solve_for_iv(S, valid_K, valid_T, r, q, data['prices'][usable],
                                               otype=option_type[:-1])  # Remove 's' from calls/puts
 
-                        # Validate IV is reasonable
-                        if 0.01 <= iv <= 5.0:
-                            iv_values.append(iv)
-                            valid_T.append(T)
-                            valid_K.append(K)
-
-                    except Exception as e:
-                        logger.debug(f"Failed to calculate IV for {option_type} K={K}, T={T}: {e}")
-                        continue
+                # Validate IV is reasonable
+                reasonable = np.isfinite(iv_values) & (iv_values >= 0.01) & (iv_values <= 5.0)
+                valid_T, valid_K, iv_values = valid_T[reasonable], valid_K[reasonable], iv_values[reasonable]
 
                 if len(iv_values) < 5:
                     logger.warning(f"Insufficient valid IV points for {option_type}: {len(iv_values)}")
-                    surfaces[option_type] = None
+                    fits[option_type] = None
                     continue
 
-                # Create mesh grid for interpolation
                 try:
-                    T_unique = np.unique(valid_T)
-                    K_min, K_max = min(valid_K), max(valid_K)
-
-                    # Create regular grid for interpolation
-                    T_grid_1d = np.linspace(min(T_unique), max(T_unique), 30)
-                    K_grid_1d = np.linspace(K_min, K_max, 30)
-                    T_grid, K_grid = np.meshgrid(T_grid_1d, K_grid_1d)
-
                     # Filter options by moneyness to exclude deep ITM (unreliable IV extraction)
                     # Deep ITM options have low vega and IV becomes numerically unstable
-                    moneyness = np.array(valid_K) / S
+                    moneyness = valid_K / S
                     if option_type == 'calls':
                         # For calls: exclude deep ITM (K/S < 0.9)
                         moneyness_filter = moneyness > 0.9
@@ -257,52 +268,36 @@ class IVSurfaceCalculator:
                         # For puts: exclude deep ITM (K/S > 1.1)
                         moneyness_filter = moneyness < 1.1
 
-                    filtered_T = [t for i, t in enumerate(valid_T) if moneyness_filter[i]]
-                    filtered_K = [k for i, k in enumerate(valid_K) if moneyness_filter[i]]
-                    filtered_iv = [iv for i, iv in enumerate(iv_values) if moneyness_filter[i]]
-
-                    # Interpolate IV values onto grid
-                    # Use linear interpolation to avoid Runge's phenomenon (polynomial overshoot)
-                    # Linear is more stable for sparse financial data and industry standard
-                    points = np.array([(t, k) for t, k in zip(filtered_T, filtered_K)])
-                    sigma_grid = griddata(points, np.array(filtered_iv),
-                                        (T_grid, K_grid), method='linear')
-
-                    # Handle NaN values from extrapolation
-                    # Use nearest neighbor interpolation to fill NaNs
-                    nan_mask = np.isnan(sigma_grid)
-                    if np.any(nan_mask):
-                        sigma_grid_nearest = griddata(points, np.array(filtered_iv),
-                                                     (T_grid, K_grid), method='nearest')
-                        sigma_grid[nan_mask] = sigma_grid_nearest[nan_mask]
-
-                    # CRITICAL: Enforce mathematical bounds to eliminate interpolation artifacts
-                    # Negative IVs are mathematically impossible (would create complex numbers in BS formula)
-                    # Clip to [0.01, 5.0] to match individual IV calculation bounds
-                    sigma_grid = np.clip(sigma_grid, 0.01, 5.0)
-
-                    surfaces[option_type] = {
-                        'T_grid': T_grid.tolist(),
-                        'K_grid': K_grid.tolist(),
-                        'sigma_grid': sigma_grid.tolist(),
+                    points = np.column_stack((valid_T[moneyness_filter], valid_K[moneyness_filter]))
+                    filtered_iv = iv_values[moneyness_filter]
+
+                    fits[option_type] = {
+                        'points': points,
+                        'iv': filtered_iv,
+                        # Default grid spans all valid quotes
+                        'T_range': (float(valid_T.min()), float(valid_T.max())),
+                        'K_range': (float(valid_K.min()), float(valid_K.max())),
+                        # Fit a smile per expiry once; grids are then evaluated in O(grid)
+                        'svi': fit_svi_surface(points[:, 0], points[:, 1], filtered_iv, S, r, q)
+                               if method == 'svi' else None,
                         'raw_points': {
-                            'T': valid_T,
-                            'K': valid_K,
-                            'iv': iv_values
+                            'T': valid_T.tolist(),
+                            'K': valid_K.tolist(),
+                            'iv': iv_values.tolist()
                         }
                     }
 
                 except Exception as e:
-                    logger.error(f"Failed to create surface grid for {option_type}: {e}")
-                    surfaces[option_type] = None
+                    logger.error(f"Failed to fit surface for {option_type}: {e}")
+                    fits[option_type] = None
 
-            # Return complete surface data
             return {
                 'ticker': ticker,
+                'method': method,
                 'spot_price': float(S),
                 'risk_free_rate': float(r),
                 'dividend_yield': float(q),
-                'surfaces': surfaces,
+                'fits': fits,
                 'timestamp': dt.datetime.now().isoformat()
             }
 
@@ -310,6 +305,134 @@ class IVSurfaceCalculator:
             logger.error(f"Failed to calculate IV surface for {ticker}: {e}")
             raise
 
+    @staticmethod
+    def evaluate_surface(fit, n_T=DEFAULT_GRID_SIZE, n_K=DEFAULT_GRID_SIZE,
+                         T_range=None, K_range=None, compact=False, greeks=False):
+        """
+        Evaluate a fitted surface on a regular (T, K) grid.
+
+        Args:
+            fit: Output of fit_surface
+            n_T: Number of maturity grid points
+            n_K: Number of strike grid points
+            T_range: Optional (T_min, T_max) region of interest in years; None bounds use the data range
+            K_range: Optional (K_min, K_max) region of interest; None bounds use the data range
+            compact: Ship 1-D 'T'/'K' axes instead of full T_grid/K_grid matrices
+            greeks: Add delta/gamma/vega/theta grids priced off sigma_grid with the
+                fit's spot, rate and dividend yield
+
+        Returns:
+            dict: Contains surface data for calls and puts
+        """
+        n_T = int(np.clip(n_T, MIN_GRID_SIZE, MAX_GRID_SIZE))
+        n_K = int(np.clip(n_K, MIN_GRID_SIZE, MAX_GRID_SIZE))
+        surfaces = {}
+
+        for option_type, type_fit in fit['fits'].items():
+            if type_fit is None:
+                surfaces[option_type] = None
+                continue
+
+            try:
+                # Region of interest, falling back to the quoted range per bound
+                T_lo, T_hi = [default if bound is None else bound
+                              for bound, default in zip(T_range or (None, None), type_fit['T_range'])]
+                K_lo, K_hi = [default if bound is None else bound
+                              for bound, default in zip(K_range or (None, None), type_fit['K_range'])]
+
+                # Create regular grid for interpolation
+                T_grid_1d = np.linspace(max(T_lo, 1e-4), max(T_hi, 1e-4), n_T)
+                K_grid_1d = np.linspace(max(K_lo, 1e-4), max(K_hi, 1e-4), n_K)
+                T_grid, K_grid = np.meshgrid(T_grid_1d, K_grid_1d)
+
+                points, filtered_iv = type_fit['points'], type_fit['iv']
+
+                if type_fit['svi'] is not None:
+                    sigma_grid = type_fit['svi'].evaluate_grid(T_grid_1d, K_grid_1d)
+                else:
+                    # Interpolate IV values onto grid
+                    # Use linear interpolation to avoid Runge's phenomenon (polynomial overshoot)
+                    # Linear is more stable for sparse financial data and industry standard
+                    sigma_grid = griddata(points, filtered_iv,
+                                        (T_grid, K_grid), method='linear')
+
+                    # Handle NaN values from extrapolation
+                    # Use nearest neighbor interpolation to fill NaNs
+                    nan_mask = np.isnan(sigma_grid)
+                    if np.any(nan_mask):
+                        sigma_grid_nearest = griddata(points, filtered_iv,
+                                                     (T_grid, K_grid), method='nearest')
+                        sigma_grid[nan_mask] = sigma_grid_nearest[nan_mask]
+
+                # CRITICAL: Enforce mathematical bounds to eliminate interpolation artifacts
+                # Negative IVs are mathematically impossible (would create complex numbers in BS formula)
+                # Clip to [0.01, 5.0] to match individual IV calculation bounds
+                sigma_grid = np.clip(sigma_grid, 0.01, 5.0)
+
+                surface = {'method': fit['method']}
+                if compact:
+                    # T and K are separable, so 1-D axes fully describe the mesh
+                    surface['T'] = T_grid_1d.tolist()
+                    surface['K'] = K_grid_1d.tolist()
+                else:
+                    surface['T_grid'] = T_grid.tolist()
+                    surface['K_grid'] = K_grid.tolist()
+                surface['sigma_grid'] = sigma_grid.tolist()
+                if greeks:
+                    # One broadcast BSM pass over the whole grid
+                    leg = option_type.rstrip('s')
+                    bsm = bsm_price_greeks(fit['spot_price'], K_grid, T_grid, fit['risk_free_rate'],
+                                           sigma_grid, fit['dividend_yield'])
+                    surface['greeks'] = {
+                        'delta': bsm[f'{leg}_delta'].tolist(),
+                        'gamma': bsm['gamma'].tolist(),
+                        'vega': bsm['vega'].tolist(),
+                        'theta': bsm[f'{leg}_theta'].tolist()
+                    }
+                surface['raw_points'] = type_fit['raw_points']
+                if type_fit['svi'] is not None:
+                    surface['svi_params'] = type_fit['svi'].to_dict()
+
+                surfaces[option_type] = surface
+
+            except Exception as e:
+                logger.error(f"Failed to create surface grid for {option_type}: {e}")
+                surfaces[option_type] = None
+
+        # Return complete surface data
+        return {
+            'ticker': fit['ticker'],
+            'spot_price': fit['spot_price'],
+            'risk_free_rate': fit['risk_free_rate'],
+            'dividend_yield': fit['dividend_yield'],
+            'surfaces': surfaces,
+            'grid': {'n_T': n_T, 'n_K': n_K, 'compact': bool(compact), 'greeks': bool(greeks)},
+            'timestamp': fit['timestamp']
+        }
+
+    def calculate_surface(self, ticker, risk_free_rate=None, dividend_yield=None,
+                         min_expiry_index=0, max_expiry_index=10, method='griddata',
+                         n_T=DEFAULT_GRID_SIZE, n_K=DEFAULT_GRID_SIZE,
+                         T_range=None, K_range=None, compact=False, greeks=False):
+        """
+        Calculate IV surface for both calls and puts.
+
+        Args:
+            ticker: Stock ticker symbol
+            risk_free_rate: Risk-free rate (if None, fetches from ^TNX)
+            dividend_yield: Dividend yield (if None, fetches from ticker info)
+            min_expiry_index: Starting index for expiration dates
+            max_expiry_index: Ending index for expiration dates
+            method: 'griddata' (linear triangulation) or 'svi' (per-expiry SVI smiles)
+            n_T, n_K, T_range, K_range, compact, greeks: Grid options, see evaluate_surface
+
+        Returns:
+            dict: Contains surface data for calls and puts
+        """
+        fit = self.fit_surface(ticker, risk_free_rate, dividend_yield,
+                               min_expiry_index, max_expiry_index, method)
+        return self.evaluate_surface(fit, n_T, n_K, T_range, K_range, compact, greeks)
+
 
 # Create singleton instance
 iv_calculator = IVSurfaceCalculator()
@@ -326,4 +449,68 @@ def get_iv_surface_data(ticker, **kwargs):
     Returns:
         dict: IV surface data for both calls and puts
     """
-    return iv_calculator.calculate_surface(ticker, **kwargs)
\ No newline at end of file
+    return iv_calculator.calculate_surface(ticker, **kwargs)
+
+
+def fit_iv_surface(ticker, **kwargs):
+    """
+    Convenience function to fit an IV surface for later grid evaluation.
+
+    Args:
+        ticker: Stock ticker symbol
+        **kwargs: Additional arguments for fit_surface
+
+    Returns:
+        dict: Fitted surface state (not JSON-serializable)
+    """
+    return iv_calculator.fit_surface(ticker, **kwargs)
+
+
+def evaluate_iv_surface(fit, **kwargs):
+    """
+    Convenience function to evaluate a fitted IV surface on a grid.
+
+    Args:
+        fit: Output of fit_iv_surface
+        **kwargs: Additional arguments for evaluate_surface
+
+    Returns:
+        dict: IV surface data for both calls and puts
+    """
+    return iv_calculator.evaluate_surface(fit, **kwargs)
+
+
+def encode_fit(fit):
+    """
+    Serialize a fit_iv_surface result to compressed JSON bytes.
+
+    Float arrays round-trip exactly (JSON floats use repr), so a decoded fit
+    evaluates to the same grids.
+    """
+    fits = {}
+    for option_type, slice_fit in fit['fits'].items():
+        if slice_fit is None:
+            fits[option_type] = None
+            continue
+        fits[option_type] = {
+            **slice_fit,
+            'points': slice_fit['points'].tolist(),
+            'iv': slice_fit['iv'].tolist(),
+            'svi': slice_fit['svi'].to_dict() if slice_fit['svi'] is not None else None
+        }
+    return zlib.compress(json.dumps({**fit, 'fits': fits}).encode(), 1)
+
+
+def decode_fit(data):
+    """Rebuild a fit from encode_fit output."""
+    fit = json.loads(zlib.decompress(data))
+    for option_type, slice_fit in fit['fits'].items():
+        if slice_fit is None:
+            continue
+        slice_fit['points'] = np.array(slice_fit['points'], dtype=float).reshape(-1, 2)
+        slice_fit['iv'] = np.array(slice_fit['iv'], dtype=float)
+        slice_fit['T_range'] = tuple(slice_fit['T_range'])
+        slice_fit['K_range'] = tuple(slice_fit['K_range'])
+        if slice_fit['svi'] is not None:
+            slice_fit['svi'] = SVISurface.from_dict(slice_fit['svi'])
+    return fit
@@ -0,0 +1,385 @@
+"""
+Monte Carlo Pricing Module
+Prices European calls and puts from one shared set of terminal draws, with
+antithetic variates, a discounted-terminal-price control variate and
+fixed-size path chunks so memory stays bounded for any number of paths.
+Paths are split into fixed blocks with SeedSequence.spawn streams, so blocks
+can run on a thread or process pool and still merge to a reproducible result.
+Draws come from a pseudo-random Generator or from scrambled Sobol points
+(randomized QMC), with multi-step paths built by Brownian bridge
+"""
+
+import threading
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from scipy.special import ndtri
+from scipy.stats import qmc
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Paths x contracts simulated per chunk (bounds peak memory to a few arrays of this size)
+MAX_CHUNK_ELEMENTS = 1 << 20
+
+# Paths per chunk for a single contract
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Draws per independently seeded block (the unit of parallel work and of budget checks)
+BLOCK_DRAWS = 1 << 16
+
+EXECUTORS = ('thread', 'process')
+
+# 'pseudo': PCG64 normals; 'sobol': scrambled Sobol points through the inverse normal CDF
+GENERATORS = ('pseudo', 'sobol')
+
+# Independently scrambled Sobol replicates used for the randomized-QMC error estimate
+DEFAULT_QMC_REPLICATES = 16
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class MCAccumulator:
+    """
+    Running sums of per-sample call/put present values and the control variate.
+
+    Sums (not means) are kept so accumulators of independent chunks can be
+    merged in any order and still produce the same estimate.
+    """
+
+    def __init__(self, shape=()):
+        self.n = 0
+        self.sums = {name: np.zeros(shape) for name in
+                     ('call', 'put', 'control', 'call_sq', 'put_sq', 'control_sq',
+                      'call_control', 'put_control')}
+
+    def update(self, call_pv: np.ndarray, put_pv: np.ndarray, control: np.ndarray):
+        """Add samples; arrays have the sample dimension first."""
+        self.n += call_pv.shape[0]
+        s = self.sums
+        s['call'] += call_pv.sum(axis=0)
+        s['put'] += put_pv.sum(axis=0)
+        s['control'] += control.sum(axis=0)
+        s['call_sq'] += np.einsum('i...,i...->...', call_pv, call_pv)
+        s['put_sq'] += np.einsum('i...,i...->...', put_pv, put_pv)
+        s['control_sq'] += np.einsum('i...,i...->...', control, control)
+        s['call_control'] += np.einsum('i...,i...->...', call_pv, control)
+        s['put_control'] += np.einsum('i...,i...->...', put_pv, control)
+
+    def merge(self, other: 'MCAccumulator') -> 'MCAccumulator':
+        """Fold another accumulator into this one."""
+        self.n += other.n
+        for name, value in other.sums.items():
+            self.sums[name] = self.sums[name] + value
+        return self
+
+    def estimate(self, control_mean, control_variate: bool = True) -> Dict:
+        """
+        Call and put estimates with their standard errors.
+
+        Args:
+            control_mean: Known expectation of the control variate
+            control_variate: Apply the optimal-beta control variate adjustment
+        """
+        n = self.n
+        s = self.sums
+        mean_x = s['control'] / n
+        var_x = np.maximum(s['control_sq'] / n - mean_x ** 2, 0.0)
+
+        result = {}
+        for leg in ('call', 'put'):
+            mean_y = s[leg] / n
+            var_y = np.maximum(s[f'{leg}_sq'] / n - mean_y ** 2, 0.0)
+            if control_variate:
+                cov_xy = s[f'{leg}_control'] / n - mean_x * mean_y
+                beta = np.divide(cov_xy, var_x, out=np.zeros_like(cov_xy), where=var_x > 0)
+                mean_y = mean_y - beta * (mean_x - control_mean)
+                var_y = np.maximum(var_y - beta * cov_xy, 0.0)
+            correction = n / (n - 1) if n > 1 else 1.0
+            result[f'{leg}_price'] = mean_y
+            result[f'{leg}_stderr'] = np.sqrt(var_y * correction / n)
+        return result
+
+
+def make_normal_source(seed_seq: np.random.SeedSequence, generator: str = 'pseudo', dimension: int = 1):
+    """
+    Random source for one block: a PCG64 Generator, or a scrambled Sobol
+    engine of the given dimension whose scramble is seeded from seed_seq.
+    """
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    if generator == 'sobol':
+        return qmc.Sobol(d=dimension, scramble=True, seed=rng)
+    return rng
+
+
+def standard_normals(source, n: int, dimension: int = 1) -> np.ndarray:
+    """
+    n draws of a standard normal vector, shape (n, dimension).
+
+    Sobol draws should come in powers of two to keep the sequence balanced.
+    """
+    if isinstance(source, qmc.QMCEngine):
+        u = source.random(n)
+        return ndtri(np.clip(u, 1e-12, 1 - 1e-12))
+    return source.standard_normal((n, dimension))
+
+
+def brownian_bridge(z: np.ndarray, T: float) -> np.ndarray:
+    """
+    Brownian motion at n_steps equally spaced dates from normals in bridge order.
+
+    Row 0 of z fixes the terminal value, later rows fill in midpoints, so with
+    Sobol points the leading (best distributed) dimensions carry most of the
+    path variance.
+
+    Args:
+        z: Standard normals of shape (n_steps, n_paths)
+        T: Horizon in years
+
+    Returns:
+        W of shape (n_steps, n_paths) at times T/n_steps, ..., T
+    """
+    n_steps = z.shape[0]
+    times = T * np.arange(1, n_steps + 1) / n_steps
+    W = np.empty_like(z)
+    W[-1] = np.sqrt(T) * z[0]
+
+    # Breadth-first bisection of (left, right) index intervals; -1 is time 0 (W = 0)
+    intervals = deque([(-1, n_steps - 1)])
+    k = 1
+    while intervals:
+        left, right = intervals.popleft()
+        if right - left < 2:
+            continue
+        mid = (left + right) // 2
+        t_left = times[left] if left >= 0 else 0.0
+        t_mid, t_right = times[mid], times[right]
+        span = t_right - t_left
+        W[mid] = (t_mid - t_left) / span * W[right] + np.sqrt((t_mid - t_left) * (t_right - t_mid) / span) * z[k]
+        if left >= 0:
+            W[mid] += (t_right - t_mid) / span * W[left]
+        k += 1
+        intervals.append((left, mid))
+        intervals.append((mid, right))
+    return W
+
+
+def simulate_chunk(acc: MCAccumulator, rng, n_draws: int,
+                   S0, K, T, r, sigma, q, antithetic: bool = True):
+    """
+    Simulate n_draws normal draws (2 * n_draws paths when antithetic) and add them to acc.
+
+    Contract parameters are broadcast over a trailing axis; every contract
+    shares the same draws (common random numbers). rng is a Generator or a
+    one-dimensional Sobol engine.
+    """
+    z = standard_normals(rng, n_draws)
+
+    drift = (r - q - 0.5 * sigma ** 2) * T
+    vol = sigma * np.sqrt(T)
+    discount = np.exp(-r * T)
+
+    S_T = S0 * np.exp(drift + vol * z)
+    call_pv = np.maximum(S_T - K, 0.0)
+    put_pv = np.maximum(K - S_T, 0.0)
+    control = S_T
+
+    if antithetic:
+        # Average each draw with its mirror; the pair mean is one i.i.d. sample
+        S_T = S0 * np.exp(drift - vol * z)
+        call_pv = 0.5 * (call_pv + np.maximum(S_T - K, 0.0))
+        put_pv = 0.5 * (put_pv + np.maximum(K - S_T, 0.0))
+        control = 0.5 * (control + S_T)
+
+    acc.update(call_pv * discount, put_pv * discount, control * discount)
+
+
+def _simulate_block(seed_seq: np.random.SeedSequence, n_draws: int, params, antithetic: bool,
+                    chunk_size: int, generator: str = 'pseudo') -> MCAccumulator:
+    """Simulate one seeded block (a Sobol replicate for QMC) in chunks (runs on pool workers)."""
+    rng = make_normal_source(seed_seq, generator)
+    acc = MCAccumulator(params[0].shape[1])
+    remaining = n_draws
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        simulate_chunk(acc, rng, size, *params, antithetic=antithetic)
+        remaining -= size
+    return acc
+
+
+def _get_pool(executor: str, workers: int):
+    """Shared worker pool per (executor, workers) so requests do not pay pool start-up."""
+    key = (executor, workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if executor == 'process':
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='monte-carlo')
+            _pools[key] = pool
+        return pool
+
+
+def _replicate_estimate(replicates: List[Dict]) -> Dict:
+    """Mean of independent replicate estimates and its standard error."""
+    result = {}
+    for leg in ('call', 'put'):
+        prices = np.stack([rep[f'{leg}_price'] for rep in replicates])
+        result[f'{leg}_price'] = prices.mean(axis=0)
+        if len(replicates) > 1:
+            result[f'{leg}_stderr'] = prices.std(axis=0, ddof=1) / np.sqrt(len(replicates))
+        else:
+            result[f'{leg}_stderr'] = np.full(prices.shape[1:], np.inf)
+    return result
+
+
+def price_european_mc(S0, K, T, r, sigma, q=0.0, n_sim: int = 100000,
+                      antithetic: bool = True, control_variate: bool = True,
+                      rng: Optional[np.random.Generator] = None, seed: Optional[int] = None,
+                      chunk_size: Optional[int] = None, workers: int = 1, executor: str = 'thread',
+                      time_budget: Optional[float] = None,
+                      target_error: Optional[float] = None, generator: str = 'pseudo',
+                      replicates: int = DEFAULT_QMC_REPLICATES) -> Dict:
+    """
+    Price European calls and puts by Monte Carlo from one simulation.
+
+    Draws are generated in blocks of BLOCK_DRAWS, block i seeded by the i-th
+    SeedSequence.spawn child, and merged in block order, so a given seed gives
+    the same result for any worker count. With a target error the run stops at
+    the first block where both standard errors reach it (still reproducible);
+    a time budget stops after the block in progress when it runs out.
+
+    With generator='sobol' each block is an independently scrambled Sobol
+    replicate of 2^m points (the largest power of two that keeps the total
+    within n_sim); the price is the mean over replicates and the standard
+    error comes from their spread (randomized QMC).
+
+    Args:
+        S0, K, T, r, sigma, q: Contract parameters (scalars or broadcastable arrays)
+        n_sim: Number of simulated paths (antithetic pairs count as two); the
+            maximum when a budget is given
+        antithetic: Use antithetic variates
+        control_variate: Use the discounted terminal price (mean S0 * e^(-qT)) as control
+        rng: Optional numpy Generator used to draw the root seed; takes precedence over seed
+        seed: Optional root seed (None = fresh entropy)
+        chunk_size: Draws per chunk inside a block (default sized from MAX_CHUNK_ELEMENTS)
+        workers: Number of pool workers (1 = run in the calling thread)
+        executor: 'thread' or 'process'
+        time_budget: Optional wall-clock budget in seconds
+        target_error: Optional standard error at which to stop (worst contract, call or put)
+        generator: 'pseudo' or 'sobol'
+        replicates: Number of Sobol replicates (generator='sobol' only)
+
+    Returns:
+        dict with call_price, put_price, call_stderr, put_stderr (floats for
+        scalar inputs, arrays otherwise), the paths used, the root seed and
+        what stopped the run ('paths', 'target_error' or 'time_budget')
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Invalid executor '{executor}'. Must be one of: {', '.join(EXECUTORS)}")
+    if generator not in GENERATORS:
+        raise ValueError(f"Invalid generator '{generator}'. Must be one of: {', '.join(GENERATORS)}")
+
+    started = time.perf_counter()
+    S0, K, T, r, sigma, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S0, K, T, r, sigma, q)))
+    shape = K.shape
+    params = [x.reshape(1, -1) for x in (S0, K, T, r, sigma, q)]
+    n_contracts = params[0].shape[1]
+    control_mean = params[0][0] * np.exp(-params[5][0] * params[2][0])
+
+    if rng is not None:
+        seed = int(rng.integers(2 ** 63))
+    seed_seq = np.random.SeedSequence(seed)
+
+    n_sim = max(int(n_sim), 2)
+    n_draws = (n_sim + 1) // 2 if antithetic else n_sim
+    if chunk_size is None:
+        chunk_size = min(DEFAULT_CHUNK_SIZE, max(1, MAX_CHUNK_ELEMENTS // n_contracts))
+
+    if generator == 'sobol':
+        # One block per replicate, each a power of two of Sobol points, rounded
+        # down so the run never exceeds n_sim (at least one point per replicate)
+        n_blocks = max(int(replicates), 2)
+        block_draws = 1 << int(np.log2(max(n_draws // n_blocks, 1)))
+        block_sizes = [block_draws] * n_blocks
+        chunk_size = 1 << int(np.log2(chunk_size))
+    else:
+        n_blocks = -(-n_draws // BLOCK_DRAWS)
+        block_sizes = [min(BLOCK_DRAWS, n_draws - i * BLOCK_DRAWS) for i in range(n_blocks)]
+    block_seeds = seed_seq.spawn(n_blocks)
+
+    acc = MCAccumulator(n_contracts)
+    replicate_estimates = []
+    stopped_by = 'paths'
+
+    def add_block(block: MCAccumulator):
+        acc.merge(block)
+        if generator == 'sobol':
+            replicate_estimates.append(block.estimate(control_mean, control_variate))
+
+    def current_estimate() -> Dict:
+        if generator == 'sobol':
+            return _replicate_estimate(replicate_estimates)
+        return acc.estimate(control_mean, control_variate)
+
+    def budget_reached() -> Optional[str]:
+        if target_error is not None:
+            estimate = current_estimate()
+            worst = max(estimate['call_stderr'].max(), estimate['put_stderr'].max())
+            if worst <= target_error:
+                return 'target_error'
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            # Randomized QMC needs two replicates for an error estimate
+            if generator == 'pseudo' or len(replicate_estimates) >= 2:
+                return 'time_budget'
+        return None
+
+    if workers <= 1:
+        for i in range(n_blocks):
+            add_block(_simulate_block(block_seeds[i], block_sizes[i], params, antithetic,
+                                      chunk_size, generator))
+            reason = budget_reached() if i < n_blocks - 1 else None
+            if reason:
+                stopped_by = reason
+                break
+    else:
+        pool = _get_pool(executor, workers)
+        pending = deque()
+        next_block = 0
+        while pending or next_block < n_blocks:
+            # Keep every worker busy with one block queued behind it
+            while next_block < n_blocks and len(pending) < 2 * workers:
+                pending.append(pool.submit(_simulate_block, block_seeds[next_block],
+                                           block_sizes[next_block], params, antithetic,
+                                           chunk_size, generator))
+                next_block += 1
+            add_block(pending.popleft().result())
+            reason = budget_reached() if pending or next_block < n_blocks else None
+            if reason:
+                stopped_by = reason
+                for future in pending:
+                    future.cancel()
+                break
+
+    estimate = current_estimate()
+
+    result = {key: (float(value[0]) if shape == () else value.reshape(shape))
+              for key, value in estimate.items()}
+    result.update({
+        'n_paths': acc.n * 2 if antithetic else acc.n,
+        'antithetic': antithetic,
+        'control_variate': control_variate,
+        'generator': generator,
+        'seed': seed_seq.entropy,
+        'workers': max(int(workers), 1),
+        'stopped_by': stopped_by,
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    })
+    if generator == 'sobol':
+        result['replicates'] = len(replicate_estimates)
+    return result
@@ -0,0 +1,188 @@
+"""
+Option Chain Cache Module
+Shared in-process cache of Yahoo Finance option data: chains per
+(ticker, expiry) with a short TTL, and expiration lists, spot quotes,
+dividend yields and the risk-free rate with their own TTLs. Every actual
+chain fetch is recorded in the option snapshot store
+"""
+
+import threading
+import time
+import logging
+import numpy as np
+import yfinance as yf
+from typing import Callable, Dict, Hashable, Optional, Tuple, Any
+from src.config import (
+    OPTION_CHAIN_TTL, OPTION_REFERENCE_TTL, OPTION_CHAIN_CACHE_SIZE, SPOT_PRICE_TTL
+)
+from src.database.option_snapshots import record_option_chain
+
+logger = logging.getLogger(__name__)
+
+# Fetch locks are striped by key hash, so their number stays fixed however many keys are seen
+KEY_LOCK_STRIPES = 64
+
+
+class OptionChainCache:
+    """TTL cache in front of yfinance for option chains and reference data."""
+
+    def __init__(self, chain_ttl: float = OPTION_CHAIN_TTL,
+                 reference_ttl: float = OPTION_REFERENCE_TTL,
+                 spot_ttl: float = SPOT_PRICE_TTL, max_chains: int = OPTION_CHAIN_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            chain_ttl: Seconds a fetched (ticker, expiry) chain is reused
+            reference_ttl: Seconds expiration lists, dividend yields and the risk-free rate are reused
+            spot_ttl: Seconds a spot quote is reused
+            max_chains: Maximum cached chains (oldest evicted first)
+        """
+        self.chain_ttl = chain_ttl
+        self.reference_ttl = reference_ttl
+        self.spot_ttl = spot_ttl
+        self.max_chains = max_chains
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._key_locks = [threading.Lock() for _ in range(KEY_LOCK_STRIPES)]
+        self.stats = {'hits': 0, 'misses': 0, 'fetch_errors': 0}
+
+    def _get(self, key: Hashable, ttl: float, fetch: Callable[[], Any]) -> Any:
+        """
+        Return a fresh cached value or fetch it once.
+
+        Concurrent misses on the same key wait for a single fetch (keys in the
+        same lock stripe also wait for each other). Failed fetches raise and
+        are not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] < ttl:
+                self.stats['hits'] += 1
+                return entry[0]
+            key_lock = self._key_locks[hash(key) % KEY_LOCK_STRIPES]
+
+        with key_lock:
+            # Another thread may have fetched it while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.time() - entry[1] < ttl:
+                    self.stats['hits'] += 1
+                    return entry[0]
+                self.stats['misses'] += 1
+
+            try:
+                value = fetch()
+            except Exception:
+                with self._lock:
+                    self.stats['fetch_errors'] += 1
+                raise
+
+            with self._lock:
+                self._entries[key] = (value, time.time())
+                self._evict_chains()
+            return value
+
+    def _evict_chains(self):
+        """Drop the oldest chains beyond max_chains (caller holds the lock)."""
+        chain_keys = [key for key in self._entries if key[0] == 'chain']
+        excess = len(chain_keys) - self.max_chains
+        if excess > 0:
+            for key in sorted(chain_keys, key=lambda k: self._entries[k][1])[:excess]:
+                del self._entries[key]
+
+    def get_expirations(self, ticker: str) -> Tuple[str, ...]:
+        """Listed expiration dates (empty when the ticker has no options)."""
+        ticker = ticker.upper()
+        return self._get(('expirations', ticker), self.reference_ttl,
+                         lambda: tuple(yf.Ticker(ticker).options or ()))
+
+    def get_chain(self, ticker: str, expiry: str, spot_price: Optional[float] = None,
+                  asof: Optional[str] = None):
+        """
+        Calls and puts for one expiry; treat the returned frames as read-only.
+
+        Args:
+            ticker: Stock ticker symbol
+            expiry: Expiration date (YYYY-MM-DD)
+            spot_price: Spot stored with the snapshot when the chain is actually fetched
+            asof: Snapshot timestamp shared by one multi-expiry fetch
+
+        Returns:
+            (calls, puts) DataFrames with yfinance column names
+        """
+        ticker = ticker.upper()
+
+        def fetch():
+            chain = yf.Ticker(ticker).option_chain(expiry)
+            # Persist every fetched chain for offline recomputation
+            record_option_chain(ticker, expiry, chain.calls, chain.puts, asof=asof,
+                                spot_price=spot_price)
+            return chain.calls, chain.puts
+
+        return self._get(('chain', ticker, expiry), self.chain_ttl, fetch)
+
+    def get_spot_price(self, ticker: str) -> float:
+        """
+        Current price from fast_info (one quote request), falling back to the last daily close.
+
+        Raises:
+            ValueError: If no price is available
+        """
+        ticker = ticker.upper()
+
+        def fetch():
+            stock = yf.Ticker(ticker)
+            spot_price = None
+            try:
+                spot_price = stock.fast_info['lastPrice']
+            except Exception as e:
+                logger.warning(f"fast_info price unavailable for {ticker}: {e}")
+
+            if not spot_price or not np.isfinite(spot_price):
+                hist = stock.history(period='1d')
+                if hist.empty:
+                    raise ValueError(f'Could not fetch current price for {ticker}')
+                spot_price = hist['Close'].iloc[-1]
+            return float(spot_price)
+
+        return self._get(('spot', ticker), self.spot_ttl, fetch)
+
+    def get_dividend_yield(self, ticker: str) -> float:
+        """Dividend yield from the ticker info (0 when not reported)."""
+        ticker = ticker.upper()
+        return self._get(('dividend_yield', ticker), self.reference_ttl,
+                         lambda: float(yf.Ticker(ticker).info.get('dividendYield', 0) or 0))
+
+    def get_risk_free_rate(self) -> float:
+        """10-year Treasury yield (^TNX) as a decimal."""
+        return self._get(('risk_free_rate',), self.reference_ttl,
+                         lambda: float(yf.Ticker('^TNX').history(period='1d')['Close'].iloc[-1] / 100))
+
+    def invalidate(self, ticker: Optional[str] = None):
+        """Drop cached entries for one ticker, or everything."""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                return
+            ticker = ticker.upper()
+            for key in [k for k in self._entries if len(k) > 1 and k[1] == ticker]:
+                del self._entries[key]
+
+    def metrics(self) -> Dict:
+        """Hit/miss counters and entry counts by kind."""
+        with self._lock:
+            kinds = {}
+            for key in self._entries:
+                kinds[key[0]] = kinds.get(key[0], 0) + 1
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'entries': kinds
+            }
+
+
+# Create singleton instance
+chain_cache = OptionChainCache()
@@ -0,0 +1,315 @@
+"""
+Portfolio Risk Module
+Value at Risk and Expected Shortfall for weighted multi-asset portfolios:
+historical simulation over overlapping multi-day horizons of date-aligned
+log prices, parametric
+(delta-normal) and Monte Carlo with Cholesky-correlated normals simulated in
+fixed-size chunks. Tail quantiles use np.partition instead of a full sort
+"""
+
+import time
+import logging
+import numpy as np
+from typing import Dict, List, Optional
+from scipy.special import ndtri
+from src.config import VAR_LOOKBACK_DAYS, VAR_MC_SIMULATIONS, VAR_MAX_POSITIONS, VAR_MAX_MC_ELEMENTS
+from src.analysis.correlation_service import stock_entries, load_log_prices
+from src.analysis.monte_carlo import MAX_CHUNK_ELEMENTS
+
+logger = logging.getLogger(__name__)
+
+VAR_METHODS = ('historical', 'parametric', 'monte_carlo')
+
+
+def tail_risk(pnl: np.ndarray, confidence_level: float = 0.95) -> Dict[str, float]:
+    """
+    VaR and Expected Shortfall of P&L (or return) samples.
+
+    The quantile matches np.percentile's linear interpolation, found with two
+    np.partition selections instead of a full sort.
+
+    Args:
+        pnl: Sample P&L, losses negative
+        confidence_level: VaR confidence level
+
+    Returns:
+        dict with var and es as positive losses
+    """
+    pnl = np.asarray(pnl, dtype=float)
+    position = (len(pnl) - 1) * (1 - confidence_level)
+    k = int(np.floor(position))
+    upper = min(k + 1, len(pnl) - 1)
+    part = np.partition(pnl, (k, upper))
+    quantile = part[k] + (position - k) * (part[upper] - part[k])
+    # part[:k + 1] holds the k + 1 smallest samples, i.e. those at or below the quantile
+    return {'var': float(-quantile), 'es': float(-part[:k + 1].mean())}
+
+
+def window_returns(log_prices: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Overlapping log returns between prices horizon rows apart.
+
+    Args:
+        log_prices: (dates x assets) log prices, NaN where missing
+        horizon: Rows per window
+
+    Returns:
+        (dates - horizon, assets) window log returns, NaN where either end is missing
+    """
+    return log_prices[horizon:] - log_prices[:-horizon]
+
+
+def horizon_returns(returns: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Overlapping multi-day log returns from prefix sums.
+
+    Args:
+        returns: (days x assets) daily log returns without gaps
+        horizon: Days per window
+
+    Returns:
+        (days - horizon + 1, assets) summed log returns of every window
+    """
+    return window_returns(np.concatenate((np.zeros((1,) + returns.shape[1:]), np.cumsum(returns, axis=0))),
+                          horizon)
+
+
+def historical_var(log_prices: np.ndarray, weights: np.ndarray, confidence_level: float = 0.95,
+                   horizon: int = 1) -> Dict:
+    """
+    Historical simulation: revalue the portfolio on every overlapping horizon window.
+
+    Windows run between calendar rows horizon apart, so a price missing
+    inside a window does not lose the move across it; windows missing a
+    price at either end for any asset are dropped.
+
+    Args:
+        log_prices: (dates x assets) date-aligned log prices, NaN where missing
+        weights: Portfolio weights (fractions of portfolio value)
+        confidence_level: VaR confidence level
+        horizon: Holding period in days
+
+    Returns:
+        dict with var, es (fractions of portfolio value) and the scenario count
+    """
+    windows = window_returns(log_prices, horizon)
+    windows = windows[np.all(np.isfinite(windows), axis=1)]
+    if len(windows) < 2:
+        raise ValueError(f'Need at least 2 complete {horizon}-day windows of common history for historical VaR')
+    pnl = np.expm1(windows) @ weights
+    return {**tail_risk(pnl, confidence_level), 'n_scenarios': len(pnl)}
+
+
+def parametric_var(mean: np.ndarray, covariance: np.ndarray, weights: np.ndarray,
+                   confidence_level: float = 0.95, horizon: int = 1) -> Dict:
+    """
+    Delta-normal VaR: portfolio return normal with mean h*w'mu and variance h*w'Sigma w.
+
+    Args:
+        mean: Daily mean simple returns
+        covariance: Daily covariance of simple returns
+        weights: Portfolio weights (fractions of portfolio value)
+        confidence_level: VaR confidence level
+        horizon: Holding period in days
+
+    Returns:
+        dict with var, es, portfolio volatility and per-asset component VaR
+    """
+    alpha = 1 - confidence_level
+    z = ndtri(alpha)
+    marginal = covariance @ weights
+    sigma = float(np.sqrt(max(weights @ marginal, 0.0) * horizon))
+    mu = float(weights @ mean * horizon)
+    density = np.exp(-0.5 * z * z) / np.sqrt(2 * np.pi)
+
+    # Euler allocation of the volatility term: components sum to var + mu
+    components = -z * weights * marginal * horizon / sigma if sigma > 0 else np.zeros_like(weights)
+    return {
+        'var': -(mu + z * sigma),
+        'es': -(mu - sigma * density / alpha),
+        'volatility': sigma,
+        'component_var': components
+    }
+
+
+def _factor(covariance: np.ndarray) -> np.ndarray:
+    """Cholesky factor, or a symmetric square root when the covariance is singular."""
+    try:
+        return np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        # More assets than observations (or perfectly correlated ones) leave it only semi-definite
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def monte_carlo_var(mean: np.ndarray, covariance: np.ndarray, weights: np.ndarray,
+                    confidence_level: float = 0.95, horizon: int = 1,
+                    n_sim: int = VAR_MC_SIMULATIONS, seed: Optional[int] = None) -> Dict:
+    """
+    Monte Carlo VaR from correlated normal horizon log returns, revalued exactly.
+
+    Scenarios are drawn in chunks of at most MAX_CHUNK_ELEMENTS normals, so
+    memory stays bounded by the chunk and the n_sim portfolio P&Ls.
+
+    Args:
+        mean: Daily mean log returns
+        covariance: Daily covariance of log returns
+        weights: Portfolio weights (fractions of portfolio value)
+        confidence_level: VaR confidence level
+        horizon: Holding period in days
+        n_sim: Number of scenarios
+        seed: Random seed
+
+    Returns:
+        dict with var, es and the scenario count
+    """
+    n_assets = len(weights)
+    factor = _factor(covariance * horizon).T
+    drift = mean * horizon
+    rng = np.random.default_rng(seed)
+
+    chunk = max(1, MAX_CHUNK_ELEMENTS // n_assets)
+    pnl = np.empty(n_sim)
+    for start in range(0, n_sim, chunk):
+        size = min(chunk, n_sim - start)
+        scenario = rng.standard_normal((size, n_assets)) @ factor
+        scenario += drift
+        np.expm1(scenario, out=scenario)
+        pnl[start:start + size] = scenario @ weights
+    return {**tail_risk(pnl, confidence_level), 'n_scenarios': n_sim}
+
+
+def portfolio_risk_from_prices(log_prices: np.ndarray, weights: np.ndarray, confidence_level: float = 0.95,
+                               horizon: int = 1, methods: Optional[List[str]] = None,
+                               n_sim: int = VAR_MC_SIMULATIONS, seed: Optional[int] = None) -> Dict:
+    """
+    VaR and ES of a portfolio with every requested method.
+
+    Parametric and Monte Carlo moments use the daily returns present for
+    every asset; historical simulation uses every horizon window with both
+    end prices present for every asset (see historical_var).
+
+    Args:
+        log_prices: (dates x assets) date-aligned log prices, NaN where missing
+        weights: Portfolio weights (fractions of portfolio value)
+        confidence_level: VaR confidence level
+        horizon: Holding period in days
+        methods: Names from VAR_METHODS (default all)
+        n_sim: Monte Carlo scenarios
+        seed: Monte Carlo random seed
+
+    Returns:
+        dict: method -> results, with var/es as fractions of portfolio value
+
+    Raises:
+        ValueError: For unknown methods, invalid parameters or too little data
+    """
+    methods = list(methods or VAR_METHODS)
+    unknown = [m for m in methods if m not in VAR_METHODS]
+    if unknown:
+        raise ValueError(f"Unknown method(s): {', '.join(unknown)}")
+    if not 0.5 <= confidence_level < 1:
+        raise ValueError('confidence_level must be in [0.5, 1)')
+    if horizon < 1:
+        raise ValueError('horizon must be at least 1 day')
+
+    weights = np.asarray(weights, dtype=float)
+    log_prices = np.asarray(log_prices, dtype=float)
+    returns = np.diff(log_prices, axis=0)
+    returns = returns[np.all(np.isfinite(returns), axis=1)]
+    if len(returns) < 2:
+        raise ValueError('Not enough common history for the portfolio')
+
+    def moments(values):
+        mean = values.mean(axis=0)
+        centered = values - mean
+        return mean, centered.T @ centered / (len(values) - 1)
+
+    results = {}
+    for method in methods:
+        start = time.perf_counter()
+        if method == 'historical':
+            results[method] = historical_var(log_prices, weights, confidence_level, horizon)
+        elif method == 'parametric':
+            # Portfolio simple returns are linear in the asset simple returns
+            mean, covariance = moments(np.expm1(returns))
+            results[method] = parametric_var(mean, covariance, weights, confidence_level, horizon)
+        else:
+            mean, covariance = moments(returns)
+            results[method] = monte_carlo_var(mean, covariance, weights, confidence_level,
+                                              horizon, n_sim, seed)
+        results[method]['time_ms'] = (time.perf_counter() - start) * 1000
+
+    results['n_obs'] = len(returns)
+    return results
+
+
+def calculate_portfolio_var(weights: Dict[str, float], confidence_level: float = 0.95, horizon: int = 1,
+                            methods: Optional[List[str]] = None, portfolio_value: float = 1.0,
+                            lookback_days: Optional[int] = VAR_LOOKBACK_DAYS,
+                            n_sim: int = VAR_MC_SIMULATIONS, seed: Optional[int] = None,
+                            db_path=None) -> Dict:
+    """
+    VaR and ES of a portfolio of stored tickers.
+
+    Args:
+        weights: ticker -> weight as a fraction of portfolio value (negative for shorts)
+        confidence_level: VaR confidence level
+        horizon: Holding period in days
+        methods: Names from VAR_METHODS (default all)
+        portfolio_value: Portfolio value the results are scaled to
+        lookback_days: Trading days of history (None for full history)
+        n_sim: Monte Carlo scenarios
+        seed: Monte Carlo random seed
+        db_path: Database path (default DATABASE_PATH)
+
+    Returns:
+        dict with the history used and, per method, var/es in portfolio currency
+        and var_pct/es_pct as percentages of portfolio value
+
+    Raises:
+        ValueError: For unknown tickers or methods, invalid parameters, portfolios
+            above VAR_MAX_POSITIONS or Monte Carlo runs above VAR_MAX_MC_ELEMENTS,
+            or too little data
+    """
+    if not weights:
+        raise ValueError('At least one position is required')
+    weights = {ticker.upper(): float(weight) for ticker, weight in weights.items()}
+    tickers = list(weights)
+    if len(tickers) > VAR_MAX_POSITIONS:
+        raise ValueError(f'At most {VAR_MAX_POSITIONS} positions per portfolio')
+    if (methods is None or 'monte_carlo' in methods) and n_sim * len(tickers) > VAR_MAX_MC_ELEMENTS:
+        raise ValueError(f'n_sim x positions must not exceed {VAR_MAX_MC_ELEMENTS:,} '
+                         f'(at most {VAR_MAX_MC_ELEMENTS // len(tickers):,} scenarios for {len(tickers)} positions)')
+    start = time.perf_counter()
+
+    dates, log_prices = load_log_prices(stock_entries(tickers, db_path), lookback_days, db_path)
+    # Return dates with a price change for every asset
+    complete = np.all(np.isfinite(np.diff(log_prices, axis=0)), axis=1)
+    w = np.array([weights[t] for t in tickers])
+    risk = portfolio_risk_from_prices(log_prices, w, confidence_level, horizon, methods, n_sim, seed)
+
+    results = {}
+    for method in (m for m in VAR_METHODS if m in risk):
+        entry = dict(risk[method])
+        entry['var_pct'] = entry['var'] * 100
+        entry['es_pct'] = entry['es'] * 100
+        entry['var'] *= portfolio_value
+        entry['es'] *= portfolio_value
+        if 'volatility' in entry:
+            entry['component_var'] = dict(zip(tickers, (entry['component_var'] * portfolio_value).tolist()))
+        results[method] = entry
+
+    used = dates[1:][complete]
+    return {
+        'tickers': tickers,
+        'weights': weights,
+        'portfolio_value': portfolio_value,
+        'confidence_level': confidence_level,
+        'horizon': horizon,
+        'start_date': used[0] if len(used) else None,
+        'end_date': used[-1] if len(used) else None,
+        'n_obs': risk['n_obs'],
+        'results': results,
+        'time_ms': (time.perf_counter() - start) * 1000
+    }
@@ -0,0 +1,355 @@
+"""
+Pricing Engines Module
+American and path-dependent option pricers: CRR and Leisen-Reimer binomial
+trees with in-place backward induction, Longstaff-Schwartz least-squares Monte
+Carlo for early exercise, and barrier/Asian payoffs simulated in path chunks.
+Every engine prices the call and the put from the same tree or paths.
+Path engines can draw from scrambled Sobol points with Brownian-bridge paths
+"""
+
+import time
+import numpy as np
+from typing import Dict, Optional
+import logging
+from src.analysis.monte_carlo import (
+    GENERATORS, DEFAULT_QMC_REPLICATES, make_normal_source, standard_normals, brownian_bridge
+)
+
+logger = logging.getLogger(__name__)
+
+PRICING_ENGINES = ('binomial_crr', 'binomial_lr', 'american_lsm', 'barrier', 'asian')
+BARRIER_TYPES = ('down-and-out', 'down-and-in', 'up-and-out', 'up-and-in')
+
+DEFAULT_BINOMIAL_STEPS = 501
+MAX_BINOMIAL_STEPS = 5001
+DEFAULT_PATH_STEPS = 50
+DEFAULT_PATH_SIMULATIONS = 50000
+MAX_PATH_ELEMENTS = 20_000_000  # paths x steps per request
+
+# Path x step elements generated per chunk for barrier/Asian payoffs
+PATH_CHUNK_ELEMENTS = 1 << 20
+
+
+def _peizer_pratt(z: float, n: int) -> float:
+    """Peizer-Pratt method 2 inversion used by Leisen-Reimer."""
+    x = z / (n + 1 / 3 + 0.1 / (n + 1))
+    return 0.5 + np.sign(z) * 0.5 * np.sqrt(1 - np.exp(-x * x * (n + 1 / 6)))
+
+
+def binomial_tree(S0: float, K: float, T: float, r: float, sigma: float, q: float = 0.0,
+                  n_steps: int = DEFAULT_BINOMIAL_STEPS, method: str = 'crr',
+                  american: bool = True) -> Dict:
+    """
+    Price a call and a put on a recombining binomial tree.
+
+    Option values are rolled back in place in one array of N+1 nodes, so
+    memory is O(N) and each step is a single vectorized update.
+
+    Args:
+        S0, K, T, r, sigma, q: Contract parameters
+        n_steps: Number of time steps (Leisen-Reimer rounds up to odd)
+        method: 'crr' (Cox-Ross-Rubinstein) or 'lr' (Leisen-Reimer)
+        american: Allow early exercise
+
+    Returns:
+        dict with 'call' and 'put', each holding price, delta and gamma
+    """
+    if method not in ('crr', 'lr'):
+        raise ValueError(f"Invalid tree method '{method}'. Must be 'crr' or 'lr'")
+
+    n = int(n_steps)
+    if method == 'lr' and n % 2 == 0:
+        n += 1
+    dt = T / n
+    growth = np.exp((r - q) * dt)
+    discount = np.exp(-r * dt)
+
+    if method == 'crr':
+        u = np.exp(sigma * np.sqrt(dt))
+        d = 1 / u
+        p = (growth - d) / (u - d)
+    else:
+        d1 = (np.log(S0 / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+        d2 = d1 - sigma * np.sqrt(T)
+        p = _peizer_pratt(d2, n)
+        u = growth * _peizer_pratt(d1, n) / p
+        d = (growth - p * u) / (1 - p)
+
+    log_u, log_d = np.log(u), np.log(d)
+    j = np.arange(n + 1)
+
+    def spots(step):
+        # Node prices at a step: S0 * u^j * d^(step - j), j = 0..step
+        return S0 * np.exp(j[:step + 1] * log_u + (step - j[:step + 1]) * log_d)
+
+    result = {}
+    for option_type, sign in (('call', 1.0), ('put', -1.0)):
+        values = np.maximum(sign * (spots(n) - K), 0.0)
+        saved = {}
+        for step in range(n - 1, -1, -1):
+            values[:step + 1] = discount * (p * values[1:step + 2] + (1 - p) * values[:step + 1])
+            if american:
+                np.maximum(values[:step + 1], sign * (spots(step) - K), out=values[:step + 1])
+            if step <= 2:
+                saved[step] = values[:step + 1].copy()
+
+        s1, s2 = spots(1), spots(2)
+        delta = (saved[1][1] - saved[1][0]) / (s1[1] - s1[0])
+        delta_up = (saved[2][2] - saved[2][1]) / (s2[2] - s2[1])
+        delta_down = (saved[2][1] - saved[2][0]) / (s2[1] - s2[0])
+        gamma = (delta_up - delta_down) / (0.5 * (s2[2] - s2[0]))
+
+        result[option_type] = {
+            'price': float(values[0]),
+            'delta': float(delta),
+            'gamma': float(gamma)
+        }
+
+    result['n_steps'] = n
+    return result
+
+
+def _simulate_paths(rng, n_paths: int, n_steps: int, S0: float, T: float,
+                    r: float, sigma: float, q: float, antithetic: bool = True) -> np.ndarray:
+    """
+    GBM price paths of shape (n_steps, n_paths), excluding S0.
+
+    Time runs along the first axis so each date is a contiguous row. With
+    antithetic variates the second half of the paths mirrors the first.
+    rng is a Generator (paths by cumulative sums) or an n_steps-dimensional
+    Sobol engine (paths by Brownian bridge).
+    """
+    dt = T / n_steps
+    half = (n_paths + 1) // 2 if antithetic else n_paths
+    z = standard_normals(rng, half, n_steps).T
+    if antithetic:
+        z = np.concatenate((z, -z), axis=1)[:, :n_paths]
+
+    drift = (r - q - 0.5 * sigma ** 2) * dt
+    if isinstance(rng, np.random.Generator):
+        log_paths = drift + sigma * np.sqrt(dt) * z
+        np.cumsum(log_paths, axis=0, out=log_paths)
+    else:
+        log_paths = sigma * brownian_bridge(np.ascontiguousarray(z), T)
+        log_paths += drift * np.arange(1, n_steps + 1)[:, np.newaxis]
+    return S0 * np.exp(log_paths, out=log_paths)
+
+
+def _path_source(seed, generator: str, n_steps: int, n_paths: int):
+    """Random source for a path engine and the path count it should use."""
+    if generator not in GENERATORS:
+        raise ValueError(f"Invalid generator '{generator}'. Must be one of: {', '.join(GENERATORS)}")
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    source = make_normal_source(seed_seq, generator, n_steps)
+    if generator == 'sobol':
+        # Antithetic pairs of a power-of-two Sobol sample, rounded down to stay within the path limits
+        n_paths = 2 * (1 << int(np.log2(max(n_paths // 2, 1))))
+    return source, n_paths
+
+
+def longstaff_schwartz(S0: float, K: float, T: float, r: float, sigma: float, q: float = 0.0,
+                       n_paths: int = DEFAULT_PATH_SIMULATIONS, n_steps: int = DEFAULT_PATH_STEPS,
+                       degree: int = 3, seed: Optional[int] = None,
+                       generator: str = 'pseudo') -> Dict:
+    """
+    American call and put prices by Longstaff-Schwartz least-squares Monte Carlo.
+
+    Continuation values are regressed on a polynomial in S/K over in-the-money
+    paths at each exercise date. Both options share one set of paths. With
+    Sobol paths the reported stderr is the (conservative) i.i.d. formula.
+
+    Returns:
+        dict with 'call' and 'put', each holding price and stderr
+    """
+    rng, n_paths = _path_source(seed, generator, n_steps, n_paths)
+    paths = _simulate_paths(rng, n_paths, n_steps, S0, T, r, sigma, q)
+    discount = np.exp(-r * T / n_steps)
+
+    result = {}
+    for option_type, sign in (('call', 1.0), ('put', -1.0)):
+        # Cash flow of each path, valued at the current exercise date
+        cash = np.maximum(sign * (paths[-1] - K), 0.0)
+        for step in range(n_steps - 2, -1, -1):
+            cash *= discount
+            exercise = np.maximum(sign * (paths[step] - K), 0.0)
+            itm = np.flatnonzero(exercise > 0)
+            if itm.size > degree + 1:
+                # Basis rows 1, x, x^2, ... and the (degree+1)^2 normal equations
+                x = paths[step, itm] / K
+                basis = np.empty((degree + 1, itm.size))
+                basis[0] = 1.0
+                for power in range(1, degree + 1):
+                    np.multiply(basis[power - 1], x, out=basis[power])
+                coeffs = np.linalg.lstsq(basis @ basis.T, basis @ cash[itm], rcond=None)[0]
+                continuation = coeffs @ basis
+                exercise_itm = exercise[itm]
+                exercise_now = exercise_itm > continuation
+                cash[itm[exercise_now]] = exercise_itm[exercise_now]
+        cash *= discount
+
+        immediate = max(sign * (S0 - K), 0.0)
+        price = max(float(cash.mean()), immediate)
+        result[option_type] = {
+            'price': price,
+            'stderr': float(cash.std(ddof=1) / np.sqrt(n_paths))
+        }
+
+    result['n_paths'] = n_paths
+    result['n_steps'] = n_steps
+    result['generator'] = generator
+    return result
+
+
+def path_dependent_mc(S0: float, K: float, T: float, r: float, sigma: float, q: float = 0.0,
+                      payoff: str = 'asian', barrier: Optional[float] = None,
+                      barrier_type: str = 'down-and-out', n_paths: int = DEFAULT_PATH_SIMULATIONS,
+                      n_steps: int = DEFAULT_PATH_STEPS, seed: Optional[int] = None,
+                      generator: str = 'pseudo', replicates: int = DEFAULT_QMC_REPLICATES) -> Dict:
+    """
+    Barrier or arithmetic-average Asian call and put prices by Monte Carlo.
+
+    Paths are generated and reduced in chunks of PATH_CHUNK_ELEMENTS, so memory
+    is bounded regardless of the number of paths. Barriers are monitored at
+    each of the n_steps dates. With generator='sobol' the paths are split into
+    independently scrambled replicates and the stderr comes from their spread.
+
+    Args:
+        payoff: 'asian' or 'barrier'
+        barrier: Barrier level (required for barrier payoffs)
+        barrier_type: One of BARRIER_TYPES
+        generator: 'pseudo' or 'sobol'
+        replicates: Number of Sobol replicates
+
+    Returns:
+        dict with 'call' and 'put', each holding price and stderr
+    """
+    if payoff not in ('asian', 'barrier'):
+        raise ValueError(f"Invalid payoff '{payoff}'. Must be 'asian' or 'barrier'")
+    if payoff == 'barrier':
+        if barrier is None or barrier <= 0:
+            raise ValueError('A positive barrier level is required for barrier options')
+        if barrier_type not in BARRIER_TYPES:
+            raise ValueError(f"Invalid barrier_type '{barrier_type}'. Must be one of: {', '.join(BARRIER_TYPES)}")
+
+    discount = np.exp(-r * T)
+
+    def simulate(source, n: int, chunk: int) -> Dict:
+        # Discounted payoff sums over n paths drawn chunk by chunk
+        sums = {'call': 0.0, 'put': 0.0, 'call_sq': 0.0, 'put_sq': 0.0}
+        remaining = n
+        while remaining > 0:
+            size = min(chunk, remaining)
+            paths = _simulate_paths(source, size, n_steps, S0, T, r, sigma, q)
+
+            if payoff == 'asian':
+                underlying = paths.mean(axis=0)
+                alive = None
+            else:
+                underlying = paths[-1]
+                if barrier_type.startswith('down'):
+                    crossed = (paths.min(axis=0) <= barrier) | (S0 <= barrier)
+                else:
+                    crossed = (paths.max(axis=0) >= barrier) | (S0 >= barrier)
+                alive = ~crossed if barrier_type.endswith('out') else crossed
+
+            for option_type, sign in (('call', 1.0), ('put', -1.0)):
+                values = np.maximum(sign * (underlying - K), 0.0) * discount
+                if alive is not None:
+                    values = np.where(alive, values, 0.0)
+                sums[option_type] += values.sum()
+                sums[f'{option_type}_sq'] += values @ values
+
+            remaining -= size
+        return sums
+
+    chunk = max(2, PATH_CHUNK_ELEMENTS // n_steps)
+    result = {}
+    if generator == 'sobol':
+        replicates = max(int(replicates), 2)
+        seeds = np.random.SeedSequence(seed).spawn(replicates)
+        per_replicate = max(n_paths // replicates, 2)
+        sources = []
+        for child in seeds:
+            source, per_replicate_paths = _path_source(child, generator, n_steps, per_replicate)
+            sources.append(source)
+        chunk = 2 * (1 << int(np.log2(max(chunk // 2, 1))))
+        estimates = [simulate(source, per_replicate_paths, chunk) for source in sources]
+        n_paths = per_replicate_paths * replicates
+        for option_type in ('call', 'put'):
+            prices = np.array([est[option_type] for est in estimates]) / per_replicate_paths
+            result[option_type] = {
+                'price': float(prices.mean()),
+                'stderr': float(prices.std(ddof=1) / np.sqrt(replicates))
+            }
+        result['replicates'] = replicates
+    else:
+        source, n_paths = _path_source(seed, generator, n_steps, n_paths)
+        sums = simulate(source, n_paths, chunk)
+        for option_type in ('call', 'put'):
+            mean = sums[option_type] / n_paths
+            var = max(sums[f'{option_type}_sq'] / n_paths - mean ** 2, 0.0) * n_paths / max(n_paths - 1, 1)
+            result[option_type] = {'price': float(mean), 'stderr': float(np.sqrt(var / n_paths))}
+
+    result['n_paths'] = n_paths
+    result['n_steps'] = n_steps
+    result['generator'] = generator
+    return result
+
+
+def _parse_bool(value, name: str) -> bool:
+    """Boolean option from JSON: true/false, 0/1 or their string forms."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false', '1', '0'):
+        return value.strip().lower() in ('true', '1')
+    raise ValueError(f'{name} must be true or false')
+
+
+def run_pricing_engine(engine: str, S0: float, K: float, T: float, r: float, sigma: float,
+                       q: float = 0.0, options: Optional[Dict] = None) -> Dict:
+    """
+    Run one named engine and time it.
+
+    Args:
+        engine: One of PRICING_ENGINES
+        options: Engine settings (binomial_steps, american, path_simulations,
+            path_steps, seed, generator, barrier, barrier_type)
+
+    Returns:
+        Engine result with 'call', 'put' and 'time_ms'
+    """
+    options = options or {}
+    seed = options.get('seed')
+    generator = options.get('generator', 'pseudo')
+    n_paths = int(options.get('path_simulations', DEFAULT_PATH_SIMULATIONS))
+    n_steps = int(options.get('path_steps', DEFAULT_PATH_STEPS))
+
+    if engine in ('american_lsm', 'barrier', 'asian'):
+        if n_paths < 2 or n_steps < 1 or n_paths * n_steps > MAX_PATH_ELEMENTS:
+            raise ValueError(f'path_simulations x path_steps must be between 2 and {MAX_PATH_ELEMENTS}')
+
+    started = time.perf_counter()
+    if engine in ('binomial_crr', 'binomial_lr'):
+        n_tree = int(options.get('binomial_steps', DEFAULT_BINOMIAL_STEPS))
+        if not 2 < n_tree <= MAX_BINOMIAL_STEPS:
+            raise ValueError(f'binomial_steps must be between 3 and {MAX_BINOMIAL_STEPS}')
+        result = binomial_tree(S0, K, T, r, sigma, q, n_steps=n_tree,
+                               method=engine.split('_')[1],
+                               american=_parse_bool(options.get('american', True), 'american'))
+    elif engine == 'american_lsm':
+        result = longstaff_schwartz(S0, K, T, r, sigma, q, n_paths=n_paths, n_steps=n_steps, seed=seed,
+                                    generator=generator)
+    elif engine in ('barrier', 'asian'):
+        barrier = options.get('barrier')
+        result = path_dependent_mc(S0, K, T, r, sigma, q, payoff=engine,
+                                   barrier=float(barrier) if barrier is not None else None,
+                                   barrier_type=options.get('barrier_type', 'down-and-out'),
+                                   n_paths=n_paths, n_steps=n_steps, seed=seed,
+                                   generator=generator)
+    else:
+        raise ValueError(f"Invalid engine '{engine}'. Must be one of: {', '.join(PRICING_ENGINES)}")
+
+    result['time_ms'] = (time.perf_counter() - started) * 1000
+    return result
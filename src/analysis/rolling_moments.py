@@ -0,0 +1,160 @@
+"""
+Rolling Moments Module
+O(n) rolling mean, standard deviation, skewness and excess kurtosis from
+prefix sums of powers of the series. The prefix sums are built once; every
+window length is then a vectorized difference of those sums
+"""
+
+import numpy as np
+from typing import Dict, Iterable
+
+MOMENTS = ('mean', 'std', 'skew', 'kurt')
+
+# Standardized second moment below which a window counts as constant
+ZERO_VARIANCE = 1e-12
+
+# Prefix sums restart every BLOCK_SIZE points to keep them small
+BLOCK_SIZE = 4096
+
+
+class RollingMoments:
+    """
+    Prefix sums of x, x^2, x^3 and x^4 for one series.
+
+    The series is standardized by its own mean and standard deviation, and
+    the prefix sums restart at every block of BLOCK_SIZE points (block totals
+    are kept separately), so differencing them does not lose precision on
+    long series. Skewness and kurtosis use the same
+    bias-corrected estimators as pandas (and the full-sample statistics in
+    VolatilityCalculator); windows shorter than 3 (skew) or 4 (kurtosis)
+    points, and constant windows, give 0.
+    """
+
+    def __init__(self, values, max_order: int = 4):
+        """
+        Build the prefix sums.
+
+        Args:
+            values: 1-D series (e.g. log returns)
+            max_order: Highest power summed (2 for mean/std only, 4 for kurtosis)
+        """
+        x = np.asarray(values, dtype=float).ravel()
+        self.n = x.size
+        self.max_order = max_order
+
+        self._center = float(np.mean(x)) if self.n else 0.0
+        scale = float(np.std(x)) if self.n else 0.0
+        self._scale = scale if scale > 0 else 1.0
+
+        # Prefix p (sum of the first p points) = cumulative[p // BLOCK_SIZE] + local[p];
+        # z is shifted by one so that prefix p ends at z[p]
+        n_blocks = self.n // BLOCK_SIZE + 1
+        z = np.zeros(n_blocks * BLOCK_SIZE)
+        z[1:self.n + 1] = (x - self._center) / self._scale
+
+        self._local = np.empty((max_order, z.size))
+        self._totals = np.zeros((max_order, n_blocks))
+        self._cumulative = np.zeros((max_order, n_blocks))
+        power = np.ones_like(z)
+        for k in range(max_order):
+            power *= z
+            blocks = power.reshape(n_blocks, BLOCK_SIZE)
+            # Local sums exclude the block's first prefix point, which closes the previous block
+            local = np.cumsum(blocks, axis=1)
+            local -= blocks[:, :1]
+            self._totals[k, :-1] = local[:-1, -1] + blocks[1:, 0]
+            self._local[k] = local.ravel()
+            np.cumsum(self._totals[k, :-1], out=self._cumulative[k, 1:])
+
+    def moments(self, window: int, ddof: int = 1, last_only: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Moments of every window of `window` consecutive points.
+
+        Args:
+            window: Window length
+            ddof: Delta degrees of freedom for the standard deviation
+            last_only: Only evaluate the window ending at the last point
+
+        Returns:
+            dict of arrays aligned to the window end (length n - window + 1,
+            or 1 with last_only): 'mean', 'std' and, when the prefix sums
+            allow, 'skew' and 'kurt'. Empty arrays if window > n
+        """
+        if window < 1:
+            raise ValueError('window must be at least 1')
+        if window > self.n:
+            empty = np.array([])
+            return {name: empty for name in MOMENTS[:self.max_order]}
+
+        start = self.n - window if last_only else 0
+        # Raw moments E[z^k] of each window: local differences plus the
+        # totals of the blocks crossed (exact block total for one crossing)
+        raw = self._local[:, start + window:self.n + 1] - self._local[:, start:self.n - window + 1]
+        lo_block = np.arange(start, self.n - window + 1) // BLOCK_SIZE
+        crossed = (np.arange(start + window, self.n + 1) // BLOCK_SIZE) - lo_block
+        if window < BLOCK_SIZE:
+            # Only windows straddling a block boundary need a correction
+            straddle = np.flatnonzero(crossed)
+            raw[:, straddle] += self._totals[:, lo_block[straddle]]
+        else:
+            hi_block = lo_block + crossed
+            raw += np.where(crossed == 1, self._totals[:, lo_block],
+                            self._cumulative[:, hi_block] - self._cumulative[:, lo_block])
+        raw /= window
+
+        mu = raw[0]
+        mu2 = mu * mu
+        m2 = np.maximum(raw[1] - mu2, 0.0)
+        flat = m2 <= ZERO_VARIANCE
+
+        out = {'mean': self._center + self._scale * mu}
+        if window > ddof:
+            out['std'] = self._scale * np.sqrt(m2 * window / (window - ddof))
+        else:
+            out['std'] = np.full(mu.shape, np.nan)
+
+        n = float(window)
+        # 1 / m2, zeroed for constant windows so their skew comes out 0
+        inv_m2 = np.divide(1.0, m2, out=np.zeros_like(m2), where=~flat)
+        if self.max_order >= 3:
+            if window >= 3:
+                m3 = raw[2] - mu * (3 * raw[1] - 2 * mu2)
+                m3 *= inv_m2 * np.sqrt(inv_m2)
+                m3 *= np.sqrt(n * (n - 1)) / (n - 2)
+                out['skew'] = m3
+            else:
+                out['skew'] = np.zeros(mu.shape)
+        if self.max_order >= 4:
+            if window >= 4:
+                m4 = raw[3] - mu * (4 * raw[2] - mu * (6 * raw[1] - 3 * mu2))
+                m4 *= inv_m2 * inv_m2
+                m4 *= (n + 1) * (n - 1) / ((n - 2) * (n - 3))
+                m4 -= 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+                m4[flat] = 0.0
+                out['kurt'] = m4
+            else:
+                out['kurt'] = np.zeros(mu.shape)
+        return out
+
+    def last(self, window: int, ddof: int = 1) -> Dict[str, float]:
+        """Moments of the trailing window as floats (None when window > n)."""
+        return {name: float(values[0]) if values.size else None
+                for name, values in self.moments(window, ddof, last_only=True).items()}
+
+
+def rolling_moments(values, windows: Iterable[int], ddof: int = 1,
+                    max_order: int = 4) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    Rolling moments of one series for several window lengths.
+
+    Args:
+        values: 1-D series
+        windows: Window lengths
+        ddof: Delta degrees of freedom for the standard deviation
+        max_order: 2 for mean/std only, 3 adds skew, 4 adds kurtosis
+
+    Returns:
+        dict: window -> {'mean', 'std', 'skew', 'kurt'} arrays aligned to the window end
+    """
+    engine = RollingMoments(values, max_order)
+    return {int(window): engine.moments(int(window), ddof) for window in windows}
@@ -0,0 +1,202 @@
+"""
+Scenario Engine Module
+Revalues a multi-leg option position over a spot-shock x vol-shock x
+time-decay cube with one broadcast BSM evaluation per leg, and builds the
+position's Greeks ladder across the spot shocks
+"""
+
+import numpy as np
+from typing import Dict, List
+import logging
+from src.analysis.Derivative_basics import bsm_price_greeks
+
+logger = logging.getLogger(__name__)
+
+LEG_TYPES = ('call', 'put', 'stock')
+
+DEFAULT_SPOT_SHOCKS = {'min': -0.3, 'max': 0.3, 'steps': 61}
+DEFAULT_VOL_SHOCKS = {'min': -0.1, 'max': 0.1, 'steps': 21}
+DEFAULT_HORIZON_DAYS = {'min': 0, 'max': 30, 'steps': 31}
+MAX_CUBE_POINTS = 2_000_000  # spot x vol x time points per leg
+
+MIN_VOLATILITY = 1e-4
+DAYS_PER_YEAR = 365
+
+
+def scenario_axis(spec, default: Dict, name: str) -> np.ndarray:
+    """
+    Build one cube axis from an explicit list or a {'min', 'max', 'steps'} range.
+
+    Raises:
+        ValueError: If the axis is empty or malformed
+    """
+    if spec is None:
+        spec = default
+    if isinstance(spec, dict):
+        steps = int(spec.get('steps', default['steps']))
+        if steps < 1:
+            raise ValueError(f'{name} needs at least one step')
+        axis = np.linspace(float(spec.get('min', default['min'])),
+                           float(spec.get('max', default['max'])), steps)
+    else:
+        axis = np.asarray(spec, dtype=float).ravel()
+    if axis.size == 0 or not np.all(np.isfinite(axis)):
+        raise ValueError(f'{name} must contain finite numbers')
+    return axis
+
+
+def _validate_legs(legs: List[Dict], volatility: float) -> List[Dict]:
+    """Normalize legs and fill defaults (quantity 1, base volatility)."""
+    if not legs:
+        raise ValueError('Position needs at least one leg')
+
+    normalized = []
+    for i, leg in enumerate(legs):
+        leg_type = str(leg.get('type', '')).lower()
+        if leg_type not in LEG_TYPES:
+            raise ValueError(f"Leg {i}: type must be one of: {', '.join(LEG_TYPES)}")
+        quantity = float(leg.get('quantity', 1))
+        if leg_type == 'stock':
+            normalized.append({'type': leg_type, 'quantity': quantity})
+            continue
+
+        strike = leg.get('strike')
+        maturity = leg.get('time_to_maturity')
+        if strike is None or maturity is None:
+            raise ValueError(f'Leg {i}: strike and time_to_maturity are required for options')
+        leg_vol = float(leg.get('volatility', volatility))
+        if float(strike) <= 0 or float(maturity) <= 0 or leg_vol <= 0:
+            raise ValueError(f'Leg {i}: strike, time_to_maturity and volatility must be positive')
+        normalized.append({
+            'type': leg_type,
+            'strike': float(strike),
+            'time_to_maturity': float(maturity),
+            'volatility': leg_vol,
+            'quantity': quantity
+        })
+    return normalized
+
+
+def _leg_values(leg: Dict, S, sigma_shift, elapsed, r: float, q: float, greeks: bool = False) -> Dict:
+    """
+    Value (and optionally Greeks) of one unit of a leg on broadcast S, vol shift and elapsed time.
+
+    Expired options are worth their intrinsic value and carry no time Greeks.
+    """
+    if leg['type'] == 'stock':
+        value = np.broadcast_to(S, np.broadcast_shapes(np.shape(S), np.shape(sigma_shift), np.shape(elapsed)))
+        out = {'value': value}
+        if greeks:
+            zeros = np.zeros_like(value)
+            out.update({'delta': np.ones_like(value), 'gamma': zeros, 'vega': zeros, 'theta': zeros})
+        return out
+
+    tau = leg['time_to_maturity'] - elapsed
+    expired = tau <= 0
+    sigma = np.maximum(leg['volatility'] + sigma_shift, MIN_VOLATILITY)
+    bsm = bsm_price_greeks(S, leg['strike'], np.where(expired, 1.0, tau), r, sigma, q)
+
+    sign = 1.0 if leg['type'] == 'call' else -1.0
+    intrinsic = np.maximum(sign * (S - leg['strike']), 0.0)
+    out = {'value': np.where(expired, intrinsic, bsm[f"{leg['type']}_price"])}
+    if greeks:
+        out.update({
+            'delta': np.where(expired, np.where(intrinsic > 0, sign, 0.0), bsm[f"{leg['type']}_delta"]),
+            'gamma': np.where(expired, 0.0, bsm['gamma']),
+            'vega': np.where(expired, 0.0, bsm['vega']),
+            'theta': np.where(expired, 0.0, bsm[f"{leg['type']}_theta"])
+        })
+    return out
+
+
+def run_scenario(spot_price: float, legs: List[Dict], volatility: float = 0.2,
+                 risk_free_rate: float = 0.05, dividend_yield: float = 0.0,
+                 spot_shocks=None, vol_shocks=None, horizon_days=None) -> Dict:
+    """
+    Revalue a position over a spot x vol x time cube.
+
+    Args:
+        spot_price: Current underlying price
+        legs: Position legs: {'type': 'call'|'put'|'stock', 'strike', 'time_to_maturity'
+            (years), 'volatility' (optional, defaults to volatility), 'quantity' (signed)}
+        volatility: Base volatility for legs without their own
+        risk_free_rate: Risk-free rate
+        dividend_yield: Continuous dividend yield
+        spot_shocks: Relative spot moves (list or {'min', 'max', 'steps'})
+        vol_shocks: Absolute volatility shifts (list or range)
+        horizon_days: Days forward (list or range)
+
+    Returns:
+        dict with the axes, the P&L cube (flattened row-major over 'shape'
+        = [spot, vol, time]), its extremes and the Greeks ladder over spot
+    """
+    if spot_price <= 0:
+        raise ValueError('spot_price must be positive')
+    legs = _validate_legs(legs, volatility)
+
+    spot_axis = scenario_axis(spot_shocks, DEFAULT_SPOT_SHOCKS, 'spot_shocks')
+    vol_axis = scenario_axis(vol_shocks, DEFAULT_VOL_SHOCKS, 'vol_shocks')
+    days_axis = scenario_axis(horizon_days, DEFAULT_HORIZON_DAYS, 'horizon_days')
+    if np.any(spot_axis <= -1):
+        raise ValueError('spot_shocks must be greater than -1 (-100%)')
+    if np.any(days_axis < 0):
+        raise ValueError('horizon_days must be non-negative')
+
+    shape = (spot_axis.size, vol_axis.size, days_axis.size)
+    if np.prod(shape) > MAX_CUBE_POINTS:
+        raise ValueError(f'Scenario cube too large ({np.prod(shape)} points, max {MAX_CUBE_POINTS})')
+
+    r, q = risk_free_rate, dividend_yield
+    S = spot_price * (1 + spot_axis)[:, np.newaxis, np.newaxis]
+    sigma_shift = vol_axis[np.newaxis, :, np.newaxis]
+    elapsed = (days_axis / DAYS_PER_YEAR)[np.newaxis, np.newaxis, :]
+
+    base_value = 0.0
+    pnl = np.zeros(shape)
+    ladder = {name: np.zeros(spot_axis.size) for name in ('value', 'delta', 'gamma', 'vega', 'theta')}
+    S_ladder = spot_price * (1 + spot_axis)
+
+    for leg in legs:
+        qty = leg['quantity']
+        base = _leg_values(leg, spot_price, 0.0, 0.0, r, q)['value']
+        base_value += qty * float(base)
+        pnl += qty * (_leg_values(leg, S, sigma_shift, elapsed, r, q)['value'] - base)
+
+        # Greeks ladder: today, unshifted vol, across the spot shocks
+        leg_ladder = _leg_values(leg, S_ladder, 0.0, 0.0, r, q, greeks=True)
+        for name in ladder:
+            ladder[name] += qty * leg_ladder[name]
+
+    worst = np.unravel_index(np.argmin(pnl), shape)
+    best = np.unravel_index(np.argmax(pnl), shape)
+
+    def point(index):
+        return {
+            'pnl': float(pnl[index]),
+            'spot_shock': float(spot_axis[index[0]]),
+            'vol_shock': float(vol_axis[index[1]]),
+            'days': float(days_axis[index[2]])
+        }
+
+    return {
+        'base_value': base_value,
+        'shape': list(shape),
+        'axes': {
+            'spot_shocks': spot_axis.tolist(),
+            'spot_prices': S_ladder.tolist(),
+            'vol_shocks': vol_axis.tolist(),
+            'days': days_axis.tolist()
+        },
+        'pnl': pnl.ravel().tolist(),
+        'max_loss': point(worst),
+        'max_gain': point(best),
+        'greeks_ladder': {
+            'spot_prices': S_ladder.tolist(),
+            'pnl': (ladder['value'] - base_value).tolist(),
+            'delta': ladder['delta'].tolist(),
+            'gamma': ladder['gamma'].tolist(),
+            'vega': ladder['vega'].tolist(),
+            'theta': ladder['theta'].tolist()
+        },
+        'legs': legs
+    }
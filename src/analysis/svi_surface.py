@@ -0,0 +1,208 @@
+"""
+SVI Surface Module
+Fits a raw-SVI smile per expiry and interpolates total variance across maturities,
+so an implied volatility grid of any resolution can be evaluated in O(grid)
+from a handful of cached parameters
+"""
+
+import numpy as np
+from scipy.optimize import least_squares
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Minimum quotes per expiry for a full 5-parameter fit
+MIN_POINTS_PER_SLICE = 5
+
+# Bounds on (a, b, rho, m, s)
+RHO_LIMIT = 0.999
+MIN_S = 1e-4
+
+
+def svi_total_variance(k, a, b, rho, m, s):
+    """
+    Raw SVI total implied variance.
+
+    w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + s^2))
+    """
+    km = k - m
+    return a + b * (rho * km + np.sqrt(km * km + s * s))
+
+
+def fit_svi_slice(k: np.ndarray, w: np.ndarray, x0: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Fit raw-SVI parameters to one expiry's total variances.
+
+    Args:
+        k: Log-moneyness ln(K/F)
+        w: Market total variance sigma^2 * T
+        x0: Optional starting parameters (a, b, rho, m, s)
+
+    Returns:
+        Array of (a, b, rho, m, s)
+    """
+    if len(k) < MIN_POINTS_PER_SLICE:
+        # Too few quotes for a smile: flat total variance
+        return np.array([float(np.mean(w)), 0.0, 0.0, 0.0, 0.1])
+
+    k_span = max(float(k.max() - k.min()), 1e-3)
+    w_max = float(w.max())
+
+    if x0 is None:
+        x0 = np.array([float(w.min()) * 0.5, 0.1, -0.3, float(k[np.argmin(w)]), 0.1])
+
+    lower = np.array([-w_max, 0.0, -RHO_LIMIT, float(k.min()) - k_span, MIN_S])
+    upper = np.array([w_max, 10.0, RHO_LIMIT, float(k.max()) + k_span, 10.0])
+    x0 = np.clip(x0, lower + 1e-9, upper - 1e-9)
+
+    def residuals(x):
+        return svi_total_variance(k, *x) - w
+
+    def jacobian(x):
+        a, b, rho, m, s = x
+        km = k - m
+        root = np.sqrt(km * km + s * s)
+        return np.column_stack((
+            np.ones_like(k),
+            rho * km + root,
+            b * km,
+            -b * (rho + km / root),
+            b * s / root
+        ))
+
+    result = least_squares(residuals, x0, jac=jacobian, bounds=(lower, upper), method='trf')
+    return result.x
+
+
+class SVISurface:
+    """
+    Implied volatility surface made of raw-SVI slices.
+
+    Between fitted expiries total variance is interpolated linearly in T at fixed
+    log-moneyness; outside the fitted range each edge slice keeps its implied
+    volatility (total variance scales with T).
+    """
+
+    def __init__(self, expiries: np.ndarray, params: np.ndarray, spot_price: float,
+                 risk_free_rate: float, dividend_yield: float):
+        """
+        Initialize the surface.
+
+        Args:
+            expiries: Sorted times to expiry of the fitted slices (years)
+            params: Array of shape (n_expiries, 5) with (a, b, rho, m, s) per slice
+            spot_price: Underlying price
+            risk_free_rate: Continuously compounded risk-free rate
+            dividend_yield: Continuous dividend yield
+        """
+        self.expiries = np.asarray(expiries, dtype=float)
+        self.params = np.asarray(params, dtype=float).reshape(-1, 5)
+        self.spot_price = float(spot_price)
+        self.risk_free_rate = float(risk_free_rate)
+        self.dividend_yield = float(dividend_yield)
+
+    def forward(self, T):
+        """Forward price for maturity T."""
+        return self.spot_price * np.exp((self.risk_free_rate - self.dividend_yield) * np.asarray(T))
+
+    def total_variance(self, T, K) -> np.ndarray:
+        """
+        Total implied variance at broadcastable T and K.
+
+        Each point touches at most two slices, so cost is linear in the number of points.
+        """
+        T, K = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(K, dtype=float))
+        k = np.log(K / self.forward(T))
+
+        n = len(self.expiries)
+        if n == 1:
+            w0 = svi_total_variance(k, *self.params[0])
+            return np.maximum(w0, 0.0) * T / self.expiries[0]
+
+        # Bracketing slices and interpolation weight
+        upper = np.clip(np.searchsorted(self.expiries, T), 1, n - 1)
+        lower = upper - 1
+        T_lo, T_hi = self.expiries[lower], self.expiries[upper]
+        p_lo, p_hi = self.params[lower], self.params[upper]
+
+        w_lo = np.maximum(svi_total_variance(k, *np.moveaxis(p_lo, -1, 0)), 0.0)
+        w_hi = np.maximum(svi_total_variance(k, *np.moveaxis(p_hi, -1, 0)), 0.0)
+
+        weight = (T - T_lo) / (T_hi - T_lo)
+        w = (1 - weight) * w_lo + weight * w_hi
+
+        # Constant-vol extrapolation beyond the fitted maturities
+        w = np.where(T < self.expiries[0], w_lo * T / T_lo, w)
+        w = np.where(T > self.expiries[-1], w_hi * T / T_hi, w)
+        return w
+
+    def implied_vol(self, T, K) -> np.ndarray:
+        """Implied volatility at broadcastable T and K."""
+        T = np.asarray(T, dtype=float)
+        return np.sqrt(np.maximum(self.total_variance(T, K), 0.0) / T)
+
+    def evaluate_grid(self, T_1d, K_1d) -> np.ndarray:
+        """
+        Implied volatility on the (K, T) mesh, shaped like np.meshgrid(T_1d, K_1d).
+        """
+        return self.implied_vol(np.asarray(T_1d)[np.newaxis, :], np.asarray(K_1d)[:, np.newaxis])
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable parameters for caching."""
+        return {
+            'model': 'svi',
+            'expiries': self.expiries.tolist(),
+            'params': self.params.tolist(),
+            'spot_price': self.spot_price,
+            'risk_free_rate': self.risk_free_rate,
+            'dividend_yield': self.dividend_yield
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SVISurface':
+        """Rebuild a surface from to_dict output."""
+        return cls(data['expiries'], data['params'], data['spot_price'],
+                   data['risk_free_rate'], data['dividend_yield'])
+
+
+def fit_svi_surface(T, K, iv, spot_price, risk_free_rate, dividend_yield,
+                    previous: Optional[SVISurface] = None) -> SVISurface:
+    """
+    Fit one SVI slice per distinct expiry.
+
+    Args:
+        T: Times to expiry of the quotes
+        K: Strikes of the quotes
+        iv: Implied volatilities of the quotes
+        spot_price: Underlying price
+        risk_free_rate: Risk-free rate
+        dividend_yield: Dividend yield
+        previous: Optional earlier fit used to warm-start matching expiries
+
+    Returns:
+        SVISurface
+    """
+    T = np.asarray(T, dtype=float)
+    K = np.asarray(K, dtype=float)
+    iv = np.asarray(iv, dtype=float)
+
+    expiries, slice_index = np.unique(T, return_inverse=True)
+    k = np.log(K / (spot_price * np.exp((risk_free_rate - dividend_yield) * T)))
+    w = iv ** 2 * T
+
+    params = np.empty((len(expiries), 5))
+    for i, T_i in enumerate(expiries):
+        mask = slice_index == i
+        x0 = None
+        if previous is not None:
+            match = np.flatnonzero(np.isclose(previous.expiries, T_i, atol=1e-6))
+            if match.size:
+                x0 = previous.params[match[0]]
+        try:
+            params[i] = fit_svi_slice(k[mask], w[mask], x0)
+        except Exception as e:
+            logger.debug(f"SVI fit failed for T={T_i:.4f}: {e}")
+            params[i] = [float(np.mean(w[mask])), 0.0, 0.0, 0.0, 0.1]
+
+    return SVISurface(expiries, params, spot_price, risk_free_rate, dividend_yield)
@@ -8,6 +8,10 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from src.analysis.rolling_moments import RollingMoments
+from src.analysis.volatility_forecast import forecast_volatility, FORECAST_HORIZONS
+from src.analysis.correlation_service import align_closes, log_returns, pairwise_covariance
+from src.analysis.portfolio_risk import tail_risk, horizon_returns
 
 class VolatilityCalculator:
     """
@@ -19,9 +23,14 @@ class VolatilityCalculator:
     TRADING_DAYS_PER_MONTH = 21
     TRADING_DAYS_PER_WEEK = 5
     
+    # Range-based estimators computed when open/high/low are available
+    RANGE_ESTIMATORS = ('parkinson', 'garman_klass', 'rogers_satchell', 'yang_zhang')
+    RANGE_WINDOW = 20
+    
     def __init__(self, prices: List[float], dates: Optional[List[str]] = None,
                  filter_outliers: bool = False, outlier_threshold: float = 0.10,
-                 filter_future_dates: bool = True):
+                 filter_future_dates: bool = True, opens: Optional[List[float]] = None,
+                 highs: Optional[List[float]] = None, lows: Optional[List[float]] = None):
         """
         Initialize the volatility calculator with price data.
         
@@ -31,8 +40,11 @@ class VolatilityCalculator:
             filter_outliers: Whether to filter extreme outliers
             outlier_threshold: Threshold for outlier detection (default 10% daily move)
             filter_future_dates: Whether to filter future dates
+            opens: Optional opening prices (with highs and lows enables range estimators)
+            highs: Optional daily highs
+            lows: Optional daily lows
         """
-        self.raw_prices = np.array(prices)
+        self.raw_prices = np.asarray(prices, dtype=float)
         self.raw_dates = dates
         self.filter_outliers = filter_outliers
         self.outlier_threshold = outlier_threshold
@@ -40,54 +52,75 @@ class VolatilityCalculator:
         self.data_quality_warnings = []
         
         # Process and clean data
-        self.prices, self.dates = self._clean_data()
+        self.prices, self.dates, kept = self._clean_data()
         self.log_returns = self._calculate_log_returns()
         
-    def _clean_data(self) -> Tuple[np.ndarray, Optional[List[str]]]:
+        # Open/high/low rows follow the same cleaning as the closes
+        self.has_ohlc = opens is not None and highs is not None and lows is not None
+        if self.has_ohlc:
+            self.opens, self.highs, self.lows = (
+                np.asarray(values, dtype=float)[kept] for values in (opens, highs, lows)
+            )
+        # Prefix sums shared by every rolling and full-sample moment
+        self.moments = RollingMoments(self.log_returns)
+        
+    def _clean_data(self) -> Tuple[np.ndarray, Optional[List[str]], np.ndarray]:
         """
         Clean and validate price data.
         
+        Future dates and outliers are found with boolean masks and removed
+        with a single compress each; warnings are built only for the flagged
+        points.
+        
         Returns:
-            Tuple of cleaned prices and dates
+            Tuple of cleaned prices, dates and the raw indices kept
         """
-        prices = self.raw_prices.copy()
-        dates = self.raw_dates.copy() if self.raw_dates else None
+        prices = self.raw_prices
+        kept = np.arange(len(prices))
+        dates = np.asarray(self.raw_dates) if self.raw_dates is not None and len(self.raw_dates) else None
         
         # Filter future dates
-        if self.filter_future_dates and dates:
-            today = datetime.now().strftime('%Y-%m-%d')
-            valid_indices = []
-            for i, date in enumerate(dates):
-                if date <= today:
-                    valid_indices.append(i)
-                else:
-                    self.data_quality_warnings.append(f"Future date detected and filtered: {date}")
+        if self.filter_future_dates and dates is not None:
+            future = self._parse_dates(dates) > np.datetime64(datetime.now().date())
             
-            if valid_indices:
-                prices = prices[valid_indices]
-                dates = [dates[i] for i in valid_indices]
+            if future.any():
+                self.data_quality_warnings.extend(
+                    f"Future date detected and filtered: {date}" for date in dates[future].tolist()
+                )
+            # Keep the data as is if every date is in the future
+            if future.any() and not future.all():
+                prices = prices[~future]
+                dates = dates[~future]
+                kept = kept[~future]
         
         # Filter extreme outliers in returns
         if self.filter_outliers and len(prices) > 1:
             returns = prices[1:] / prices[:-1] - 1
-            outlier_indices = []
-            
-            for i, ret in enumerate(returns):
-                if abs(ret) > self.outlier_threshold:
-                    outlier_indices.append(i + 1)  # +1 because returns start from index 1
-                    if dates:
-                        self.data_quality_warnings.append(
-                            f"Outlier detected: {ret*100:.2f}% move on {dates[i+1] if dates else f'index {i+1}'}"
-                        )
+            # Flag the price after each extreme move
+            outliers = np.concatenate(([False], np.abs(returns) > self.outlier_threshold))
             
-            # Remove outliers by keeping only non-outlier indices
-            if outlier_indices:
-                keep_indices = [i for i in range(len(prices)) if i not in outlier_indices]
-                prices = prices[keep_indices]
-                if dates:
-                    dates = [dates[i] for i in keep_indices]
-        
-        return prices, dates
+            if outliers.any():
+                if dates is not None:
+                    self.data_quality_warnings.extend(
+                        f"Outlier detected: {ret*100:.2f}% move on {date}"
+                        for ret, date in zip(returns[outliers[1:]].tolist(), dates[outliers].tolist())
+                    )
+                prices = prices[~outliers]
+                kept = kept[~outliers]
+                if dates is not None:
+                    dates = dates[~outliers]
+        
+        return prices, dates.tolist() if dates is not None else None, kept
+    
+    @staticmethod
+    def _parse_dates(dates: np.ndarray) -> np.ndarray:
+        """
+        Dates as datetime64[D]; entries that do not parse become NaT (never filtered).
+        """
+        try:
+            return dates.astype('datetime64[D]')
+        except ValueError:
+            return pd.to_datetime(dates, errors='coerce').values.astype('datetime64[D]')
     
     def _calculate_log_returns(self) -> np.ndarray:
         """
@@ -97,18 +130,19 @@ class VolatilityCalculator:
         if len(self.prices) < 2:
             return np.array([])
         
-        # Calculate log returns
+        # Calculate log returns on views of the cleaned prices
         price_ratios = self.prices[1:] / self.prices[:-1]
         
         # Check for invalid prices (zeros or negatives)
-        if np.any(price_ratios <= 0):
+        valid_mask = price_ratios > 0
+        if not valid_mask.all():
             # Filter out invalid ratios to avoid log errors
-            valid_mask = price_ratios > 0
             if not np.any(valid_mask):
                 return np.array([])
             price_ratios = price_ratios[valid_mask]
-            
-        return np.log(price_ratios)
+        
+        # In place: the ratios array is not used elsewhere
+        return np.log(price_ratios, out=price_ratios)
     
     def calculate_daily_volatility(self) -> float:
         """
@@ -163,8 +197,7 @@ class VolatilityCalculator:
             lower_percentile = winsorize_limits[0] * 100
             upper_percentile = (1 - winsorize_limits[1]) * 100
             
-            lower_bound = np.percentile(self.log_returns, lower_percentile)
-            upper_bound = np.percentile(self.log_returns, upper_percentile)
+            lower_bound, upper_bound = np.percentile(self.log_returns, [lower_percentile, upper_percentile])
             
             winsorized_returns = np.clip(self.log_returns, lower_bound, upper_bound)
             daily_vol = np.std(winsorized_returns, ddof=1)
@@ -197,37 +230,15 @@ class VolatilityCalculator:
                 'trading_days': len(self.prices)
             }
         
-        # Calculate skewness manually using numpy
-        def calculate_skewness(returns):
-            if len(returns) < 3:
-                return 0.0
-            mean = np.mean(returns)
-            std = np.std(returns, ddof=1)
-            if std == 0:
-                return 0.0
-            n = len(returns)
-            skew = (n / ((n - 1) * (n - 2))) * np.sum(((returns - mean) / std) ** 3)
-            return skew
-        
-        # Calculate kurtosis manually using numpy (excess kurtosis)
-        def calculate_kurtosis(returns):
-            if len(returns) < 4:
-                return 0.0
-            mean = np.mean(returns)
-            std = np.std(returns, ddof=1)
-            if std == 0:
-                return 0.0
-            n = len(returns)
-            kurt = (n * (n + 1) / ((n - 1) * (n - 2) * (n - 3))) * np.sum(((returns - mean) / std) ** 4)
-            kurt -= 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
-            return kurt
+        # Bias-corrected skewness and excess kurtosis of the full sample
+        full_sample = self.moments.last(len(self.log_returns))
         
         return {
             'mean_return': np.mean(self.log_returns),
             'min_return': np.min(self.log_returns),
             'max_return': np.max(self.log_returns),
-            'skewness': calculate_skewness(self.log_returns),
-            'kurtosis': calculate_kurtosis(self.log_returns),
+            'skewness': full_sample['skew'],
+            'kurtosis': full_sample['kurt'],
             'trading_days': len(self.prices)
         }
     
@@ -247,13 +258,8 @@ class VolatilityCalculator:
                 'volatility_95th': self.calculate_daily_volatility()
             }
         
-        # Calculate rolling volatility
-        rolling_vols = []
-        for i in range(window, len(self.log_returns) + 1):
-            window_returns = self.log_returns[i-window:i]
-            rolling_vols.append(np.std(window_returns, ddof=1))
-        
-        rolling_vols = np.array(rolling_vols)
+        # Rolling volatility from the prefix sums (O(n) for any window)
+        rolling_vols = self.moments.moments(window)['std']
         current_vol = self.calculate_daily_volatility()
         
         # Calculate where current volatility stands in historical distribution (percentile rank)
@@ -262,12 +268,15 @@ class VolatilityCalculator:
         count_equal = np.sum(rolling_vols == current_vol)
         percentile_rank = ((count_below + 0.5 * count_equal) / len(rolling_vols)) * 100
         
+        # One partial sort for all four percentiles
+        p25, p50, p75, p95 = np.percentile(rolling_vols, [25, 50, 75, 95])
+        
         return {
             'current_percentile': percentile_rank,
-            'volatility_25th': np.percentile(rolling_vols, 25),
-            'volatility_50th': np.percentile(rolling_vols, 50),
-            'volatility_75th': np.percentile(rolling_vols, 75),
-            'volatility_95th': np.percentile(rolling_vols, 95)
+            'volatility_25th': p25,
+            'volatility_50th': p50,
+            'volatility_75th': p75,
+            'volatility_95th': p95
         }
     
     def calculate_volatility_term_structure(self) -> Dict[str, float]:
@@ -281,24 +290,147 @@ class VolatilityCalculator:
         
         for period in periods:
             if len(self.log_returns) >= period:
-                recent_returns = self.log_returns[-period:]
-                period_vol = np.std(recent_returns, ddof=1) * np.sqrt(self.TRADING_DAYS_PER_YEAR)
+                # Trailing window straight from the prefix sums, no re-slicing
+                period_vol = self.moments.last(period)['std'] * np.sqrt(self.TRADING_DAYS_PER_YEAR)
                 results[f'volatility_{period}d'] = period_vol
             else:
                 results[f'volatility_{period}d'] = None
         
         return results
     
+    def _range_terms(self) -> Dict[str, np.ndarray]:
+        """
+        Per-day log-range terms from the cleaned OHLC arrays.
+        
+        Only days whose own and previous bar are valid (positive prices,
+        high >= low) are used, so every term is aligned with its overnight
+        return.
+        
+        Returns:
+            dict with 'parkinson', 'garman_klass' and 'rogers_satchell' daily
+            variance terms, 'overnight' (ln O_t / C_t-1) and 'open_close'
+            (ln C_t / O_t) returns, and the 'index' of the days used
+        """
+        o, h, l, c = self.opens, self.highs, self.lows, self.prices
+        
+        # NaN (missing) prices compare False and drop out here
+        valid = (o > 0) & (h > 0) & (l > 0) & (c > 0) & (h >= l)
+        index = np.flatnonzero(valid[1:] & valid[:-1]) + 1
+        
+        o, h, l, c, prev_c = o[index], h[index], l[index], c[index], c[index - 1]
+        log_hl = np.log(h / l)
+        log_co = np.log(c / o)
+        log_ho, log_lo = np.log(h / o), np.log(l / o)
+        
+        return {
+            'parkinson': log_hl ** 2 / (4 * np.log(2)),
+            'garman_klass': 0.5 * log_hl ** 2 - (2 * np.log(2) - 1) * log_co ** 2,
+            'rogers_satchell': log_ho * (log_ho - log_co) + log_lo * (log_lo - log_co),
+            'overnight': np.log(o / prev_c),
+            'open_close': log_co,
+            'index': index
+        }
+    
+    @staticmethod
+    def _yang_zhang_k(n) -> float:
+        """Yang-Zhang weight on the open-to-close variance for n-day samples."""
+        return 0.34 / (1.34 + (n + 1) / (n - 1))
+    
+    def calculate_range_volatility(self) -> Dict[str, Optional[float]]:
+        """
+        Annualized Parkinson, Garman-Klass, Rogers-Satchell and Yang-Zhang volatility.
+        
+        Parkinson uses the high-low range, Garman-Klass adds the open-close
+        move, Rogers-Satchell stays unbiased under drift, and Yang-Zhang
+        combines overnight, open-to-close and Rogers-Satchell variances so
+        opening gaps are captured. All four need open/high/low data.
+        
+        Returns:
+            dict: '{estimator}_volatility' -> annualized volatility (None without OHLC data)
+        """
+        results = {f'{name}_volatility': None for name in self.RANGE_ESTIMATORS}
+        if not self.has_ohlc:
+            return results
+        
+        terms = self._range_terms()
+        n = len(terms['index'])
+        if n < 2:
+            return results
+        
+        variances = {name: np.mean(terms[name]) for name in ('parkinson', 'garman_klass', 'rogers_satchell')}
+        k = self._yang_zhang_k(n)
+        variances['yang_zhang'] = (np.var(terms['overnight'], ddof=1)
+                                   + k * np.var(terms['open_close'], ddof=1)
+                                   + (1 - k) * variances['rogers_satchell'])
+        
+        for name, variance in variances.items():
+            results[f'{name}_volatility'] = float(np.sqrt(max(variance, 0.0) * self.TRADING_DAYS_PER_YEAR))
+        return results
+    
+    def calculate_rolling_range_volatility(self, window: int = RANGE_WINDOW) -> Dict[str, np.ndarray]:
+        """
+        Rolling annualized range-based volatility.
+        
+        Args:
+            window: Rolling window size in days (at least 2)
+        
+        Returns:
+            dict: estimator -> array of annualized volatilities aligned to the
+            window end, plus 'dates' of those window ends when dates are
+            known. Empty arrays without OHLC data or with fewer than window days
+        """
+        if window < 2:
+            raise ValueError('window must be at least 2')
+        empty = {name: np.array([]) for name in self.RANGE_ESTIMATORS}
+        if not self.has_ohlc:
+            return empty
+        
+        terms = self._range_terms()
+        if len(terms['index']) < window:
+            return empty
+        
+        # Prefix-sum rolling means and variances, one O(n) pass per term
+        variances = {name: RollingMoments(terms[name], max_order=2).moments(window)['mean']
+                     for name in ('parkinson', 'garman_klass', 'rogers_satchell')}
+        overnight = RollingMoments(terms['overnight'], max_order=2).moments(window)['std']
+        open_close = RollingMoments(terms['open_close'], max_order=2).moments(window)['std']
+        k = self._yang_zhang_k(window)
+        variances['yang_zhang'] = overnight ** 2 + k * open_close ** 2 + (1 - k) * variances['rogers_satchell']
+        
+        results = {name: np.sqrt(np.maximum(variance, 0.0) * self.TRADING_DAYS_PER_YEAR)
+                   for name, variance in variances.items()}
+        if self.dates is not None:
+            results['dates'] = [self.dates[i] for i in terms['index'][window - 1:]]
+        return results
+    
+    def forecast_volatility(self, methods: List[str], horizons: List[int] = FORECAST_HORIZONS,
+                            key: Optional[str] = None) -> Dict:
+        """
+        Forecast volatility from the cleaned log returns.
+        
+        Args:
+            methods: Forecast methods ('ewma', 'garch')
+            horizons: Forecast horizons in trading days
+            key: Series key for warm-starting GARCH fits (e.g. ticker)
+        
+        Returns:
+            Dictionary of forecasts per method
+        """
+        return forecast_volatility(self.log_returns, methods, horizons, key=key)
+    
     def get_comprehensive_metrics(self) -> Dict:
         """
         Calculate and return all volatility metrics.
         """
+        # Daily volatility once; the other horizons only rescale it
+        daily_vol = self.calculate_daily_volatility()
+        
         metrics = {
             # Core volatility metrics
-            'daily_volatility': self.calculate_daily_volatility(),
-            'annualized_volatility': self.calculate_annualized_volatility(),
-            'weekly_volatility': self.calculate_weekly_volatility(),
-            'monthly_volatility': self.calculate_monthly_volatility(),
+            'daily_volatility': daily_vol,
+            'annualized_volatility': daily_vol * np.sqrt(self.TRADING_DAYS_PER_YEAR),
+            'weekly_volatility': daily_vol * np.sqrt(self.TRADING_DAYS_PER_WEEK),
+            'monthly_volatility': daily_vol * np.sqrt(self.TRADING_DAYS_PER_MONTH),
             
             # Robust volatility metrics
             'robust_volatility_winsorized': self.calculate_robust_volatility(method='winsorized'),
@@ -313,6 +445,9 @@ class VolatilityCalculator:
             # Term structure
             **self.calculate_volatility_term_structure(),
             
+            # Range-based estimators (None without open/high/low data)
+            **self.calculate_range_volatility(),
+            
             # Data quality info
             'data_quality_warnings': self.data_quality_warnings,
             'original_data_points': len(self.raw_prices),
@@ -333,6 +468,13 @@ class VolatilityCalculator:
         metrics['robust_volatility_winsorized_pct'] = metrics['robust_volatility_winsorized'] * 100
         metrics['robust_volatility_mad_pct'] = metrics['robust_volatility_mad'] * 100
         
+        # Range-based estimators: full sample plus the latest rolling window
+        rolling = self.calculate_rolling_range_volatility()
+        for name in self.RANGE_ESTIMATORS:
+            key = f'{name}_volatility'
+            metrics[f'{key}_pct'] = metrics[key] * 100 if metrics[key] is not None else None
+            metrics[f'{key}_{self.RANGE_WINDOW}d'] = float(rolling[name][-1]) if rolling[name].size else None
+        
         # Convert returns to percentages
         metrics['mean_return_pct'] = metrics['mean_return'] * 100
         metrics['min_return_pct'] = metrics['min_return'] * 100
@@ -345,7 +487,12 @@ def calculate_volatility_from_prices(prices: List[float],
                                     dates: Optional[List[str]] = None,
                                     filter_outliers: bool = False,
                                     outlier_threshold: float = 0.10,
-                                    filter_future_dates: bool = True) -> Dict:
+                                    filter_future_dates: bool = True,
+                                    opens: Optional[List[float]] = None,
+                                    highs: Optional[List[float]] = None,
+                                    lows: Optional[List[float]] = None,
+                                    forecast: Optional[List[str]] = None,
+                                    forecast_key: Optional[str] = None) -> Dict:
     """
     Convenience function to calculate volatility metrics from price data.
     
@@ -355,36 +502,52 @@ def calculate_volatility_from_prices(prices: List[float],
         filter_outliers: Whether to filter extreme outliers
         outlier_threshold: Threshold for outlier detection (default 10% daily move)
         filter_future_dates: Whether to filter future dates
+        opens: Optional opening prices (enables range-based estimators with highs and lows)
+        highs: Optional daily highs
+        lows: Optional daily lows
+        forecast: Optional forecast methods ('ewma', 'garch') added under 'forecast'
+        forecast_key: Series key for warm-starting GARCH fits (e.g. ticker)
         
     Returns:
         Dictionary containing all volatility metrics
     """
     calculator = VolatilityCalculator(prices, dates, filter_outliers, 
-                                     outlier_threshold, filter_future_dates)
-    return calculator.get_comprehensive_metrics()
+                                     outlier_threshold, filter_future_dates,
+                                     opens, highs, lows)
+    metrics = calculator.get_comprehensive_metrics()
+    if forecast:
+        metrics['forecast'] = calculator.forecast_volatility(forecast, key=forecast_key)
+    return metrics
 
 
-def calculate_correlation_matrix(price_series: Dict[str, List[float]]) -> pd.DataFrame:
+def calculate_correlation_matrix(price_series: Dict[str, List[float]],
+                                 dates: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
     """
     Calculate correlation matrix for multiple stock price series.
     
+    Series are aligned by date when dates are given, otherwise by their most
+    recent observation (all series assumed to end on the same day). Each pair
+    uses only the returns both series have.
+    
     Args:
         price_series: Dictionary with ticker as key and price list as value
+        dates: Optional dictionary with ticker as key and date list as value
         
     Returns:
         Correlation matrix as DataFrame
     """
-    returns_dict = {}
-    
-    for ticker, prices in price_series.items():
-        prices_array = np.array(prices)
-        if len(prices_array) > 1:
-            returns = np.log(prices_array[1:] / prices_array[:-1])
-            returns_dict[ticker] = returns
+    tickers = [ticker for ticker, prices in price_series.items() if len(prices) > 1]
+    if dates is None:
+        # Count positions back from the last price so series of different lengths line up at the end
+        dates = {ticker: np.arange(-len(price_series[ticker]), 0) for ticker in tickers}
+    histories = {
+        ticker: {'date': np.asarray(dates[ticker]), 'close': np.asarray(price_series[ticker], dtype=float)}
+        for ticker in tickers
+    }
     
-    # Create DataFrame and calculate correlation
-    returns_df = pd.DataFrame(returns_dict)
-    return returns_df.corr()
+    _, closes = align_closes(histories, tickers)
+    _, correlation, _ = pairwise_covariance(log_returns(closes))
+    return pd.DataFrame(correlation, index=tickers, columns=tickers)
 
 
 def calculate_value_at_risk(prices: List[float], 
@@ -393,6 +556,9 @@ def calculate_value_at_risk(prices: List[float],
     """
     Calculate Value at Risk (VaR) using historical simulation.
     
+    Multi-day VaR uses overlapping holding-period returns rather than
+    scaling daily returns by sqrt(holding_period).
+    
     Args:
         prices: List of stock prices
         confidence_level: Confidence level for VaR (default 95%)
@@ -401,21 +567,15 @@ def calculate_value_at_risk(prices: List[float],
     Returns:
         Dictionary with VaR metrics
     """
-    if len(prices) < 2:
+    if len(prices) < holding_period + 1:
         return {'var': 0.0, 'cvar': 0.0}
     
-    prices_array = np.array(prices)
+    prices_array = np.asarray(prices, dtype=float)
     returns = np.log(prices_array[1:] / prices_array[:-1])
     
-    # Scale returns for holding period
-    scaled_returns = returns * np.sqrt(holding_period)
-    
-    # Calculate VaR
-    var_percentile = (1 - confidence_level) * 100
-    var = np.percentile(scaled_returns, var_percentile)
-    
-    # Calculate Conditional VaR (CVaR) - expected loss beyond VaR
-    cvar = np.mean(scaled_returns[scaled_returns <= var])
+    # VaR and Conditional VaR (expected loss beyond VaR) of the holding-period returns
+    risk = tail_risk(horizon_returns(returns, holding_period), confidence_level)
+    var, cvar = -risk['var'], -risk['es']
     
     return {
         'var': abs(var),  # Return as positive value
@@ -0,0 +1,250 @@
+"""
+Volatility Forecast Module
+RiskMetrics EWMA and GARCH(1,1) volatility forecasts. Variance recursions
+run as first-order IIR filters (scipy.signal.lfilter), the GARCH likelihood
+has analytic gradients from the same filters, and fits are warm-started
+from the previous parameters for the same series key
+"""
+
+import threading
+import logging
+import numpy as np
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+FORECAST_METHODS = ('ewma', 'garch')
+FORECAST_HORIZONS = (1, 5, 10, 21, 63, 126, 252)  # Trading days
+TRADING_DAYS_PER_YEAR = 252
+
+EWMA_LAMBDA = 0.94  # RiskMetrics daily decay
+MIN_GARCH_RETURNS = 30
+
+# Returns are fitted in percent so omega is O(0.01-0.1) instead of O(1e-6)
+RETURN_SCALE = 100.0
+MAX_PERSISTENCE = 0.9999
+DEFAULT_GARCH_START = (0.05, 0.90)  # alpha, beta for cold starts
+
+# Last fitted GARCH parameters per series key, used as the next starting point
+garch_fit_cache = {}
+garch_fit_cache_lock = threading.Lock()
+
+
+def ewma_variance(returns, lam: float = EWMA_LAMBDA, initial_variance: Optional[float] = None) -> np.ndarray:
+    """
+    RiskMetrics variance path s2_t = lam * s2_t-1 + (1 - lam) * r_t-1^2.
+
+    Args:
+        returns: Daily returns
+        lam: Decay factor
+        initial_variance: Variance before the first return (sample variance by default)
+
+    Returns:
+        Variances for every day plus the one-day-ahead forecast (length n + 1)
+    """
+    r2 = np.square(np.asarray(returns, dtype=float))
+    s0 = float(np.mean(r2)) if initial_variance is None else initial_variance
+    # y_t = (1 - lam) x_t + lam y_t-1 with y_-1 = s0, then prepend s0 itself
+    path = lfilter([1 - lam], [1, -lam], r2, zi=[lam * s0])[0]
+    return np.concatenate(([s0], path))
+
+
+def garch_variance(params, resid2: np.ndarray, initial_variance: float) -> np.ndarray:
+    """
+    GARCH(1,1) variance path s2_t = omega + alpha * e_t-1^2 + beta * s2_t-1.
+
+    Returns:
+        Variances for every day plus the one-day-ahead forecast (length n + 1)
+    """
+    omega, alpha, beta = params
+    path = lfilter([1.0], [1, -beta], omega + alpha * resid2, zi=[beta * initial_variance])[0]
+    return np.concatenate(([initial_variance], path))
+
+
+def _garch_objective(params, resid2: np.ndarray, initial_variance: float):
+    """
+    Mean Gaussian negative log-likelihood (without constants) and its gradient.
+
+    The variance derivatives follow the same recursion as the variance
+    (pole beta), so each is one lfilter pass:
+        d s2_t / d omega = 1 + beta * d s2_t-1 / d omega
+        d s2_t / d alpha = e_t-1^2 + beta * d s2_t-1 / d alpha
+        d s2_t / d beta  = s2_t-1 + beta * d s2_t-1 / d beta
+    """
+    beta = params[2]
+    s2 = garch_variance(params, resid2, initial_variance)[:-1]
+    n = len(resid2)
+    if np.any(s2 <= 0) or not np.all(np.isfinite(s2)):
+        return np.inf, np.zeros(3)
+
+    nll = 0.5 * np.sum(np.log(s2) + resid2 / s2) / n
+
+    # Drivers of the three derivative recursions, aligned with s2[1:]
+    drivers = np.stack([np.ones(n - 1), resid2[:-1], s2[:-1]])
+    derivs = np.zeros((3, n))
+    derivs[:, 1:] = lfilter([1.0], [1, -beta], drivers, axis=1)
+
+    weight = 0.5 * (1 / s2 - resid2 / s2 ** 2) / n
+    return nll, derivs @ weight
+
+
+def fit_garch(returns, initial: Optional[Iterable[float]] = None) -> Dict:
+    """
+    Fit GARCH(1,1) by maximum likelihood.
+
+    Args:
+        returns: Daily (log) returns
+        initial: Optional starting (omega, alpha, beta) in return units, e.g.
+            the previous fit of the same series
+
+    Returns:
+        dict with omega, alpha, beta (return units), persistence, long-run
+        variance, the conditional variance path and fit diagnostics
+
+    Raises:
+        ValueError: If there are too few returns
+    """
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[np.isfinite(returns)]
+    if len(returns) < MIN_GARCH_RETURNS:
+        raise ValueError(f'GARCH needs at least {MIN_GARCH_RETURNS} returns, got {len(returns)}')
+
+    scaled = returns * RETURN_SCALE
+    mean = float(np.mean(scaled))
+    resid2 = (scaled - mean) ** 2
+    sample_variance = float(np.mean(resid2))
+
+    if initial is not None:
+        omega, alpha, beta = initial
+        x0 = np.array([omega * RETURN_SCALE ** 2, alpha, beta])
+    else:
+        alpha, beta = DEFAULT_GARCH_START
+        x0 = np.array([sample_variance * (1 - alpha - beta), alpha, beta])
+
+    result = minimize(
+        _garch_objective, x0, args=(resid2, sample_variance), jac=True, method='SLSQP',
+        bounds=[(1e-8 * sample_variance, 10 * sample_variance), (0.0, 1.0), (0.0, 1.0)],
+        constraints=[{'type': 'ineq', 'fun': lambda p: MAX_PERSISTENCE - p[1] - p[2],
+                      'jac': lambda p: np.array([0.0, -1.0, -1.0])}],
+        options={'ftol': 1e-10, 'maxiter': 200}
+    )
+    if not result.success:
+        logger.warning(f"GARCH fit did not converge: {result.message}")
+
+    omega, alpha, beta = result.x
+    persistence = alpha + beta
+    variance = garch_variance(result.x, resid2, sample_variance) / RETURN_SCALE ** 2
+
+    return {
+        'omega': float(omega / RETURN_SCALE ** 2),
+        'alpha': float(alpha),
+        'beta': float(beta),
+        'mean': mean / RETURN_SCALE,
+        'persistence': float(persistence),
+        'long_run_variance': float(omega / (1 - persistence) / RETURN_SCALE ** 2),
+        'log_likelihood': float(-(result.fun + 0.5 * np.log(2 * np.pi)) * len(resid2)
+                                + len(resid2) * np.log(RETURN_SCALE)),
+        'variance': variance,
+        'n_obs': len(returns),
+        'converged': bool(result.success),
+        'iterations': int(result.nit)
+    }
+
+
+def _annualized(variance) -> float:
+    return float(np.sqrt(variance * TRADING_DAYS_PER_YEAR))
+
+
+def _term_structure(next_variance: float, long_run_variance: Optional[float],
+                    persistence: float, horizons: Iterable[int]) -> Dict[str, float]:
+    """
+    Annualized volatility averaged over each horizon.
+
+    Daily forecasts decay geometrically toward the long-run variance:
+    s2_T+h = V + persistence^(h-1) * (s2_T+1 - V); with persistence 1 (EWMA)
+    the forecast is flat.
+    """
+    out = {}
+    for h in horizons:
+        if long_run_variance is None or persistence >= 1:
+            mean_variance = next_variance
+        else:
+            decay = persistence ** np.arange(h)
+            mean_variance = long_run_variance + (next_variance - long_run_variance) * decay.mean()
+        out[f'{h}d'] = _annualized(mean_variance)
+    return out
+
+
+def forecast_volatility(returns, methods: Iterable[str] = FORECAST_METHODS,
+                        horizons: Iterable[int] = FORECAST_HORIZONS,
+                        key: Optional[str] = None, lam: float = EWMA_LAMBDA) -> Dict:
+    """
+    EWMA and/or GARCH(1,1) volatility forecasts for one return series.
+
+    Args:
+        returns: Daily (log) returns, oldest first
+        methods: Any of FORECAST_METHODS
+        horizons: Forecast horizons in trading days
+        key: Series key (e.g. ticker); GARCH fits for the same key start
+            from the previous parameters
+        lam: EWMA decay factor
+
+    Returns:
+        dict: method -> current (next-day) annualized volatility, parameters
+        and annualized term structure
+
+    Raises:
+        ValueError: If a method is unknown or there are too few returns
+    """
+    methods = list(methods)
+    unknown = [m for m in methods if m not in FORECAST_METHODS]
+    if unknown:
+        raise ValueError(f"Unknown forecast method(s): {', '.join(unknown)}. "
+                         f"Use: {', '.join(FORECAST_METHODS)}")
+
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[np.isfinite(returns)]
+    if len(returns) < 2:
+        raise ValueError('Need at least 2 returns to forecast volatility')
+    horizons = [int(h) for h in horizons]
+    results = {}
+
+    if 'ewma' in methods:
+        next_variance = float(ewma_variance(returns, lam)[-1])
+        results['ewma'] = {
+            'lambda': lam,
+            'current_volatility': _annualized(next_variance),
+            'term_structure': _term_structure(next_variance, None, 1.0, horizons)
+        }
+
+    if 'garch' in methods:
+        previous = None
+        if key is not None:
+            with garch_fit_cache_lock:
+                previous = garch_fit_cache.get(key)
+
+        fit = fit_garch(returns, initial=previous)
+        if key is not None and fit['converged']:
+            with garch_fit_cache_lock:
+                garch_fit_cache[key] = (fit['omega'], fit['alpha'], fit['beta'])
+
+        next_variance = float(fit['variance'][-1])
+        persistence = fit['persistence']
+        results['garch'] = {
+            'omega': fit['omega'],
+            'alpha': fit['alpha'],
+            'beta': fit['beta'],
+            'persistence': persistence,
+            'long_run_volatility': _annualized(fit['long_run_variance']),
+            'half_life_days': float(np.log(0.5) / np.log(persistence)) if 0 < persistence < 1 else None,
+            'log_likelihood': fit['log_likelihood'],
+            'converged': fit['converged'],
+            'iterations': fit['iterations'],
+            'warm_start': previous is not None,
+            'current_volatility': _annualized(next_variance),
+            'term_structure': _term_structure(next_variance, fit['long_run_variance'], persistence, horizons)
+        }
+
+    return results
@@ -0,0 +1,280 @@
+"""
+Volatility Screener Module
+Computes a chosen subset of volatility metrics for every active ticker in
+one batch job: prices are read in bulk per chunk of tickers, chunks run on
+a process pool, and results are stored in the metrics_snapshot table.
+Runs can be started in the background and polled by their as-of timestamp
+"""
+
+import time
+from datetime import datetime
+import sqlite3
+import threading
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from src.config import (
+    DATABASE_PATH, SCREENER_WORKERS, SCREENER_CHUNK_SIZE, SCREENER_LOOKBACK_DAYS, SCREENER_KEEP_RUNS
+)
+from src.analysis.volatility_calculator import VolatilityCalculator
+from src.database.metrics_snapshot import METRIC_COLUMNS, MetricsSnapshotStore, metrics_store
+from src.database.price_reader import read_price_histories
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCREENER_METRICS = (
+    'annualized_volatility', 'volatility_20d', 'volatility_percentile',
+    'yang_zhang_volatility', 'skewness', 'kurtosis', 'period_return'
+)
+
+
+def _period_return(calc: VolatilityCalculator) -> Dict:
+    prices = calc.prices
+    return {'period_return': float(prices[-1] / prices[0] - 1) if len(prices) > 1 else None}
+
+
+def _forecast(method: str) -> Callable[[VolatilityCalculator], Dict]:
+    def compute(calc):
+        forecast = calc.forecast_volatility([method])[method]
+        return {f'{method}_volatility': forecast['current_volatility']}
+    return compute
+
+
+# Metric groups computed together; each returns the metrics it produces
+METRIC_GROUPS = {
+    'core': lambda calc: {
+        'annualized_volatility': calc.calculate_annualized_volatility(),
+        'robust_volatility_mad': calc.calculate_robust_volatility(method='mad')
+    },
+    'term_structure': lambda calc: calc.calculate_volatility_term_structure(),
+    'percentiles': lambda calc: {
+        'volatility_percentile': calc.calculate_volatility_percentiles()['current_percentile']
+    },
+    'range': lambda calc: calc.calculate_range_volatility(),
+    'returns': lambda calc: calc.calculate_return_statistics(),
+    'price': _period_return,
+    'ewma': _forecast('ewma'),
+    'garch': _forecast('garch'),
+}
+
+# Stored metric (one per METRIC_COLUMNS entry) -> (group, key in the group's output)
+METRIC_SOURCES = {
+    'annualized_volatility': ('core', 'annualized_volatility'),
+    'robust_volatility_mad': ('core', 'robust_volatility_mad'),
+    'volatility_20d': ('term_structure', 'volatility_20d'),
+    'volatility_60d': ('term_structure', 'volatility_60d'),
+    'volatility_percentile': ('percentiles', 'volatility_percentile'),
+    'parkinson_volatility': ('range', 'parkinson_volatility'),
+    'garman_klass_volatility': ('range', 'garman_klass_volatility'),
+    'rogers_satchell_volatility': ('range', 'rogers_satchell_volatility'),
+    'yang_zhang_volatility': ('range', 'yang_zhang_volatility'),
+    'ewma_volatility': ('ewma', 'ewma_volatility'),
+    'garch_volatility': ('garch', 'garch_volatility'),
+    'mean_return': ('returns', 'mean_return'),
+    'skewness': ('returns', 'skewness'),
+    'kurtosis': ('returns', 'kurtosis'),
+    'period_return': ('price', 'period_return'),
+}
+
+
+def _finite(value) -> Optional[float]:
+    """Float for storage, None for missing or non-finite values."""
+    if value is None:
+        return None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def compute_ticker_metrics(history: Dict[str, np.ndarray], metrics: List[str]) -> Dict:
+    """
+    Compute the requested metrics for one ticker's price history.
+
+    Args:
+        history: Column arrays from read_price_histories
+        metrics: Names from METRIC_COLUMNS
+
+    Returns:
+        dict: metric -> value (None when it cannot be computed)
+    """
+    calc = VolatilityCalculator(history['close'], list(history['date']), opens=history['open'],
+                                highs=history['high'], lows=history['low'])
+    values = {}
+    for group in dict.fromkeys(METRIC_SOURCES[m][0] for m in metrics):
+        try:
+            values.update(METRIC_GROUPS[group](calc))
+        except Exception as e:
+            logger.warning(f"Screener metric group '{group}' failed: {e}")
+    return {metric: _finite(values.get(METRIC_SOURCES[metric][1])) for metric in metrics}
+
+
+def _screen_chunk(db_path: str, entries: List[Dict], metrics: List[str],
+                  lookback_days: Optional[int]) -> List[Dict]:
+    """Read one chunk of tickers in bulk and compute their metrics (runs in a worker process)."""
+    histories = read_price_histories({e['ticker']: e['table_name'] for e in entries},
+                                     lookback_days=lookback_days, db_path=db_path)
+    rows = []
+    for entry in entries:
+        history = histories.get(entry['ticker'])
+        if history is None or len(history['close']) < 2:
+            continue
+        try:
+            values = compute_ticker_metrics(history, metrics)
+        except Exception as e:
+            logger.warning(f"Screener failed for {entry['ticker']}: {e}")
+            continue
+        rows.append({
+            'ticker': entry['ticker'],
+            'company_name': entry['company_name'],
+            'sector': entry['sector'],
+            'n_obs': len(history['close']),
+            'last_date': history['date'][-1],
+            'last_close': _finite(history['close'][-1]),
+            **values
+        })
+    return rows
+
+
+def screener_metrics(metrics: Optional[List[str]] = None) -> List[str]:
+    """
+    Validated metric list for a run.
+
+    Raises:
+        ValueError: If a metric is unknown
+    """
+    metrics = list(metrics or DEFAULT_SCREENER_METRICS)
+    unknown = [m for m in metrics if m not in METRIC_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}")
+    return metrics
+
+
+def new_run_asof() -> str:
+    """As-of timestamp for a new run (microseconds keep back-to-back runs apart)."""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def run_screener(metrics: Optional[List[str]] = None, lookback_days: Optional[int] = SCREENER_LOOKBACK_DAYS,
+                 workers: int = SCREENER_WORKERS, tickers: Optional[List[str]] = None,
+                 chunk_size: int = SCREENER_CHUNK_SIZE, db_path=None, asof: Optional[str] = None) -> Dict:
+    """
+    Compute metrics for every active ticker and store them as one snapshot.
+
+    Runs over a tickers subset are stored as subset runs: they are never
+    served as the default snapshot and are retained separately.
+
+    Args:
+        metrics: Names from METRIC_COLUMNS (default DEFAULT_SCREENER_METRICS)
+        lookback_days: Latest trading days per ticker (None uses the full history)
+        workers: Worker processes (1 runs in-process)
+        tickers: Optional subset of tickers
+        chunk_size: Tickers per bulk read / worker task
+        db_path: Database path (default DATABASE_PATH)
+        asof: Run timestamp (default: now)
+
+    Returns:
+        dict with the run's asof, metrics, ticker counts and timing
+
+    Raises:
+        ValueError: If a metric is unknown
+    """
+    metrics = screener_metrics(metrics)
+    asof = asof or new_run_asof()
+    db_path = str(db_path or DATABASE_PATH)
+    start = time.perf_counter()
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        query = 'SELECT ticker, company_name, sector, table_name FROM stocks_master WHERE is_active = 1'
+        params = []
+        if tickers:
+            query += f" AND ticker IN ({', '.join(['?'] * len(tickers))})"
+            params = [t.upper() for t in tickers]
+        entries = [dict(row) for row in conn.execute(query + ' ORDER BY ticker', params).fetchall()]
+    finally:
+        conn.close()
+
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    rows = []
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures = [pool.submit(_screen_chunk, db_path, chunk, metrics, lookback_days)
+                       for chunk in chunks]
+            for future in futures:
+                rows.extend(future.result())
+    else:
+        for chunk in chunks:
+            rows.extend(_screen_chunk(db_path, chunk, metrics, lookback_days))
+
+    store = metrics_store if db_path == metrics_store.db_path else MetricsSnapshotStore(db_path)
+    stored = store.save_run(asof, rows, lookback_days, metrics=metrics, full_universe=not tickers)
+
+    return {
+        'asof': asof,
+        'metrics': metrics,
+        'lookback_days': lookback_days,
+        'full_universe': not tickers,
+        'tickers_requested': len(entries),
+        'tickers_stored': stored,
+        'workers': workers,
+        'time_ms': (time.perf_counter() - start) * 1000
+    }
+
+
+# Background runs: one at a time, tracked by asof (the latest SCREENER_KEEP_RUNS are kept)
+_runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screener')
+_jobs: Dict[str, Dict] = {}
+_jobs_lock = threading.Lock()
+
+
+def _run_job(asof: str, kwargs: Dict):
+    """Run one background screener job and record its outcome."""
+    try:
+        summary = run_screener(asof=asof, **kwargs)
+        update = {'status': 'done', 'summary': summary}
+    except Exception as e:
+        logger.error(f"Screener run {asof} failed: {e}")
+        update = {'status': 'failed', 'error': str(e)}
+    with _jobs_lock:
+        _jobs[asof].update(update, finished=datetime.now().isoformat())
+
+
+def submit_screener_run(metrics: Optional[List[str]] = None, **kwargs) -> Dict:
+    """
+    Start run_screener in the background.
+
+    Only one run executes at a time: while one is running, its job is
+    returned instead of starting another.
+
+    Args:
+        metrics: Names from METRIC_COLUMNS (validated before the job starts)
+        **kwargs: Other run_screener arguments
+
+    Returns:
+        dict: The job (asof, status, metrics, started) and whether it was newly started
+
+    Raises:
+        ValueError: If a metric is unknown
+    """
+    metrics = screener_metrics(metrics)
+    with _jobs_lock:
+        running = next((job for job in _jobs.values() if job['status'] == 'running'), None)
+        if running is not None:
+            return {**running, 'started_now': False}
+
+        asof = new_run_asof()
+        job = {'asof': asof, 'status': 'running', 'metrics': metrics,
+               'started': datetime.now().isoformat()}
+        _jobs[asof] = job
+        for old in sorted(_jobs)[:-SCREENER_KEEP_RUNS]:
+            del _jobs[old]
+        _runner.submit(_run_job, asof, {'metrics': metrics, **kwargs})
+        return {**job, 'started_now': True}
+
+
+def screener_job(asof: str) -> Optional[Dict]:
+    """Status of a background run (None if unknown)."""
+    with _jobs_lock:
+        job = _jobs.get(asof)
+        return dict(job) if job else None
@@ -11,17 +11,46 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from flask import Flask, jsonify, request, send_from_directory, send_file
 from flask_cors import CORS
 import sqlite3
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import os
-from src.config import DATABASE_PATH, API_HOST, API_PORT, DEBUG_MODE
+from src.config import (
+    DATABASE_PATH, API_HOST, API_PORT, DEBUG_MODE,
+    IV_SURFACE_TTL, IV_SURFACE_MAX_STALE, IV_SURFACE_REFRESH_AHEAD,
+    IV_SURFACE_REFRESH_TOP_N, IV_SURFACE_REFRESH_WORKERS, IV_SURFACE_REFRESH_INTERVAL,
+    IV_SURFACE_REFRESH_MIN_SCORE, IV_SURFACE_EVICT_SCORE, IV_SURFACE_REFRESH_MAX_BACKOFF,
+    SINGLE_FLIGHT_DIR, MC_WORKERS, MC_MAX_WORKERS, MC_EXECUTOR, MC_MAX_SIMULATIONS,
+    SCREENER_WORKERS, SCREENER_LOOKBACK_DAYS, SCREENER_PAGE_SIZE, SCREENER_MAX_PAGE_SIZE,
+    VAR_LOOKBACK_DAYS, VAR_MC_SIMULATIONS, VAR_MAX_SIMULATIONS, VAR_MAX_HORIZON
+)
 from src.utils.calculations import calculate_moving_average
 from src.analysis.volatility_calculator import calculate_volatility_from_prices
-from src.analysis.iv_surface import get_iv_surface_data
-from src.analysis.Derivative_basics import VIII_Solvers
+from src.analysis.volatility_forecast import FORECAST_METHODS
+from src.analysis.iv_surface import (
+    fit_iv_surface,
+    evaluate_iv_surface,
+    encode_fit,
+    decode_fit,
+    DEFAULT_GRID_SIZE,
+    COARSE_GRID_SIZE,
+    SURFACE_METHODS
+)
+from src.analysis.Derivative_basics import VIII_Solvers, bsm_price_greeks
+from src.analysis.monte_carlo import price_european_mc, GENERATORS
+from src.analysis.pricing_engines import PRICING_ENGINES, run_pricing_engine
+from src.analysis.scenario_engine import run_scenario
+from src.analysis.option_chain_cache import chain_cache
+from src.analysis.volatility_screener import submit_screener_run, screener_job, DEFAULT_SCREENER_METRICS
+from src.analysis.correlation_service import correlation_matrix, DEFAULT_LOOKBACK_DAYS, EWMA_LAMBDA
+from src.analysis.portfolio_risk import calculate_portfolio_var, VAR_METHODS
+from src.database.option_snapshots import snapshot_store
+from src.database.metrics_snapshot import metrics_store, METRIC_COLUMNS
+from src.backend.surface_scheduler import SurfaceRefreshScheduler
+from src.backend.single_flight import SingleFlight
 from functools import lru_cache
 import time
-import yfinance as yf
+import threading
 
 # Get the frontend directory path
 FRONTEND_DIR = Path(__file__).parent.parent / 'frontend'
@@ -383,13 +412,30 @@ def update_stock_data(ticker):
 
 @app.route('/api/stock/<ticker>/volatility', methods=['GET'])
 def get_stock_volatility(ticker):
-    """Calculate and return volatility metrics for a stock."""
+    """
+    Calculate and return volatility metrics for a stock.
+
+    Query params:
+    - start_date / end_date: Optional date range
+    - period: Trading days to use without a date range (default 252)
+    - forecast: Optional forecast methods, comma-separated ('ewma', 'garch') or 'all'
+    """
     try:
         # Get query parameters
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         period_days = request.args.get('period', '252')  # Default to 252 trading days (1 year)
         
+        forecast = request.args.get('forecast')
+        if forecast:
+            forecast = list(FORECAST_METHODS) if forecast == 'all' else [m.strip() for m in forecast.split(',')]
+            unknown = [m for m in forecast if m not in FORECAST_METHODS]
+            if unknown:
+                return jsonify({
+                    'success': False,
+                    'error': f"forecast must be 'all' or any of: {', '.join(FORECAST_METHODS)}"
+                }), 400
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
@@ -415,7 +461,7 @@ def get_stock_volatility(ticker):
                 period_int = 252
                 
             query = f'''
-                SELECT date, close
+                SELECT date, open, high, low, close
                 FROM {table_name}
                 WHERE date >= (SELECT date
                              FROM {table_name}
@@ -427,7 +473,7 @@ def get_stock_volatility(ticker):
         else:
             # Use provided date range
             query = f'''
-                SELECT date, close
+                SELECT date, open, high, low, close
                 FROM {table_name}
             '''
             
@@ -454,18 +500,22 @@ def get_stock_volatility(ticker):
             conn.close()
             return jsonify({'success': False, 'error': 'Insufficient data for volatility calculation (need at least 2 data points)'}), 400
         
-        # Extract prices and dates
-        dates = []
-        prices = []
-        
-        for row in rows:
-            dates.append(row['date'])
-            prices.append(float(row['close']))
+        # Extract dates and OHLC columns from the single read (missing values become NaN)
+        dates = [row['date'] for row in rows]
+        opens, highs, lows, prices = (
+            np.array(column, dtype=float) for column in list(zip(*rows))[1:]
+        )
         
         conn.close()
         
-        # Calculate volatility metrics
-        volatility_metrics = calculate_volatility_from_prices(prices, dates)
+        # Calculate close-to-close and range-based volatility metrics
+        try:
+            volatility_metrics = calculate_volatility_from_prices(
+                prices, dates, opens=opens, highs=highs, lows=lows,
+                forecast=forecast, forecast_key=ticker.upper()
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
         # Add additional context
         volatility_metrics['ticker'] = ticker.upper()
@@ -486,7 +536,13 @@ def get_stock_volatility(ticker):
 
 @app.route('/api/stock/<ticker>/cumulative-returns', methods=['GET'])
 def get_cumulative_returns(ticker):
-    """Calculate and return cumulative returns (overnight vs intraday) for a stock."""
+    """
+    Calculate and return cumulative returns (overnight vs intraday) for a stock.
+
+    Query params:
+    - start_date / end_date: Optional date range
+    - rolling_window: Optional window (days) for rolling compounded returns
+    """
     try:
         # Import the analysis function
         from src.analysis.cumulative_returns import calculate_cumulative_returns
@@ -494,6 +550,10 @@ def get_cumulative_returns(ticker):
         # Get query parameters
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        rolling_window = request.args.get('rolling_window', type=int)
+        
+        if rolling_window is not None and rolling_window < 2:
+            return jsonify({'success': False, 'error': 'rolling_window must be at least 2 days'}), 400
         
         # Get database connection
         conn = get_db_connection()
@@ -521,7 +581,7 @@ def get_cumulative_returns(ticker):
         
         # Build query for price data
         query = f'''
-            SELECT date, open, close, high, low, volume
+            SELECT date, open, close
             FROM {table_name}
         '''
         
@@ -552,20 +612,16 @@ def get_cumulative_returns(ticker):
                 'error': 'Insufficient data for calculation (need at least 2 trading days)'
             }), 400
         
-        # Convert rows to list of dicts for the analysis function
-        price_data = []
-        for row in rows:
-            price_data.append({
-                'date': row['date'],
-                'open': float(row['open']),
-                'close': float(row['close']),
-                'high': float(row['high']),
-                'low': float(row['low']),
-                'volume': float(row['volume']) if row['volume'] else 0
-            })
+        # Column arrays straight from the query rows
+        dates, opens, closes = zip(*rows)
+        price_data = {
+            'date': np.array(dates),
+            'open': np.array(opens, dtype=float),
+            'close': np.array(closes, dtype=float)
+        }
         
         # Calculate cumulative returns
-        results = calculate_cumulative_returns(price_data, ticker.upper())
+        results = calculate_cumulative_returns(price_data, ticker.upper(), rolling_window=rolling_window)
         
         # Add company name to results
         results['company_name'] = company_name
@@ -610,12 +666,101 @@ def get_available_stocks():
 
 
 iv_surface_cache = {}
+iv_surface_cache_lock = threading.Lock()
+
+
+def _store_surface_fit(cache_key, fit):
+    """Cache a surface fit, evicting the oldest entry beyond 100."""
+    with iv_surface_cache_lock:
+        iv_surface_cache[cache_key] = (fit, time.time())
+
+        # Limit cache size to 100 entries (remove oldest if needed)
+        if len(iv_surface_cache) > 100:
+            oldest_key = min(iv_surface_cache.keys(),
+                            key=lambda k: iv_surface_cache[k][1])
+            del iv_surface_cache[oldest_key]
+
+
+def _compute_surface_fit(cache_key):
+    """
+    Fit the IV surface for a (ticker, min_expiry, max_expiry, method) cache key.
+
+    Raises:
+        ValueError: When neither calls nor puts have enough liquid options
+    """
+    ticker, min_expiry, max_expiry, method = cache_key
+    fit = fit_iv_surface(
+        ticker,
+        min_expiry_index=min_expiry,
+        max_expiry_index=max_expiry,
+        method=method
+    )
+    if not fit['fits'].get('calls') and not fit['fits'].get('puts'):
+        raise ValueError(f'Insufficient options data for {ticker}. The stock may not have liquid options.')
+    return fit
+
+
+# Concurrent requests for the same surface share one computation
+iv_surface_flight = SingleFlight(lock_dir=SINGLE_FLIGHT_DIR, result_ttl=IV_SURFACE_TTL,
+                                 encode=encode_fit, decode=decode_fit)
+
+
+def _coalesced_surface_fit(cache_key):
+    """Fit a surface, joining any identical computation already in flight."""
+    return iv_surface_flight.do(cache_key, lambda: _compute_surface_fit(cache_key))
+
+
+# Keeps the most requested surfaces warm in the background
+surface_scheduler = SurfaceRefreshScheduler(
+    compute_fn=_coalesced_surface_fit,
+    store_fn=_store_surface_fit,
+    entry_fn=iv_surface_cache.get,
+    ttl=IV_SURFACE_TTL,
+    refresh_ahead=IV_SURFACE_REFRESH_AHEAD,
+    top_n=IV_SURFACE_REFRESH_TOP_N,
+    workers=IV_SURFACE_REFRESH_WORKERS,
+    interval=IV_SURFACE_REFRESH_INTERVAL,
+    min_score=IV_SURFACE_REFRESH_MIN_SCORE,
+    evict_score=IV_SURFACE_EVICT_SCORE,
+    max_backoff=IV_SURFACE_REFRESH_MAX_BACKOFF
+)
+
+
+def _bool_arg(name, default=False):
+    """Parse a boolean query parameter ('1', 'true', 'yes')."""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _range_arg(lo_name, hi_name):
+    """Parse an optional (lo, hi) pair of float query parameters."""
+    lo = request.args.get(lo_name, type=float)
+    hi = request.args.get(hi_name, type=float)
+    if lo is None and hi is None:
+        return None
+    return lo, hi
+
+
 @app.route('/api/iv-surface/<ticker>', methods=['GET'])
 def get_iv_surface(ticker):
     """
     Get implied volatility surface data for both calls and puts.
 
     Returns JSON with surface data suitable for Plotly.js rendering.
+
+    Query params:
+    - min_expiry / max_expiry: Expiration date index range
+    - method: 'griddata' (default) or 'svi'
+    - grid_size: Points per axis (default 30); n_t / n_k override each axis
+    - t_min, t_max, k_min, k_max: Region of interest (years / strike)
+    - compact: Ship 1-D T and K axes instead of full mesh matrices
+    - greeks: Also return delta/gamma/vega/theta grids priced off the IV grid
+    - progressive: Return a coarse grid now; fetch the finer one later with the returned
+      refine_params. The fit (chain fetch and IV solve) still runs before the coarse
+      response; progressive mode only shrinks the first payload and grid evaluation
+    - refine: Evaluate only from a cached fit, never refetching option chains
     """
     try:
         # Validate ticker exists in reference table
@@ -636,55 +781,105 @@ def get_iv_surface(ticker):
                 'error': f'Ticker {ticker.upper()} not found in reference database'
             }), 404
 
-        # Check cache first (5-minute TTL)
-        cache_key = ticker.upper()
-        current_time = time.time()
-
-        if cache_key in iv_surface_cache:
-            cached_data, cached_time = iv_surface_cache[cache_key]
-            if current_time - cached_time < 300:  # 5 minutes
-                print(f"✅ Returning cached IV surface for {ticker}")
-                return jsonify({
-                    'success': True,
-                    'data': cached_data,
-                    'cached': True
-                })
-
         # Get query parameters
         min_expiry = request.args.get('min_expiry', 0, type=int)
         max_expiry = request.args.get('max_expiry', 10, type=int)
+        method = request.args.get('method', 'griddata').lower()
+        grid_size = request.args.get('grid_size', DEFAULT_GRID_SIZE, type=int)
+        n_T = request.args.get('n_t', grid_size, type=int)
+        n_K = request.args.get('n_k', grid_size, type=int)
+        T_range = _range_arg('t_min', 't_max')
+        K_range = _range_arg('k_min', 'k_max')
+        compact = _bool_arg('compact')
+        greeks = _bool_arg('greeks')
+        progressive = _bool_arg('progressive')
+        refine = _bool_arg('refine')
+
+        if method not in SURFACE_METHODS:
+            raise ValueError(f"Unknown surface method '{method}', expected one of {SURFACE_METHODS}")
+
+        # Check cache first (5-minute TTL); the cached fit serves any grid
+        cache_key = (ticker.upper(), min_expiry, max_expiry, method)
+        surface_scheduler.record_request(cache_key)
+        entry = iv_surface_cache.get(cache_key)
+        fit = None
+        stale = False
+
+        if entry is not None:
+            cached_fit, cached_time = entry
+            age = time.time() - cached_time
+            if age < IV_SURFACE_TTL:
+                print(f"✅ Returning cached IV surface for {ticker}")
+                fit = cached_fit
+            elif age < IV_SURFACE_MAX_STALE:
+                # Stale-while-revalidate: serve the old fit and refresh in the background
+                print(f"♻️ Returning stale IV surface for {ticker} while refreshing")
+                fit = cached_fit
+                stale = True
+                surface_scheduler.note_stale_served()
+                surface_scheduler.schedule_refresh(cache_key)
+
+        cached = fit is not None
+
+        if fit is None:
+            if refine:
+                return jsonify({
+                    'success': False,
+                    'error': f'No cached IV surface for {ticker.upper()} to refine. Request the surface first.',
+                    'error_code': 'FIT_NOT_CACHED'
+                }), 404
 
-        print(f"📊 Calculating IV surface for {ticker}...")
-
-        # Calculate IV surface
-        surface_data = get_iv_surface_data(
-            ticker.upper(),
-            min_expiry_index=min_expiry,
-            max_expiry_index=max_expiry
-        )
-
-        # Check if we have valid surface data
-        if not surface_data['surfaces'].get('calls') and not surface_data['surfaces'].get('puts'):
-            return jsonify({
-                'success': False,
-                'error': f'Insufficient options data for {ticker}. The stock may not have liquid options.',
-                'error_code': 'INSUFFICIENT_DATA'
-            }), 400
+            print(f"📊 Calculating IV surface for {ticker} ({method})...")
 
-        # Cache the result
-        iv_surface_cache[cache_key] = (surface_data, current_time)
+            # Fit IV surface
+            try:
+                fit = _coalesced_surface_fit(cache_key)
+            except ValueError as e:
+                # Check if we have valid surface data
+                if 'Insufficient options data' not in str(e):
+                    raise
+                return jsonify({
+                    'success': False,
+                    'error': str(e),
+                    'error_code': 'INSUFFICIENT_DATA'
+                }), 400
+
+            # Cache the fit
+            _store_surface_fit(cache_key, fit)
+
+        if progressive:
+            # Coarse grid now, full resolution on the follow-up refine request. The refine
+            # request must rebuild the same cache key and output, so echo every such parameter
+            refine_params = {
+                'refine': 1,
+                'min_expiry': min_expiry,
+                'max_expiry': max_expiry,
+                'method': method,
+                'n_t': n_T,
+                'n_k': n_K,
+                'compact': int(compact),
+                'greeks': int(greeks)
+            }
+            bounds = (T_range or (None, None)) + (K_range or (None, None))
+            for name, value in zip(('t_min', 't_max', 'k_min', 'k_max'), bounds):
+                if value is not None:
+                    refine_params[name] = value
+            n_T, n_K = min(n_T, COARSE_GRID_SIZE), min(n_K, COARSE_GRID_SIZE)
 
-        # Limit cache size to 100 entries (remove oldest if needed)
-        if len(iv_surface_cache) > 100:
-            oldest_key = min(iv_surface_cache.keys(),
-                            key=lambda k: iv_surface_cache[k][1])
-            del iv_surface_cache[oldest_key]
+        surface_data = evaluate_iv_surface(fit, n_T=n_T, n_K=n_K,
+                                           T_range=T_range, K_range=K_range, compact=compact,
+                                           greeks=greeks)
 
-        return jsonify({
+        response = {
             'success': True,
             'data': surface_data,
-            'cached': False
-        })
+            'cached': cached,
+            'stale': stale
+        }
+        if progressive:
+            response['progressive'] = {'coarse': True, 'refine_params': refine_params}
+
+        return jsonify(response)
 
     except ValueError as e:
         error_msg = str(e)
@@ -710,6 +905,21 @@ def get_iv_surface(ticker):
             'details': str(e)
         }), 500
 
+@app.route('/api/metrics/iv-surface', methods=['GET'])
+def get_iv_surface_metrics():
+    """Background refresh, request coalescing and cache statistics for IV surfaces."""
+    try:
+        return jsonify({
+            'success': True,
+            'cache_entries': len(iv_surface_cache),
+            'scheduler': surface_scheduler.metrics(),
+            'single_flight': iv_surface_flight.metrics(),
+            'option_chain_cache': chain_cache.metrics()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/option/price', methods=['POST'])
 def calculate_option_price():
     """
@@ -722,7 +932,19 @@ def calculate_option_price():
         "time_to_maturity": 1,   # Time to maturity in years
         "risk_free_rate": 0.05,  # Risk-free rate (decimal)
         "volatility": 0.2,       # Volatility (decimal)
-        "n_simulations": 100000  # Optional: Monte Carlo simulations
+        "n_simulations": 100000, # Optional: Monte Carlo simulations (maximum when a budget is set)
+        "mc_workers": 4,         # Optional: worker pool size for Monte Carlo
+        "mc_seed": 42,           # Optional: seed for reproducible Monte Carlo results
+        "mc_time_budget": 0.5,   # Optional: stop Monte Carlo after this many seconds
+        "mc_target_error": 0.01, # Optional: stop once both standard errors reach this
+        "mc_generator": "sobol", # Optional: 'pseudo' (default) or 'sobol' (randomized QMC)
+        "engines": ["binomial_lr", "american_lsm"],  # Optional: extra engines (see PRICING_ENGINES)
+        "american": true,        # Optional: early exercise on binomial trees
+        "binomial_steps": 501,   # Optional: tree steps
+        "path_simulations": 50000,  # Optional: paths for LSM / barrier / Asian engines
+        "path_steps": 50,        # Optional: monitoring dates for path engines
+        "barrier": 80,           # Required by the barrier engine
+        "barrier_type": "down-and-out"
     }
     """
     try:
@@ -741,43 +963,57 @@ def calculate_option_price():
         sigma = float(data['volatility'])
         q = float(data.get('dividend_yield', 0))  # Continuous dividend yield
         n_sim = int(data.get('n_simulations', 100000))
+        mc_workers = int(data.get('mc_workers', MC_WORKERS))
+        mc_seed = data.get('mc_seed')
+        mc_time_budget = data.get('mc_time_budget')
+        mc_target_error = data.get('mc_target_error')
+        mc_generator = data.get('mc_generator', 'pseudo')
 
         # Validate parameters
         if S0 <= 0 or K <= 0 or T <= 0 or sigma <= 0:
             return jsonify({'success': False, 'error': 'All values must be positive'}), 400
+        if not 0 < n_sim <= MC_MAX_SIMULATIONS:
+            return jsonify({'success': False, 'error': f'n_simulations must be between 1 and {MC_MAX_SIMULATIONS}'}), 400
+        if not 1 <= mc_workers <= MC_MAX_WORKERS:
+            return jsonify({'success': False, 'error': f'mc_workers must be between 1 and {MC_MAX_WORKERS}'}), 400
+        if mc_generator not in GENERATORS:
+            return jsonify({'success': False, 'error': f"mc_generator must be one of: {', '.join(GENERATORS)}"}), 400
+        if mc_seed is not None:
+            if isinstance(mc_seed, bool) or not isinstance(mc_seed, (int, str)) or not str(mc_seed).strip().isdigit():
+                return jsonify({'success': False, 'error': 'mc_seed must be a non-negative integer'}), 400
+            mc_seed = int(mc_seed)
+
+        engines = data.get('engines') or []
+        if isinstance(engines, str):
+            engines = [name.strip() for name in engines.split(',') if name.strip()]
+        invalid_engines = [name for name in engines if name not in PRICING_ENGINES]
+        if invalid_engines:
+            return jsonify({
+                'success': False,
+                'error': f"Invalid engine(s): {', '.join(invalid_engines)}. Must be one of: {', '.join(PRICING_ENGINES)}"
+            }), 400
 
         # Create solver instance with dividend yield
         solver = VIII_Solvers(S0=S0, K=K, T=T, r=r, sigma=sigma, n_sim=n_sim, t=0, q=q)
 
-        # Calculate BSM prices
-        bsm_call = solver.BSM_call()
-        bsm_put = solver.BSM_put()
-
-        # Calculate Greeks
-        delta = solver.call_delta()
-        gamma = solver.call_gamma()
-        vega = solver.call_vega()
-        theta = solver.call_theta()
-
-        # Calculate d1 and d2 for display
-        d1 = solver.d1()
-        d2 = solver.d2()
-
-        # Calculate put Greeks using put-call parity relationships (with dividends)
-        import numpy as np
-        from scipy.stats import norm
-        put_delta = delta - np.exp(-q * T)  # Put delta = Call delta - e^(-qT)
-        put_gamma = gamma  # Same as call gamma
-        put_vega = vega  # Same as call vega
-        # Put theta calculation with dividends
-        N_prime_d1 = np.exp((-d1 ** 2) / 2) / np.sqrt(2 * np.pi)
-        put_theta = (-np.exp(-q * T) * S0 * N_prime_d1 * sigma / (2 * np.sqrt(T))
-                     - q * S0 * np.exp(-q * T) * norm.cdf(-d1)
-                     + r * K * np.exp(-r * T) * norm.cdf(-d2))
-
-        # Calculate Monte Carlo prices
-        mc_call = solver.mc_call()
-        mc_put = solver.mc_put()
+        # Calculate BSM prices and all Greeks in one pass (d1/d2 computed once)
+        bsm = solver.price_and_greeks()
+        bsm_call = bsm['call_price']
+        bsm_put = bsm['put_price']
+        d1 = bsm['d1']
+        d2 = bsm['d2']
+
+        # Calculate Monte Carlo prices (calls and puts share one simulation)
+        mc = solver.mc_price(
+            seed=mc_seed,
+            workers=mc_workers,
+            executor=MC_EXECUTOR,
+            time_budget=float(mc_time_budget) if mc_time_budget is not None else None,
+            target_error=float(mc_target_error) if mc_target_error is not None else None,
+            generator=mc_generator
+        )
+        mc_call = mc['call_price']
+        mc_put = mc['put_price']
 
         # Calculate moneyness
         moneyness = S0 / K
@@ -813,22 +1049,36 @@ def calculate_option_price():
                 'call_price': float(mc_call),
                 'put_price': float(mc_put),
                 'call_error_pct': abs(mc_call - bsm_call) / bsm_call * 100 if bsm_call > 0 else 0,
-                'put_error_pct': abs(mc_put - bsm_put) / bsm_put * 100 if bsm_put > 0 else 0
+                'put_error_pct': abs(mc_put - bsm_put) / bsm_put * 100 if bsm_put > 0 else 0,
+                'call_stderr': mc['call_stderr'],
+                'put_stderr': mc['put_stderr'],
+                'n_paths': mc['n_paths'],
+                'seed': str(mc['seed']),
+                'generator': mc['generator'],
+                'workers': mc['workers'],
+                'stopped_by': mc['stopped_by'],
+                'time_ms': mc['elapsed_ms']
             },
             'greeks': {
                 'call': {
-                    'delta': float(delta),
-                    'gamma': float(gamma),
-                    'vega': float(vega),
-                    'theta': float(theta),
-                    'theta_daily': float(theta / 365)
+                    'delta': bsm['call_delta'],
+                    'gamma': bsm['gamma'],
+                    'vega': bsm['vega'],
+                    'theta': bsm['call_theta'],
+                    'theta_daily': bsm['call_theta'] / 365,
+                    'rho': bsm['call_rho'],
+                    'vanna': bsm['vanna'],
+                    'volga': bsm['volga']
                 },
                 'put': {
-                    'delta': float(put_delta),
-                    'gamma': float(put_gamma),
-                    'vega': float(put_vega),
-                    'theta': float(put_theta),
-                    'theta_daily': float(put_theta / 365)
+                    'delta': bsm['put_delta'],
+                    'gamma': bsm['gamma'],
+                    'vega': bsm['vega'],
+                    'theta': bsm['put_theta'],
+                    'theta_daily': bsm['put_theta'] / 365,
+                    'rho': bsm['put_rho'],
+                    'vanna': bsm['vanna'],
+                    'volga': bsm['volga']
                 }
             },
             'analysis': {
@@ -842,12 +1092,278 @@ def calculate_option_price():
             }
         }
 
+        # Optional American / path-dependent engines, each timed separately
+        if engines:
+            engine_options = {key: data[key] for key in
+                              ('american', 'binomial_steps', 'path_simulations', 'path_steps',
+                               'barrier', 'barrier_type') if key in data}
+            engine_options['generator'] = mc_generator
+            if mc_seed is not None:
+                engine_options['seed'] = mc_seed
+            try:
+                result['engines'] = {name: run_pricing_engine(name, S0, K, T, r, sigma, q, engine_options)
+                                     for name in engines}
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+MAX_BATCH_CONTRACTS = 100000
+MAX_BATCH_MC_CONTRACTS = 500
+MAX_BATCH_MC_PATHS = 50_000_000  # Contracts x paths per request
+
+
+@app.route('/api/option/price/batch', methods=['POST'])
+def calculate_option_prices_batch():
+    """
+    Price many contracts and their Greeks in one vectorized BSM pass.
+
+    Request body (any numeric field may be a scalar or an array; arrays broadcast):
+    {
+        "spot_price": 100,
+        "strike_price": [90, 95, 100, 105, 110],
+        "time_to_maturity": [0.25, 0.5, 1.0],
+        "risk_free_rate": 0.05,
+        "volatility": 0.2,
+        "dividend_yield": 0,          # Optional
+        "grid": true,                 # Optional: strike x maturity grid instead of broadcasting
+        "monte_carlo": false,         # Optional: also run Monte Carlo (opt-in, slower)
+        "n_simulations": 10000,       # Optional: paths per contract when monte_carlo is on
+        "mc_generator": "pseudo"      # Optional: 'pseudo' or 'sobol'
+    }
+
+    Returns columnar results: one array per input and output field, flattened
+    row-major over 'shape' (maturity x strike when grid is true).
+    """
+    try:
+        started = time.perf_counter()
+        data = request.json or {}
+
+        # Validate required parameters
+        required = ['spot_price', 'strike_price', 'time_to_maturity', 'risk_free_rate', 'volatility']
+        for param in required:
+            if param not in data:
+                return jsonify({'success': False, 'error': f'Missing required parameter: {param}'}), 400
+
+        try:
+            S0 = np.asarray(data['spot_price'], dtype=float)
+            K = np.asarray(data['strike_price'], dtype=float)
+            T = np.asarray(data['time_to_maturity'], dtype=float)
+            r = np.asarray(data['risk_free_rate'], dtype=float)
+            sigma = np.asarray(data['volatility'], dtype=float)
+            q = np.asarray(data.get('dividend_yield', 0), dtype=float)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'All pricing inputs must be numbers or arrays of numbers'}), 400
+
+        if data.get('grid'):
+            if K.ndim != 1 or T.ndim != 1:
+                return jsonify({'success': False, 'error': 'grid mode needs 1-D strike_price and time_to_maturity arrays'}), 400
+            T, K = np.meshgrid(T, K, indexing='ij')
+
+        try:
+            S0, K, T, r, sigma, q = np.broadcast_arrays(S0, K, T, r, sigma, q)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Input arrays have incompatible shapes'}), 400
+
+        shape = list(K.shape)
+        count = int(K.size)
+        if count == 0:
+            return jsonify({'success': False, 'error': 'No contracts to price'}), 400
+        if count > MAX_BATCH_CONTRACTS:
+            return jsonify({'success': False, 'error': f'Too many contracts (max {MAX_BATCH_CONTRACTS})'}), 400
+
+        # Validate parameters
+        if np.any(S0 <= 0) or np.any(K <= 0) or np.any(T <= 0) or np.any(sigma <= 0):
+            return jsonify({'success': False, 'error': 'All values must be positive'}), 400
+
+        S0, K, T, r, sigma, q = (x.ravel() for x in (S0, K, T, r, sigma, q))
+
+        # Prices and Greeks for every contract in one pass
+        bsm = bsm_price_greeks(S0, K, T, r, sigma, q)
+        bsm_ms = (time.perf_counter() - started) * 1000
+
+        columns = {
+            'spot_price': S0.tolist(),
+            'strike_price': K.tolist(),
+            'time_to_maturity': T.tolist(),
+            'risk_free_rate': r.tolist(),
+            'volatility': sigma.tolist(),
+            'dividend_yield': q.tolist(),
+            **{name: values.tolist() for name, values in bsm.items()},
+            'moneyness': (S0 / K).tolist()
+        }
+
+        result = {
+            'success': True,
+            'count': count,
+            'shape': shape,
+            'columns': columns,
+            'timing_ms': {'bsm': bsm_ms}
+        }
+
+        if data.get('monte_carlo'):
+            if count > MAX_BATCH_MC_CONTRACTS:
+                return jsonify({'success': False, 'error': f'Monte Carlo is limited to {MAX_BATCH_MC_CONTRACTS} contracts per request'}), 400
+
+            mc_started = time.perf_counter()
+            n_sim = int(data.get('n_simulations', 10000))
+            if not 0 < n_sim <= MC_MAX_SIMULATIONS:
+                return jsonify({'success': False, 'error': f'n_simulations must be between 1 and {MC_MAX_SIMULATIONS}'}), 400
+            if count * n_sim > MAX_BATCH_MC_PATHS:
+                return jsonify({'success': False, 'error': f'Monte Carlo is limited to {MAX_BATCH_MC_PATHS:,} paths in total '
+                                                           f'(contracts x n_simulations) per request'}), 400
+            mc_generator = data.get('mc_generator', 'pseudo')
+            if mc_generator not in GENERATORS:
+                return jsonify({'success': False, 'error': f"mc_generator must be one of: {', '.join(GENERATORS)}"}), 400
+            mc = price_european_mc(S0, K, T, r, sigma, q, n_sim=n_sim, generator=mc_generator)
+
+            result['monte_carlo'] = {
+                'n_simulations': n_sim,
+                'generator': mc_generator,
+                'n_paths': mc['n_paths'],
+                'call_price': mc['call_price'].tolist(),
+                'put_price': mc['put_price'].tolist(),
+                'call_stderr': mc['call_stderr'].tolist(),
+                'put_stderr': mc['put_stderr'].tolist()
+            }
+            result['timing_ms']['monte_carlo'] = (time.perf_counter() - mc_started) * 1000
+
+        result['timing_ms']['total'] = (time.perf_counter() - started) * 1000
         return jsonify(result)
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/option/scenario', methods=['POST'])
+def calculate_option_scenario():
+    """
+    Revalue a multi-leg position over a spot x vol x time scenario cube.
+
+    Request body:
+    {
+        "spot_price": 100,
+        "volatility": 0.25,           # Base volatility for legs without their own
+        "risk_free_rate": 0.05,
+        "dividend_yield": 0,          # Optional
+        "legs": [
+            {"type": "call", "strike": 100, "time_to_maturity": 0.5, "quantity": 1},
+            {"type": "call", "strike": 110, "time_to_maturity": 0.5, "quantity": -1,
+             "volatility": 0.22},
+            {"type": "stock", "quantity": -50}
+        ],
+        "spot_shocks": {"min": -0.3, "max": 0.3, "steps": 100},  # Optional: relative moves or a list
+        "vol_shocks": {"min": -0.1, "max": 0.1, "steps": 50},    # Optional: absolute vol shifts
+        "horizon_days": {"min": 0, "max": 30, "steps": 30}       # Optional: days forward
+    }
+
+    Returns the P&L cube flattened row-major over 'shape' ([spot, vol, time]),
+    its extremes and the Greeks ladder across the spot shocks.
+    """
+    try:
+        started = time.perf_counter()
+        data = request.json or {}
+
+        for param in ('spot_price', 'legs'):
+            if param not in data:
+                return jsonify({'success': False, 'error': f'Missing required parameter: {param}'}), 400
+
+        try:
+            scenario = run_scenario(
+                spot_price=float(data['spot_price']),
+                legs=data['legs'],
+                volatility=float(data.get('volatility', 0.2)),
+                risk_free_rate=float(data.get('risk_free_rate', 0.05)),
+                dividend_yield=float(data.get('dividend_yield', 0)),
+                spot_shocks=data.get('spot_shocks'),
+                vol_shocks=data.get('vol_shocks'),
+                horizon_days=data.get('horizon_days')
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            **scenario,
+            'time_ms': (time.perf_counter() - started) * 1000
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# yfinance chain column -> response field, and the value used for missing entries
+MARKET_OPTION_COLUMNS = (
+    ('lastPrice', 'last_price', None),
+    ('bid', 'bid', None),
+    ('ask', 'ask', None),
+    ('volume', 'volume', 0),
+    ('openInterest', 'open_interest', 0),
+    ('impliedVolatility', 'implied_volatility', None),
+)
+MARKET_OPTION_LIMIT = 20
+
+
+def _format_market_options(df, spot_price, target_strike=None, limit=MARKET_OPTION_LIMIT):
+    """
+    Sort a chain by strike, keep the target-strike window and pick the ATM contract.
+
+    Selection uses searchsorted on the sorted strikes; only the returned rows
+    are turned into dicts, after column-wise NaN handling.
+
+    Returns:
+        (options, atm): up to `limit` option dicts and the contract closest to spot
+    """
+    if df is None or df.empty:
+        return [], None
+
+    strikes = df['strike'].to_numpy(dtype=float)
+    order = np.argsort(strikes, kind='stable')
+    strikes = strikes[order]
+
+    # Strikes within 10% of the target
+    lo, hi = 0, len(strikes)
+    if target_strike:
+        lo = np.searchsorted(strikes, target_strike - target_strike * 0.1, side='left')
+        hi = np.searchsorted(strikes, target_strike + target_strike * 0.1, side='right')
+    if lo >= hi:
+        return [], None
+
+    # Closest strike to spot inside the window (lower strike on ties)
+    window = strikes[lo:hi]
+    i = int(np.searchsorted(window, spot_price))
+    if i == len(window) or (i > 0 and spot_price - window[i - 1] <= window[i] - spot_price):
+        i -= 1
+    atm_index = lo + int(np.searchsorted(window, window[i]))
+
+    positions = np.r_[lo:min(hi, lo + limit), atm_index]
+    rows = order[positions]
+    columns = {'strike': strikes[positions].tolist()}
+    values = {}
+    for source, name, missing in MARKET_OPTION_COLUMNS:
+        column = (pd.to_numeric(df[source], errors='coerce').to_numpy(dtype=float)[rows]
+                  if source in df.columns else np.full(len(rows), np.nan))
+        values[name] = column
+        if missing is None:
+            columns[name] = [None if np.isnan(v) else v for v in column.tolist()]
+        else:
+            columns[name] = np.nan_to_num(column, nan=missing).astype(int).tolist()
+
+    # Mid from a two-sided quote, else the last trade
+    bid, ask = np.nan_to_num(values['bid']), np.nan_to_num(values['ask'])
+    mid = np.where((bid != 0) & (ask != 0), (bid + ask) / 2, values['last_price'])
+    columns['mid_price'] = [None if np.isnan(v) else v for v in mid.tolist()]
+
+    # Column-wise lists zipped into records only for the returned rows
+    names = list(columns)
+    records = [dict(zip(names, row)) for row in zip(*columns.values())]
+    return records[:-1], records[-1]
+
+
 @app.route('/api/option/market-prices/<ticker>', methods=['GET'])
 def get_market_option_prices(ticker):
     """
@@ -858,10 +1374,8 @@ def get_market_option_prices(ticker):
     - expiry_index: Optional expiry date index (0 = nearest)
     """
     try:
-        stock = yf.Ticker(ticker.upper())
-
-        # Get available expiration dates
-        expirations = stock.options
+        # Expirations, spot and chains come from the shared TTL cache
+        expirations = chain_cache.get_expirations(ticker)
         if not expirations:
             return jsonify({
                 'success': False,
@@ -875,22 +1389,14 @@ def get_market_option_prices(ticker):
 
         expiry_date = expirations[expiry_index]
 
-        # Get option chain
-        opt_chain = stock.option_chain(expiry_date)
-        calls = opt_chain.calls
-        puts = opt_chain.puts
-
-        # Get current stock price
-        info = stock.info
-        spot_price = info.get('regularMarketPrice') or info.get('currentPrice') or info.get('previousClose')
+        # Get current stock price (cached quote, not the slow stock.info)
+        try:
+            spot_price = chain_cache.get_spot_price(ticker)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Could not fetch current price'}), 500
 
-        if not spot_price:
-            # Fallback: get from history
-            hist = stock.history(period='1d')
-            if not hist.empty:
-                spot_price = float(hist['Close'].iloc[-1])
-            else:
-                return jsonify({'success': False, 'error': 'Could not fetch current price'}), 500
+        # Get option chain (recorded as a snapshot only when actually fetched)
+        calls, puts = chain_cache.get_chain(ticker, expiry_date, spot_price=spot_price)
 
         # Get target strike if specified
         target_strike = request.args.get('strike', type=float)
@@ -901,42 +1407,9 @@ def get_market_option_prices(ticker):
         days_to_expiry = (expiry_dt - datetime.now()).days
         time_to_maturity = max(days_to_expiry, 1) / 365.0
 
-        # Filter and format option data
-        def format_options(df, target_strike=None):
-            options = []
-            for _, row in df.iterrows():
-                strike = float(row['strike'])
-
-                # If target strike specified, only include close matches
-                if target_strike and abs(strike - target_strike) > target_strike * 0.1:
-                    continue
-
-                opt = {
-                    'strike': strike,
-                    'last_price': float(row['lastPrice']) if pd.notna(row['lastPrice']) else None,
-                    'bid': float(row['bid']) if pd.notna(row['bid']) else None,
-                    'ask': float(row['ask']) if pd.notna(row['ask']) else None,
-                    'volume': int(row['volume']) if pd.notna(row['volume']) else 0,
-                    'open_interest': int(row['openInterest']) if pd.notna(row['openInterest']) else 0,
-                    'implied_volatility': float(row['impliedVolatility']) if pd.notna(row['impliedVolatility']) else None
-                }
-
-                # Calculate mid price
-                if opt['bid'] and opt['ask']:
-                    opt['mid_price'] = (opt['bid'] + opt['ask']) / 2
-                else:
-                    opt['mid_price'] = opt['last_price']
-
-                options.append(opt)
-
-            return sorted(options, key=lambda x: x['strike'])
-
-        call_options = format_options(calls, target_strike)
-        put_options = format_options(puts, target_strike)
-
-        # Find ATM options (closest to spot price)
-        atm_call = min(call_options, key=lambda x: abs(x['strike'] - spot_price)) if call_options else None
-        atm_put = min(put_options, key=lambda x: abs(x['strike'] - spot_price)) if put_options else None
+        # Filter and format option data; ATM options are the closest to spot
+        call_options, atm_call = _format_market_options(calls, spot_price, target_strike)
+        put_options, atm_put = _format_market_options(puts, spot_price, target_strike)
 
         result = {
             'success': True,
@@ -948,8 +1421,8 @@ def get_market_option_prices(ticker):
             'available_expirations': list(expirations[:10]),  # First 10 expirations
             'atm_call': atm_call,
             'atm_put': atm_put,
-            'calls': call_options[:20],  # Limit to 20 strikes
-            'puts': put_options[:20]
+            'calls': call_options,  # Limited to 20 strikes
+            'puts': put_options
         }
 
         return jsonify(result)
@@ -958,6 +1431,264 @@ def get_market_option_prices(ticker):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/option/snapshots/<ticker>', methods=['GET'])
+def get_option_snapshots(ticker):
+    """
+    List stored option chain snapshots for a ticker, or load one of them.
+
+    Query params:
+    - asof: Optional snapshot timestamp; when given (or 'latest') the chain itself is returned
+    - start / end: Optional as-of range for the listing
+    """
+    try:
+        asof = request.args.get('asof')
+
+        if not asof:
+            snapshots = snapshot_store.list_snapshots(
+                ticker,
+                start=request.args.get('start'),
+                end=request.args.get('end')
+            )
+            return jsonify({'success': True, 'ticker': ticker.upper(), 'snapshots': snapshots})
+
+        chain = snapshot_store.load_snapshot(ticker, asof=None if asof == 'latest' else asof)
+        if chain.empty:
+            return jsonify({'success': False, 'error': f'No option snapshot found for {ticker.upper()}'}), 404
+
+        # Columnar payload, NaN -> null
+        chain = chain.astype(object).where(chain.notna(), None)
+        return jsonify({
+            'success': True,
+            'ticker': ticker.upper(),
+            'asof': chain.attrs.get('asof'),
+            'chain': {col: chain[col].tolist() for col in chain.columns}
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/screener/run', methods=['POST'])
+def run_volatility_screener():
+    """
+    Start computing screener metrics for every active ticker as a new snapshot.
+
+    The run executes in the background; the response returns its asof at
+    once (202), and GET /api/screener/run/<asof> reports its status. If a
+    run is already in progress, that run is returned instead (200).
+    Ticker subsets are only available from screener_cli.py.
+
+    Request body (all optional):
+    {
+        "metrics": ["annualized_volatility", "yang_zhang_volatility"],
+        "lookback_days": 252,   # Trading days per ticker (null for full history)
+        "workers": 8            # Worker processes
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if data.get('tickers'):
+            return jsonify({
+                'success': False,
+                'error': 'Screener runs over HTTP cover every active ticker; use screener_cli.py for subsets'
+            }), 400
+
+        try:
+            workers = max(1, min(int(data.get('workers', SCREENER_WORKERS)), SCREENER_WORKERS))
+            lookback_days = data.get('lookback_days', SCREENER_LOOKBACK_DAYS)
+            job = submit_screener_run(
+                metrics=data.get('metrics'),
+                lookback_days=int(lookback_days) if lookback_days else None,
+                workers=workers
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({'success': True, **job}), 202 if job['started_now'] else 200
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/screener/run/<asof>', methods=['GET'])
+def get_volatility_screener_run(asof):
+    """Status of a background screener run (running, done with its summary, or failed)."""
+    job = screener_job(asof)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown screener run: {asof}'}), 404
+    return jsonify({'success': True, **job})
+
+
+@app.route('/api/screener', methods=['GET'])
+def get_volatility_screener():
+    """
+    Serve a sorted, filtered page of the latest (or a given) screener snapshot.
+
+    Query params:
+    - sort: Metric or info column to sort by (default annualized_volatility)
+    - order: 'desc' (default) or 'asc'
+    - limit / offset: Paging
+    - min_<metric> / max_<metric>: Optional bounds on any stored metric
+    - sector: Optional sector
+    - asof: Optional snapshot timestamp (default: latest full run that computed the sort metric)
+    """
+    try:
+        filters = {}
+        for metric in METRIC_COLUMNS:
+            low = request.args.get(f'min_{metric}', type=float)
+            high = request.args.get(f'max_{metric}', type=float)
+            if low is not None or high is not None:
+                filters[metric] = (low, high)
+
+        limit = max(1, min(request.args.get('limit', SCREENER_PAGE_SIZE, type=int), SCREENER_MAX_PAGE_SIZE))
+        offset = max(0, request.args.get('offset', 0, type=int))
+
+        try:
+            page = metrics_store.load_page(
+                sort_by=request.args.get('sort', 'annualized_volatility'),
+                order=request.args.get('order', 'desc').lower(),
+                limit=limit,
+                offset=offset,
+                filters=filters,
+                sector=request.args.get('sector'),
+                asof=request.args.get('asof')
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        if page['asof'] is None:
+            return jsonify({
+                'success': False,
+                'error': 'No screener snapshot yet. Run POST /api/screener/run or screener_cli.py first.'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'asof': page['asof'],
+            'total': page['total'],
+            'limit': limit,
+            'offset': offset,
+            'rows': page['rows'],
+            'available_metrics': list(METRIC_COLUMNS),
+            'default_metrics': list(DEFAULT_SCREENER_METRICS)
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/correlation', methods=['GET', 'POST'])
+def get_correlation_matrix():
+    """
+    Correlation and covariance matrices of daily log returns for many stored tickers.
+
+    Parameters (query string for GET, JSON body for POST):
+    - tickers: Comma-separated string or list of tickers (at least 2)
+    - lookback_days: Trading days of the date-aligned calendar (default 252, 0 for full history)
+    - method: 'sample' (pairwise-complete, default) or 'ewma'
+    - shrinkage: 'none' (default) or 'ledoit_wolf'
+    - ewma_lambda: EWMA decay factor (default 0.94)
+    - rolling_window: Optional window for rolling pairwise correlations
+    """
+    try:
+        params = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+        tickers = params.get('tickers') or []
+        if isinstance(tickers, str):
+            tickers = [t.strip() for t in tickers.split(',') if t.strip()]
+
+        try:
+            lookback_days = int(params.get('lookback_days', DEFAULT_LOOKBACK_DAYS))
+            ewma_lambda = float(params.get('ewma_lambda', EWMA_LAMBDA))
+            rolling_window = int(params.get('rolling_window') or 0) or None
+            if not 0 < ewma_lambda < 1:
+                raise ValueError('ewma_lambda must be between 0 and 1')
+            result = correlation_matrix(
+                tickers,
+                lookback_days=max(0, lookback_days) or None,
+                method=params.get('method', 'sample'),
+                shrinkage=params.get('shrinkage', 'none'),
+                ewma_lambda=ewma_lambda,
+                rolling_window=rolling_window
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        def to_json(matrix):
+            matrix = np.asarray(matrix, dtype=float)
+            return np.where(np.isfinite(matrix), matrix, None).tolist()
+
+        response = {
+            'success': True,
+            **{k: v for k, v in result.items() if k not in ('covariance', 'correlation', 'n_obs', 'rolling')},
+            'covariance': to_json(result['covariance']),
+            'correlation': to_json(result['correlation']),
+            'n_obs': np.asarray(result['n_obs']).astype(int).tolist()
+        }
+        if 'rolling' in result:
+            response['rolling'] = {**result['rolling'], 'correlation': to_json(result['rolling']['correlation'])}
+        return jsonify(response)
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/portfolio/var', methods=['POST'])
+def get_portfolio_var():
+    """
+    Value at Risk and Expected Shortfall of a weighted portfolio of stored tickers.
+
+    Request body:
+    {
+        "weights": {"AAPL": 0.6, "MSFT": 0.4},  # Fractions of portfolio value (negative for shorts)
+        "confidence_level": 0.99,               # Optional (default 0.95)
+        "horizon": 10,                          # Optional holding period in days (default 1)
+        "methods": ["historical", "parametric", "monte_carlo"],  # Optional (default all)
+        "portfolio_value": 1000000,             # Optional (default 1, i.e. fractions)
+        "lookback_days": 504,                   # Optional trading days of history
+        "n_sim": 100000,                        # Optional Monte Carlo scenarios
+        "seed": 42                              # Optional Monte Carlo seed
+    }
+
+    Each method in results reports var/es in portfolio currency and
+    var_pct/es_pct as percentages of portfolio value (4.58 for a 4.58% loss).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        weights = data.get('weights')
+        if not isinstance(weights, dict) or not weights:
+            return jsonify({'success': False, 'error': 'weights must be a non-empty {ticker: weight} object'}), 400
+
+        try:
+            horizon = int(data.get('horizon', 1))
+            n_sim = int(data.get('n_sim', VAR_MC_SIMULATIONS))
+            lookback_days = data.get('lookback_days', VAR_LOOKBACK_DAYS)
+            if not 1 <= horizon <= VAR_MAX_HORIZON:
+                raise ValueError(f'horizon must be between 1 and {VAR_MAX_HORIZON}')
+            if not 1000 <= n_sim <= VAR_MAX_SIMULATIONS:
+                raise ValueError(f'n_sim must be between 1000 and {VAR_MAX_SIMULATIONS}')
+            methods = data.get('methods') or list(VAR_METHODS)
+            if isinstance(methods, str):
+                methods = [m.strip() for m in methods.split(',')]
+
+            result = calculate_portfolio_var(
+                weights,
+                confidence_level=float(data.get('confidence_level', 0.95)),
+                horizon=horizon,
+                methods=methods,
+                portfolio_value=float(data.get('portfolio_value', 1.0)),
+                lookback_days=int(lookback_days) if lookback_days else None,
+                n_sim=n_sim,
+                seed=data.get('seed')
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # Frontend routes
 @app.route('/')
 def serve_index():
@@ -1023,6 +1754,11 @@ if __name__ == '__main__':
     print("  GET  /api/stock/<ticker>/info - Get stock information")
     print("  GET  /api/stock/<ticker>/prices - Get historical prices")
     print("  GET  /api/stock/<ticker>/volatility - Calculate volatility metrics")
+    print("  GET  /api/screener - Sorted/filtered volatility screener page")
+    print("  GET  /api/correlation - Correlation/covariance matrix for many tickers")
+    print("  POST /api/portfolio/var - Portfolio VaR/ES (historical, parametric, Monte Carlo)")
+    print("  POST /api/screener/run - Start recomputing the volatility screener snapshot")
+    print("  GET  /api/screener/run/<asof> - Status of a screener run")
     print("  POST /api/stock/<ticker>/load - Load stock data from Yahoo Finance")
     print("  POST /api/stock/<ticker>/update - Update stock data")
     print("  GET  /api/health - Health check")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Module - Coalesces concurrent identical computations
+Callers asking for the same key while a computation is in flight wait for it
+and share its result, across threads and (via lock files) across worker processes.
+Cross-process results are exchanged as bytes from caller-supplied encode/decode
+functions in a private (0700, owner-checked) directory, never as pickles
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms coalesce within one process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares the result."""
+
+    def __init__(self, lock_dir: Optional[Path] = None, result_ttl: float = 300,
+                 encode: Optional[Callable[[Any], bytes]] = None,
+                 decode: Optional[Callable[[bytes], Any]] = None):
+        """
+        Initialize the single-flight group.
+
+        Args:
+            lock_dir: Directory for cross-process lock and result files (None = threads only)
+            result_ttl: Seconds result, lock and temp files are kept before cleanup
+            encode: Serializes a result for waiting processes (None = share only the lock)
+            decode: Inverse of encode
+        """
+        self.lock_dir = Path(lock_dir) if lock_dir and fcntl is not None else None
+        self.result_ttl = result_ttl
+        self.encode = encode
+        self.decode = decode
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+        self.stats = {
+            'calls': 0,
+            'computations': 0,
+            'coalesced_threads': 0,
+            'coalesced_processes': 0
+        }
+
+        if self.lock_dir is not None and not self._private_dir(self.lock_dir):
+            logger.warning(f"Single-flight directory {self.lock_dir} is not private to this user; "
+                           f"coalescing within this process only")
+            self.lock_dir = None
+
+    @staticmethod
+    def _private_dir(path: Path) -> bool:
+        """Create path with mode 0700 if needed; True if it is a real directory only we can access."""
+        try:
+            path.mkdir(mode=0o700, parents=True, exist_ok=True)
+            info = os.lstat(path)
+        except OSError as e:
+            logger.warning(f"Cannot create single-flight directory {path}: {e}")
+            return False
+        return (stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid()
+                and not info.st_mode & (stat.S_IRWXG | stat.S_IRWXO))
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Return fn() for key, sharing one execution among concurrent callers.
+
+        Exceptions raised by the shared computation propagate to every caller.
+        """
+        with self._lock:
+            self.stats['calls'] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.stats['coalesced_threads'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._run_leader(key, fn)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def metrics(self) -> Dict:
+        """Call, computation and coalescing counters."""
+        with self._lock:
+            metrics = dict(self.stats)
+            metrics['in_flight'] = len(self._calls)
+        metrics['coalesced_total'] = metrics['coalesced_threads'] + metrics['coalesced_processes']
+        metrics['cross_process'] = self.lock_dir is not None
+        return metrics
+
+    def _compute(self, fn: Callable[[], Any]) -> Any:
+        """Run the computation and count it."""
+        result = fn()
+        with self._lock:
+            self.stats['computations'] += 1
+        return result
+
+    def _run_leader(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Compute as this process's leader.
+
+        With a lock directory, processes serialize on a per-key lock file; with
+        an encoder, a process that waited reuses the result file written while
+        it was blocked.
+        """
+        if self.lock_dir is None:
+            return self._compute(fn)
+
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        result_path = self.lock_dir / f'{name}.result'
+        requested_at = time.time()
+
+        lock_file = self._acquire(self.lock_dir / f'{name}.lock')
+        try:
+            if self.decode is not None:
+                shared = self._read_shared(result_path, requested_at)
+                if shared is not None:
+                    with self._lock:
+                        self.stats['coalesced_processes'] += 1
+                    return shared
+
+            result = self._compute(fn)
+            if self.encode is not None:
+                self._write_shared(result_path, result)
+            return result
+        finally:
+            lock_file.close()  # Releases the flock
+            self._prune()
+
+    @staticmethod
+    def _acquire(lock_path: Path):
+        """Open and exclusively lock lock_path, retrying if it was pruned while we waited."""
+        while True:
+            lock_file = open(lock_path, 'a+')
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    def _read_shared(self, result_path: Path, requested_at: float) -> Optional[Any]:
+        """Load a result another process finished after this caller started waiting."""
+        try:
+            if result_path.stat().st_mtime < requested_at:
+                return None
+            with open(result_path, 'rb') as fh:
+                return self.decode(fh.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable single-flight result {result_path.name}: {e}")
+            return None
+
+    def _write_shared(self, result_path: Path, result: Any):
+        """Atomically publish a result for waiting processes."""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.lock_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(self.encode(result))
+            os.replace(tmp_path, result_path)
+        except Exception as e:
+            logger.warning(f"Failed to share single-flight result: {e}")
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _prune(self):
+        """Delete result, temp and unused lock files older than result_ttl."""
+        cutoff = time.time() - self.result_ttl
+        for path in self.lock_dir.iterdir():
+            try:
+                if path.suffix not in ('.result', '.tmp', '.lock') or path.stat().st_mtime >= cutoff:
+                    continue
+                if path.suffix != '.lock':
+                    path.unlink()
+                    continue
+                # Only remove a lock nobody holds; holders re-check the inode after locking
+                with open(path, 'a+') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    path.unlink()
+            except OSError:
+                continue
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Surface Refresh Scheduler - Keeps frequently requested IV surfaces warm
+Tracks request frequency per cache key and refreshes the hottest entries on a
+worker pool before they expire (stale-while-revalidate)
+"""
+
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+
+class SurfaceRefreshScheduler:
+    """Background pre-computation of the top-N most requested surfaces."""
+
+    def __init__(self, compute_fn: Callable[[Hashable], Any],
+                 store_fn: Callable[[Hashable, Any], None],
+                 entry_fn: Callable[[Hashable], Optional[Tuple[Any, float]]],
+                 ttl: float = 300, refresh_ahead: float = 60, top_n: int = 10,
+                 workers: int = 2, interval: float = 15, half_life: float = 1800,
+                 min_score: float = 2.0, evict_score: float = 0.05,
+                 max_backoff: float = 3600):
+        """
+        Initialize the scheduler.
+
+        Args:
+            compute_fn: Builds the value for a cache key (runs on the worker pool)
+            store_fn: Stores a freshly computed value under its key
+            entry_fn: Returns (value, computed_at) for a key, or None when not cached
+            ttl: Seconds a cache entry is considered fresh
+            refresh_ahead: Refresh hot entries this many seconds before they expire
+            top_n: Number of hottest keys kept warm
+            workers: Size of the refresh worker pool
+            interval: Seconds between scheduler sweeps
+            half_life: Half-life in seconds of the request frequency score
+            min_score: Decayed score a key needs before it is refreshed in the background
+            evict_score: Keys whose decayed score falls below this stop being tracked
+            max_backoff: Longest wait in seconds before retrying a key whose refresh failed
+        """
+        self.compute_fn = compute_fn
+        self.store_fn = store_fn
+        self.entry_fn = entry_fn
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.top_n = top_n
+        self.workers = workers
+        self.interval = interval
+        self.half_life = half_life
+        self.min_score = min_score
+        self.evict_score = evict_score
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._scores: Dict[Hashable, Tuple[float, float]] = {}  # key -> (score, last_update)
+        self._queued: Dict[Hashable, float] = {}  # key -> enqueue time
+        self._running: Dict[Hashable, float] = {}  # key -> start time
+        self._failures: Dict[Hashable, Tuple[int, float]] = {}  # key -> (consecutive failures, retry at)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.stats = {
+            'refreshes_completed': 0,
+            'refreshes_failed': 0,
+            'refreshes_scheduled': 0,
+            'stale_served': 0,
+            'last_refresh_seconds': None
+        }
+
+    def start(self):
+        """Start the worker pool and the sweep thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='surface-refresh')
+            self._thread = threading.Thread(target=self._run, name='surface-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop sweeping and let queued refreshes finish."""
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def record_request(self, key: Hashable):
+        """Bump the decayed request frequency of a key and make sure the scheduler runs."""
+        now = time.time()
+        with self._lock:
+            score, last = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decay(score, now - last) + 1.0, now)
+        self.start()
+
+    def note_stale_served(self):
+        """Count a response served from an expired entry while it is being refreshed."""
+        with self._lock:
+            self.stats['stale_served'] += 1
+
+    def schedule_refresh(self, key: Hashable) -> bool:
+        """
+        Queue a refresh for a key unless one is already queued or running, or
+        the key is backing off after failed refreshes.
+
+        Returns:
+            bool: True if a new refresh was queued
+        """
+        self.start()
+        with self._lock:
+            if key in self._queued or key in self._running:
+                return False
+            failure = self._failures.get(key)
+            if failure is not None and time.time() < failure[1]:
+                return False
+            self._queued[key] = time.time()
+            self.stats['refreshes_scheduled'] += 1
+        self._executor.submit(self._refresh, key)
+        return True
+
+    def hot_keys(self):
+        """Keys ordered by decayed request frequency, hottest first."""
+        now = time.time()
+        with self._lock:
+            scored = [(self._decay(score, now - last), key) for key, (score, last) in self._scores.items()]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(key, score) for score, key in scored]
+
+    def metrics(self) -> Dict:
+        """Queue depth, queue age and refresh counters."""
+        now = time.time()
+        with self._lock:
+            oldest_queued = min(self._queued.values()) if self._queued else None
+            metrics = {
+                'queue_depth': len(self._queued),
+                'in_flight': len(self._running),
+                'oldest_queued_age_seconds': now - oldest_queued if oldest_queued else 0.0,
+                'tracked_keys': len(self._scores),
+                'backed_off_keys': sum(1 for _, retry_at in self._failures.values() if retry_at > now),
+                'running': self._thread is not None and self._thread.is_alive(),
+                **self.stats
+            }
+
+        hot = []
+        for key, score in self.hot_keys()[:self.top_n]:
+            entry = self.entry_fn(key)
+            hot.append({
+                'key': list(key) if isinstance(key, tuple) else key,
+                'score': round(score, 3),
+                'age_seconds': round(now - entry[1], 1) if entry else None
+            })
+        metrics['hot_keys'] = hot
+        return metrics
+
+    def _decay(self, score: float, elapsed: float) -> float:
+        """Exponential decay of a frequency score."""
+        return score * 0.5 ** (elapsed / self.half_life)
+
+    def _run(self):
+        """Sweep loop: refresh hot keys that are missing or about to expire."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Surface scheduler sweep failed: {e}")
+
+    def sweep(self):
+        """
+        Queue refreshes for the top-N keys whose entries expire within refresh_ahead.
+
+        Keys below min_score are left to expire, and keys that have gone cold
+        (below evict_score) are forgotten.
+        """
+        now = time.time()
+        self._evict_cold(now)
+        for key, score in self.hot_keys()[:self.top_n]:
+            if score < self.min_score:
+                break
+            entry = self.entry_fn(key)
+            if entry is None or now - entry[1] >= self.ttl - self.refresh_ahead:
+                self.schedule_refresh(key)
+
+    def _evict_cold(self, now: float):
+        """Forget keys whose decayed score fell below evict_score."""
+        with self._lock:
+            cold = [key for key, (score, last) in self._scores.items()
+                    if self._decay(score, now - last) < self.evict_score]
+            for key in cold:
+                del self._scores[key]
+                self._failures.pop(key, None)
+
+    def _refresh(self, key: Hashable):
+        """Worker task: recompute and store one key."""
+        started = time.time()
+        with self._lock:
+            self._queued.pop(key, None)
+            self._running[key] = started
+        try:
+            value = self.compute_fn(key)
+            if value is not None:
+                self.store_fn(key, value)
+            with self._lock:
+                self._failures.pop(key, None)
+                self.stats['refreshes_completed'] += 1
+                self.stats['last_refresh_seconds'] = round(time.time() - started, 3)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key}: {e}")
+            with self._lock:
+                # Exponential backoff so a key that cannot be fitted stops hitting the data source
+                failures = self._failures.get(key, (0, 0.0))[0] + 1
+                delay = min(self.interval * 2 ** failures, self.max_backoff)
+                self._failures[key] = (failures, time.time() + delay)
+                self.stats['refreshes_failed'] += 1
+        finally:
+            with self._lock:
+                self._running.pop(key, None)
@@ -28,6 +28,57 @@ DEFAULT_PERIOD = '1y'
 DEFAULT_MA_WINDOWS = [5, 20, 40, 50]
 MAX_SEARCH_RESULTS = 50
 
+# IV surface cache configuration
+IV_SURFACE_TTL = 300  # Seconds a surface fit is served as fresh
+IV_SURFACE_MAX_STALE = 1800  # Seconds an expired fit may still be served while it refreshes
+IV_SURFACE_REFRESH_AHEAD = 60  # Refresh hot surfaces this many seconds before expiry
+IV_SURFACE_REFRESH_TOP_N = 10  # Number of most requested surfaces kept warm
+IV_SURFACE_REFRESH_WORKERS = 2
+IV_SURFACE_REFRESH_INTERVAL = 15  # Seconds between scheduler sweeps
+IV_SURFACE_REFRESH_MIN_SCORE = 2.0  # Decayed request count a surface needs to be kept warm
+IV_SURFACE_EVICT_SCORE = 0.05  # Surfaces whose decayed request count drops below this are forgotten
+IV_SURFACE_REFRESH_MAX_BACKOFF = 3600  # Longest retry delay (seconds) after failed background refreshes
+# Lock/result files that let worker processes share one in-flight surface computation
+# (created 0700 inside the app's data directory; refused if another user can access it)
+SINGLE_FLIGHT_DIR = DATA_DIR / 'single_flight'
+
+# Market data configuration
+SPOT_PRICE_TTL = 30  # Seconds a fetched spot price is reused
+OPTION_CHAIN_TTL = 60  # Seconds a fetched (ticker, expiry) option chain is reused
+OPTION_REFERENCE_TTL = 3600  # Seconds expiration lists, dividend yields and the risk-free rate are reused
+OPTION_CHAIN_CACHE_SIZE = 500  # Maximum cached option chains
+
+# Option snapshot retention (applied per ticker whenever a new snapshot is written)
+OPTION_SNAPSHOT_MAX_AGE_DAYS = 90  # Delete snapshots older than this (None keeps all ages)
+OPTION_SNAPSHOT_MAX_PER_TICKER = 500  # Keep at most this many as-of timestamps per ticker
+
+# Monte Carlo pricing configuration
+MC_WORKERS = min(os.cpu_count() or 1, 8)  # Default worker count for Monte Carlo pricing
+MC_MAX_WORKERS = 16
+MC_EXECUTOR = 'thread'  # 'thread' or 'process'
+MC_MAX_SIMULATIONS = 100_000_000  # Upper bound on paths per request
+
+# Volatility screener configuration
+SCREENER_WORKERS = min(os.cpu_count() or 1, 8)  # Worker processes per screener run
+SCREENER_CHUNK_SIZE = 50  # Tickers per bulk read / worker task
+SCREENER_LOOKBACK_DAYS = 252  # Trading days of history per ticker
+SCREENER_PAGE_SIZE = 50
+SCREENER_MAX_PAGE_SIZE = 500
+SCREENER_KEEP_RUNS = 20  # Stored screener runs kept (older runs are deleted on save)
+
+# Correlation service configuration
+CORRELATION_CACHE_SIZE = 64  # Cached correlation/covariance results
+CORRELATION_MAX_TICKERS = 1000  # Tickers per correlation request
+CORRELATION_MAX_ROLLING_TICKERS = 50  # Tickers when rolling correlations are requested
+
+# Portfolio VaR configuration
+VAR_LOOKBACK_DAYS = 504  # Trading days of history (2 years)
+VAR_MC_SIMULATIONS = 100_000  # Default Monte Carlo scenarios
+VAR_MAX_SIMULATIONS = 2_000_000  # Upper bound on scenarios per request
+VAR_MAX_HORIZON = 252  # Longest holding period in days
+VAR_MAX_POSITIONS = 1000  # Tickers per portfolio
+VAR_MAX_MC_ELEMENTS = 200_000_000  # Upper bound on Monte Carlo scenarios x positions per request
+
 # Logging configuration
 LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
\ No newline at end of file
@@ -13,6 +13,8 @@ import os
 import csv
 from datetime import datetime
 from src.config import DATABASE_PATH, TICKER_DATA_PATH
+from src.database.option_snapshots import create_snapshot_table
+from src.database.metrics_snapshot import create_metrics_snapshot_table
 
 def create_database(db_path=None):
     """
@@ -109,6 +111,16 @@ def create_database(db_path=None):
         
         print("✓ Created 'ticker_reference' table")
         
+        # Create option_snapshots table for persisted option chains
+        create_snapshot_table(cursor)
+        
+        print("✓ Created 'option_snapshots' table")
+        
+        # Create metrics_snapshot and metrics_runs tables for screener results
+        create_metrics_snapshot_table(cursor)
+        
+        print("✓ Created 'metrics_snapshot' and 'metrics_runs' tables")
+        
         # Create indexes for efficient searching
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_ticker_reference_name 
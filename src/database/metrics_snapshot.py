@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Metrics Snapshot Store - Persists cross-sectional screener results to SQLite
+Each screener run writes one row per ticker under a shared as-of timestamp,
+so sorted and filtered pages are served straight from an indexed table.
+Runs are registered in metrics_runs with their metrics and whether they
+covered the full universe; only full runs are served by default
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import sqlite3
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+from src.config import DATABASE_PATH, SCREENER_KEEP_RUNS
+
+logger = logging.getLogger(__name__)
+
+# Metric columns stored per ticker (NULL when not computed in a run)
+METRIC_COLUMNS = (
+    'annualized_volatility',
+    'volatility_20d',
+    'volatility_60d',
+    'volatility_percentile',
+    'robust_volatility_mad',
+    'parkinson_volatility',
+    'garman_klass_volatility',
+    'rogers_satchell_volatility',
+    'yang_zhang_volatility',
+    'ewma_volatility',
+    'garch_volatility',
+    'mean_return',
+    'skewness',
+    'kurtosis',
+    'period_return',
+)
+
+# Non-metric columns that pages can also be sorted by
+INFO_COLUMNS = ('ticker', 'company_name', 'sector', 'n_obs', 'last_date', 'last_close')
+
+SORT_ORDERS = ('asc', 'desc')
+
+
+class MetricsSnapshotStore:
+    """Reads and writes screener results in the metrics_snapshot table."""
+
+    def __init__(self, db_path=None):
+        """
+        Initialize the metrics store.
+
+        Args:
+            db_path (str): Path to the SQLite database
+        """
+        self.db_path = db_path if db_path else str(DATABASE_PATH)
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the metrics table on first use."""
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Database not found: {self.db_path}")
+
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            create_metrics_snapshot_table(conn.cursor())
+            conn.commit()
+            self._schema_ready = True
+        return conn
+
+    def save_run(self, asof: str, rows: List[Dict], lookback_days: Optional[int] = None,
+                 metrics: Optional[List[str]] = None, full_universe: bool = True,
+                 keep_runs: Optional[int] = SCREENER_KEEP_RUNS) -> int:
+        """
+        Store one screener run and drop runs beyond the retention limit.
+
+        Args:
+            asof: Run timestamp shared by all rows
+            rows: One dict per ticker with INFO_COLUMNS and any METRIC_COLUMNS
+            lookback_days: Price history length the run used
+            metrics: Metrics the run computed (None if unknown)
+            full_universe: False for runs over a subset of tickers
+            keep_runs: Keep only the latest N full runs and N subset runs (None keeps all)
+
+        Returns:
+            int: Number of tickers stored
+        """
+        columns = ('asof', 'lookback_days', *INFO_COLUMNS, *METRIC_COLUMNS)
+        values = [(asof, lookback_days, *(row.get(col) for col in columns[2:])) for row in rows]
+        if not values:
+            return 0
+
+        conn = self._connect()
+        try:
+            conn.executemany(f'''
+                INSERT OR REPLACE INTO metrics_snapshot ({', '.join(columns)})
+                VALUES ({', '.join(['?'] * len(columns))})
+            ''', values)
+            conn.execute('''
+                INSERT OR REPLACE INTO metrics_runs (asof, lookback_days, metrics, full_universe, n_tickers)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (asof, lookback_days, ','.join(metrics) if metrics else None, int(full_universe), len(values)))
+            if keep_runs is not None:
+                self._prune(conn, keep_runs)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(values)
+
+    def prune(self, keep_runs: int = SCREENER_KEEP_RUNS) -> int:
+        """
+        Delete all but the latest keep_runs full runs and keep_runs subset runs.
+
+        Returns:
+            int: Number of rows deleted
+        """
+        conn = self._connect()
+        try:
+            deleted = self._prune(conn, keep_runs)
+            conn.commit()
+        finally:
+            conn.close()
+        return deleted
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection, keep_runs: int) -> int:
+        """Delete runs beyond the latest keep_runs of each kind (caller commits)."""
+        # Subset runs are retained separately so they never push out full runs
+        stale = []
+        for full_universe in (1, 0):
+            stale += [row[0] for row in conn.execute('''
+                SELECT asof FROM metrics_runs WHERE full_universe = ?
+                ORDER BY asof DESC LIMIT -1 OFFSET ?
+            ''', (full_universe, max(int(keep_runs), 1)))]
+
+        deleted = 0
+        for asof in stale:
+            deleted += conn.execute('DELETE FROM metrics_snapshot WHERE asof = ?', (asof,)).rowcount
+            conn.execute('DELETE FROM metrics_runs WHERE asof = ?', (asof,))
+        return deleted
+
+    @staticmethod
+    def _latest_asof(conn: sqlite3.Connection, metric: Optional[str] = None) -> Optional[str]:
+        """Latest full-universe run, optionally the latest that computed metric."""
+        for row in conn.execute('''
+            SELECT asof, metrics FROM metrics_runs WHERE full_universe = 1 ORDER BY asof DESC
+        '''):
+            # Runs recorded before metrics were tracked have metrics NULL
+            if metric is None or row['metrics'] is None or metric in row['metrics'].split(','):
+                return row['asof']
+        return None
+
+    def latest_asof(self, metric: Optional[str] = None) -> Optional[str]:
+        """
+        Timestamp of the most recent full-universe run.
+
+        Args:
+            metric: Only consider runs that computed this metric
+
+        Returns:
+            str: As-of timestamp (None if no such run exists)
+        """
+        conn = self._connect()
+        try:
+            return self._latest_asof(conn, metric)
+        finally:
+            conn.close()
+
+    def load_page(self, sort_by: str = 'annualized_volatility', order: str = 'desc',
+                  limit: int = 50, offset: int = 0,
+                  filters: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+                  sector: Optional[str] = None, asof: Optional[str] = None) -> Dict:
+        """
+        One sorted, filtered page of a run.
+
+        Args:
+            sort_by: Metric or info column to sort by (NULLs last)
+            order: 'asc' or 'desc'
+            limit: Page size
+            offset: Rows to skip
+            filters: metric -> (min, max), either bound optional
+            sector: Optional exact sector match
+            asof: Run timestamp (default: latest full-universe run that computed
+                sort_by when it is a metric)
+
+        Returns:
+            dict with asof, total matching rows and the page rows
+
+        Raises:
+            ValueError: If the sort column, order or a filter metric is unknown
+        """
+        if sort_by not in METRIC_COLUMNS + INFO_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort_by}")
+        if order not in SORT_ORDERS:
+            raise ValueError(f"order must be one of: {', '.join(SORT_ORDERS)}")
+
+        conn = self._connect()
+        try:
+            if asof is None:
+                asof = self._latest_asof(conn, sort_by if sort_by in METRIC_COLUMNS else None)
+                if asof is None:
+                    return {'asof': None, 'total': 0, 'rows': []}
+
+            conditions = ['asof = ?']
+            params = [asof]
+            for metric, (low, high) in (filters or {}).items():
+                if metric not in METRIC_COLUMNS:
+                    raise ValueError(f"Unknown filter metric: {metric}")
+                if low is not None:
+                    conditions.append(f'{metric} >= ?')
+                    params.append(low)
+                if high is not None:
+                    conditions.append(f'{metric} <= ?')
+                    params.append(high)
+            if sector:
+                conditions.append('sector = ?')
+                params.append(sector)
+            where = ' AND '.join(conditions)
+
+            total = conn.execute(f'SELECT COUNT(*) FROM metrics_snapshot WHERE {where}', params).fetchone()[0]
+            rows = conn.execute(f'''
+                SELECT {', '.join(INFO_COLUMNS + METRIC_COLUMNS)}
+                FROM metrics_snapshot
+                WHERE {where}
+                ORDER BY {sort_by} IS NULL, {sort_by} {order.upper()}, ticker
+                LIMIT ? OFFSET ?
+            ''', params + [int(limit), int(offset)]).fetchall()
+        finally:
+            conn.close()
+
+        return {'asof': asof, 'total': total, 'rows': [dict(row) for row in rows]}
+
+
+def create_metrics_snapshot_table(cursor: sqlite3.Cursor):
+    """Create the metrics_snapshot table (keyed and indexed by asof, ticker) and the metrics_runs registry."""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS metrics_snapshot (
+            asof TIMESTAMP NOT NULL,
+            ticker TEXT NOT NULL,
+            company_name TEXT,
+            sector TEXT,
+            lookback_days INTEGER,
+            n_obs INTEGER,
+            last_date DATE,
+            last_close REAL,
+            {' REAL, '.join(METRIC_COLUMNS)} REAL,
+            PRIMARY KEY (asof, ticker)
+        )
+    ''')
+    # The (asof, ticker) primary key already serves as-of lookups; drop the
+    # duplicate index older databases were created with
+    cursor.execute('DROP INDEX IF EXISTS idx_metrics_snapshot_asof')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS metrics_runs (
+            asof TIMESTAMP PRIMARY KEY,
+            lookback_days INTEGER,
+            metrics TEXT,
+            full_universe INTEGER NOT NULL DEFAULT 1,
+            n_tickers INTEGER
+        )
+    ''')
+    # Register snapshots stored before runs were tracked
+    cursor.execute('''
+        INSERT OR IGNORE INTO metrics_runs (asof, lookback_days, n_tickers)
+        SELECT asof, MAX(lookback_days), COUNT(*) FROM metrics_snapshot GROUP BY asof
+    ''')
+
+
+# Create singleton instance
+metrics_store = MetricsSnapshotStore()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Option Snapshot Store - Persists every fetched option chain to SQLite
+Each (ticker, as-of, expiry, type) chain is stored as one row of compressed
+columnar arrays so historical surfaces and Greeks can be rebuilt offline
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import sqlite3
+import os
+import zlib
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.config import DATABASE_PATH, OPTION_SNAPSHOT_MAX_AGE_DAYS, OPTION_SNAPSHOT_MAX_PER_TICKER
+
+logger = logging.getLogger(__name__)
+
+# yfinance column name -> snapshot column name
+SNAPSHOT_COLUMNS = {
+    'strike': 'strike',
+    'bid': 'bid',
+    'ask': 'ask',
+    'lastPrice': 'last_price',
+    'volume': 'volume',
+    'openInterest': 'open_interest',
+    'impliedVolatility': 'implied_volatility',
+}
+
+OPTION_TYPES = ('call', 'put')
+
+
+def encode_column(values) -> bytes:
+    """Pack a numeric column into a compressed little-endian float64 blob (NaN = missing)."""
+    arr = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='<f8', na_value=np.nan)
+    return zlib.compress(arr.tobytes(), 1)
+
+
+def decode_column(blob: Optional[bytes], n: int) -> np.ndarray:
+    """Unpack a blob written by encode_column."""
+    if blob is None:
+        return np.full(n, np.nan)
+    return np.frombuffer(zlib.decompress(blob), dtype='<f8', count=n)
+
+
+class OptionSnapshotStore:
+    """Reads and writes option chain snapshots in the option_snapshots table."""
+
+    def __init__(self, db_path=None):
+        """
+        Initialize the snapshot store.
+
+        Args:
+            db_path (str): Path to the SQLite database
+        """
+        self.db_path = db_path if db_path else str(DATABASE_PATH)
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the snapshot table on first use."""
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Database not found: {self.db_path}")
+
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            create_snapshot_table(conn.cursor())
+            conn.commit()
+            self._schema_ready = True
+        return conn
+
+    def save_chain(self, ticker: str, expiry: str, calls: Optional[pd.DataFrame] = None,
+                   puts: Optional[pd.DataFrame] = None, asof: Optional[str] = None,
+                   spot_price: Optional[float] = None, source: str = 'yfinance') -> int:
+        """
+        Save the calls and puts of one expiry.
+
+        Args:
+            ticker: Stock ticker symbol
+            expiry: Expiration date (YYYY-MM-DD)
+            calls: Call chain with yfinance column names
+            puts: Put chain with yfinance column names
+            asof: Snapshot timestamp shared by all expiries of one fetch (default now)
+            spot_price: Underlying price at fetch time
+            source: Data source name
+
+        Returns:
+            int: Number of contracts stored
+        """
+        asof = asof or snapshot_timestamp()
+        rows = []
+        for option_type, df in zip(OPTION_TYPES, (calls, puts)):
+            if df is None or df.empty or 'strike' not in df.columns:
+                continue
+            n = len(df)
+            blobs = [encode_column(df[col]) if col in df.columns else None
+                     for col in SNAPSHOT_COLUMNS]
+            rows.append((ticker.upper(), asof, expiry, option_type,
+                         float(spot_price) if spot_price is not None else None,
+                         n, *blobs, source))
+
+        if not rows:
+            return 0
+
+        conn = self._connect()
+        try:
+            conn.executemany(f'''
+                INSERT OR REPLACE INTO option_snapshots
+                (ticker, asof, expiry, option_type, spot_price, n_contracts,
+                 {', '.join(SNAPSHOT_COLUMNS.values())}, source)
+                VALUES ({', '.join(['?'] * (len(SNAPSHOT_COLUMNS) + 7))})
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return sum(row[5] for row in rows)
+
+    def prune(self, ticker: Optional[str] = None,
+              max_age_days: Optional[int] = OPTION_SNAPSHOT_MAX_AGE_DAYS,
+              max_per_ticker: Optional[int] = OPTION_SNAPSHOT_MAX_PER_TICKER) -> int:
+        """
+        Apply the retention policy.
+
+        Args:
+            ticker: Only prune this ticker (default: all tickers)
+            max_age_days: Delete snapshots older than this many days (None: no age limit)
+            max_per_ticker: Keep only the latest N as-of timestamps per ticker (None: no limit)
+
+        Returns:
+            int: Number of chain rows deleted
+        """
+        conn = self._connect()
+        try:
+            tickers = [ticker.upper()] if ticker else [
+                row[0] for row in conn.execute('SELECT DISTINCT ticker FROM option_snapshots')]
+            deleted = 0
+            for symbol in tickers:
+                if max_age_days is not None:
+                    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+                    deleted += conn.execute('DELETE FROM option_snapshots WHERE ticker = ? AND asof < ?',
+                                            (symbol, cutoff)).rowcount
+                if max_per_ticker is not None:
+                    deleted += conn.execute('''
+                        DELETE FROM option_snapshots
+                        WHERE ticker = ? AND asof < (
+                            SELECT asof FROM (SELECT DISTINCT asof FROM option_snapshots WHERE ticker = ?)
+                            ORDER BY asof DESC LIMIT 1 OFFSET ?
+                        )
+                    ''', (symbol, symbol, max(int(max_per_ticker), 1) - 1)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return deleted
+
+    def list_snapshots(self, ticker: str, start: Optional[str] = None,
+                       end: Optional[str] = None) -> List[Dict]:
+        """
+        List the snapshots stored for a ticker, newest first.
+
+        Args:
+            ticker: Stock ticker symbol
+            start: Optional earliest as-of timestamp
+            end: Optional latest as-of timestamp
+
+        Returns:
+            List of dicts with asof, spot_price, expiries and contracts
+        """
+        query = '''
+            SELECT asof, MAX(spot_price) AS spot_price,
+                   COUNT(DISTINCT expiry) AS expiries, SUM(n_contracts) AS contracts
+            FROM option_snapshots
+            WHERE ticker = ?
+        '''
+        params = [ticker.upper()]
+        if start:
+            query += ' AND asof >= ?'
+            params.append(start)
+        if end:
+            query += ' AND asof <= ?'
+            params.append(end)
+        query += ' GROUP BY asof ORDER BY asof DESC'
+
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+        finally:
+            conn.close()
+
+    def load_snapshot(self, ticker: str, asof: Optional[str] = None,
+                      expiries: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load one snapshot as a long DataFrame using yfinance column names.
+
+        Args:
+            ticker: Stock ticker symbol
+            asof: Snapshot timestamp (default: latest)
+            expiries: Optional subset of expiration dates
+
+        Returns:
+            DataFrame with expiry, option_type, spot_price and the chain columns
+        """
+        conn = self._connect()
+        try:
+            if asof is None:
+                row = conn.execute('SELECT MAX(asof) FROM option_snapshots WHERE ticker = ?',
+                                   (ticker.upper(),)).fetchone()
+                asof = row[0] if row else None
+                if asof is None:
+                    return pd.DataFrame(columns=['expiry', 'option_type', 'spot_price',
+                                                 *SNAPSHOT_COLUMNS])
+
+            query = f'''
+                SELECT expiry, option_type, spot_price, n_contracts,
+                       {', '.join(SNAPSHOT_COLUMNS.values())}
+                FROM option_snapshots
+                WHERE ticker = ? AND asof = ?
+            '''
+            params = [ticker.upper(), asof]
+            if expiries:
+                query += f" AND expiry IN ({', '.join(['?'] * len(expiries))})"
+                params.extend(expiries)
+            query += ' ORDER BY expiry, option_type'
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        frames = []
+        for row in rows:
+            n = row['n_contracts']
+            columns = {yf_col: decode_column(row[col], n) for yf_col, col in SNAPSHOT_COLUMNS.items()}
+            frame = pd.DataFrame(columns)
+            frame.insert(0, 'spot_price', row['spot_price'])
+            frame.insert(0, 'option_type', row['option_type'])
+            frame.insert(0, 'expiry', row['expiry'])
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=['expiry', 'option_type', 'spot_price', *SNAPSHOT_COLUMNS])
+
+        result = pd.concat(frames, ignore_index=True)
+        result.attrs['asof'] = asof
+        return result
+
+
+def create_snapshot_table(cursor: sqlite3.Cursor):
+    """Create the option_snapshots table and its (ticker, asof) index."""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS option_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker TEXT NOT NULL,
+            asof TIMESTAMP NOT NULL,
+            expiry DATE NOT NULL,
+            option_type TEXT NOT NULL CHECK(option_type IN ('call', 'put')),
+            spot_price REAL,
+            n_contracts INTEGER NOT NULL,
+            {' BLOB, '.join(SNAPSHOT_COLUMNS.values())} BLOB,
+            source TEXT DEFAULT 'yfinance',
+            UNIQUE (ticker, asof, expiry, option_type)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_option_snapshots_ticker_asof
+        ON option_snapshots(ticker, asof)
+    ''')
+
+
+def snapshot_timestamp() -> str:
+    """Timestamp used to group all chains of a single fetch."""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+# Create singleton instance
+snapshot_store = OptionSnapshotStore()
+
+# One writer thread keeps snapshot writes off the request path and serializes them
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='option-snapshots')
+# (ticker, asof) of the last retention pass (writer thread only). The chains of one
+# fetch are queued back to back, so remembering only the last key prunes once per fetch
+_last_pruned: Optional[Tuple[str, str]] = None
+
+
+def _write_chain(ticker: str, expiry: str, calls, puts, asof: str, spot_price: Optional[float]) -> int:
+    """Writer task: store one chain, then apply retention once per ticker fetch."""
+    global _last_pruned
+    try:
+        stored = snapshot_store.save_chain(ticker, expiry, calls, puts, asof=asof, spot_price=spot_price)
+        if _last_pruned != (ticker, asof):
+            _last_pruned = (ticker, asof)
+            snapshot_store.prune(ticker)
+        return stored
+    except Exception as e:
+        logger.warning(f"Failed to store option snapshot for {ticker} {expiry}: {e}")
+        return 0
+
+
+def record_option_chain(ticker: str, expiry: str, calls=None, puts=None,
+                        asof: Optional[str] = None, spot_price: Optional[float] = None) -> Future:
+    """
+    Queue a best-effort snapshot write on the background writer.
+
+    Snapshot persistence must never break or slow a request, so failures are
+    logged and the returned future resolves to the number of stored contracts
+    (zero on failure).
+    """
+    return _writer.submit(_write_chain, ticker.upper(), expiry, calls, puts,
+                          asof or snapshot_timestamp(), spot_price)
+
+
+def flush_snapshot_writes():
+    """Block until every queued snapshot write has finished."""
+    _writer.submit(lambda: None).result()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Bulk Price Reader - Loads price history for many tickers in a few queries
+Per-ticker tables are read with UNION ALL statements over one connection
+and split into NumPy columns per ticker
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import re
+import sqlite3
+from typing import Dict, Iterable, Optional
+import numpy as np
+from src.config import DATABASE_PATH
+
+PRICE_COLUMNS = ('date', 'open', 'high', 'low', 'close')
+
+# SQLite limits compound SELECTs to 500 terms by default
+TABLES_PER_QUERY = 200
+
+TABLE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+def read_price_histories(tables: Dict[str, str], lookback_days: Optional[int] = None,
+                         columns: Iterable[str] = PRICE_COLUMNS,
+                         db_path=None, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Read the latest price history of many tickers.
+
+    Args:
+        tables: ticker -> price table name (from stocks_master)
+        lookback_days: Most recent rows per ticker (None reads everything)
+        columns: Columns to read; 'date' comes back as strings, the rest as
+            float arrays with NaN for missing values
+        db_path: Database path (default DATABASE_PATH)
+        conn: Optional open connection to reuse
+
+    Returns:
+        dict: ticker -> {column: array}, oldest row first; tickers without rows are omitted
+    """
+    columns = list(columns)
+    for name in columns:
+        if name not in PRICE_COLUMNS:
+            raise ValueError(f"Unknown price column: {name}")
+    for table in tables.values():
+        if not TABLE_NAME_PATTERN.match(table):
+            raise ValueError(f"Invalid table name: {table}")
+
+    value_columns = [c for c in columns if c != 'date']
+
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(str(db_path or DATABASE_PATH))
+
+    histories = {}
+    items = list(tables.items())
+    try:
+        for start in range(0, len(items), TABLES_PER_QUERY):
+            batch = items[start:start + TABLES_PER_QUERY]
+            selects = []
+            params = []
+            for i, (ticker, table) in enumerate(batch):
+                select = f"SELECT {i} AS k, {', '.join(['date'] + value_columns)} FROM {table}"
+                if lookback_days:
+                    # Rows from the Nth latest date on (everything if there are fewer rows)
+                    select += (f" WHERE date >= COALESCE((SELECT date FROM {table} ORDER BY date DESC "
+                               f"LIMIT 1 OFFSET ?), '')")
+                    params.append(int(lookback_days) - 1)
+                selects.append(select)
+
+            rows = conn.execute(' UNION ALL '.join(selects) + ' ORDER BY k, date', params).fetchall()
+            if not rows:
+                continue
+
+            # Split the stacked result into per-ticker column arrays
+            keys = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            stacked = list(zip(*rows))
+            arrays = {'date': np.array(stacked[1], dtype=object)}
+            for j, name in enumerate(value_columns):
+                arrays[name] = np.array(stacked[2 + j], dtype=float)
+
+            bounds = np.flatnonzero(np.diff(keys)) + 1
+            starts = np.concatenate(([0], bounds))
+            ends = np.concatenate((bounds, [len(keys)]))
+            for lo, hi in zip(starts, ends):
+                ticker = batch[keys[lo]][0]
+                histories[ticker] = {name: arrays[name][lo:hi] for name in columns}
+    finally:
+        if own_conn:
+            conn.close()
+
+    return histories
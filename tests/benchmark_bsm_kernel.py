@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the BSM pricing kernel: price plus all Greeks per contract.
+
+This script times:
+1. The scalar path used by /api/option/price (VIII_Solvers.price_and_greeks)
+2. A reference scalar evaluation through scipy.stats.norm.cdf, as the
+   per-method VIII_Solvers code used to do
+3. The array kernel (bsm_price_greeks) at several batch sizes
+
+and reports the latency per contract for each.
+
+Usage:
+    python tests/benchmark_bsm_kernel.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import norm
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.analysis.Derivative_basics import VIII_Solvers, bsm_price_greeks
+
+BATCH_SIZES = [1, 100, 10_000, 1_000_000]
+
+
+def norm_cdf_reference(S, K, T, r, sigma, q):
+    """Price and Greeks with scipy.stats.norm called per scalar."""
+    sqrt_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + sigma ** 2 / 2) * T) / (sigma * sqrt_T)
+    d2 = d1 - sigma * sqrt_T
+    n_d1 = norm.pdf(d1)
+    call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+    delta = np.exp(-q * T) * norm.cdf(d1)
+    gamma = np.exp(-q * T) * n_d1 / (S * sigma * sqrt_T)
+    vega = S * np.exp(-q * T) * sqrt_T * n_d1
+    theta = (-np.exp(-q * T) * S * n_d1 * sigma / (2 * sqrt_T)
+             + q * S * np.exp(-q * T) * norm.cdf(d1) - r * K * np.exp(-r * T) * norm.cdf(d2))
+    put_theta = (-np.exp(-q * T) * S * n_d1 * sigma / (2 * sqrt_T)
+                 - q * S * np.exp(-q * T) * norm.cdf(-d1) + r * K * np.exp(-r * T) * norm.cdf(-d2))
+    return call, put, delta, gamma, vega, theta, put_theta
+
+
+def per_call_seconds(fn, min_time=0.5):
+    """Best-of-5 seconds per call, auto-scaling the repeat count."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def run_benchmark():
+    print("=" * 80)
+    print("BSM price + Greeks latency per contract")
+    print("=" * 80)
+
+    solver = VIII_Solvers(S0=100.0, K=105.0, T=1.0, r=0.05, sigma=0.2, t=0, q=0.01)
+    fused = per_call_seconds(solver.price_and_greeks)
+    reference = per_call_seconds(lambda: norm_cdf_reference(100.0, 105.0, 1.0, 0.05, 0.2, 0.01))
+
+    print(f"{'scalar fused kernel':<32} {fused * 1e6:>10.2f} us/contract")
+    print(f"{'scalar norm.cdf reference':<32} {reference * 1e6:>10.2f} us/contract "
+          f"({reference / fused:.1f}x slower)")
+    print()
+
+    rng = np.random.default_rng(0)
+    for size in BATCH_SIZES:
+        S = np.full(size, 100.0)
+        K = rng.uniform(50, 150, size)
+        T = rng.uniform(0.05, 2.0, size)
+        sigma = rng.uniform(0.1, 0.6, size)
+        seconds = per_call_seconds(lambda: bsm_price_greeks(S, K, T, 0.05, sigma, 0.01))
+        print(f"{f'array kernel, n={size:,}':<32} {seconds / size * 1e9:>10.1f} ns/contract "
+              f"({seconds * 1e3:.3f} ms/batch)")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark Monte Carlo pricing throughput from 1 to 16 workers.
+
+For each executor and worker count this script:
+1. Prices one contract with a fixed seed and path count
+2. Reports wall time, paths per second and speedup over one worker
+3. Checks that the price is identical to the single-worker result
+
+Usage:
+    python tests/benchmark_monte_carlo_scaling.py [n_paths] [thread|process]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.analysis.monte_carlo import price_european_mc
+
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+SEED = 12345
+
+
+def run_benchmark(n_paths: int, executor: str):
+    print("=" * 80)
+    print(f"Monte Carlo scaling: {n_paths:,} paths, {executor} pool, {os.cpu_count()} CPUs")
+    print("=" * 80)
+    print(f"{'workers':>8} {'time (s)':>10} {'paths/s':>14} {'speedup':>8} {'call price':>14} {'same':>5}")
+
+    baseline_time = None
+    baseline_price = None
+    for workers in WORKER_COUNTS:
+        # Warm the pool so start-up cost is not timed
+        price_european_mc(100, 105, 1, 0.05, 0.2, n_sim=1000, seed=SEED,
+                          workers=workers, executor=executor)
+
+        start = time.perf_counter()
+        result = price_european_mc(100, 105, 1, 0.05, 0.2, n_sim=n_paths, seed=SEED,
+                                   workers=workers, executor=executor)
+        elapsed = time.perf_counter() - start
+
+        if baseline_time is None:
+            baseline_time = elapsed
+            baseline_price = result['call_price']
+
+        print(f"{workers:>8} {elapsed:>10.3f} {result['n_paths'] / elapsed:>14,.0f} "
+              f"{baseline_time / elapsed:>8.2f} {result['call_price']:>14.8f} "
+              f"{'yes' if result['call_price'] == baseline_price else 'NO':>5}")
+
+
+if __name__ == '__main__':
+    n_paths = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    executor = sys.argv[2] if len(sys.argv) > 2 else 'thread'
+    run_benchmark(n_paths, executor)
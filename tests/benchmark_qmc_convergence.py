@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare Monte Carlo convergence of pseudo-random and scrambled Sobol draws.
+
+For each generator and path count this script:
+1. Prices a European call (terminal draws) and an arithmetic Asian call
+   (Brownian-bridge paths for Sobol) over several independent seeds
+2. Reports the RMS error against the reference price and the mean
+   reported standard error
+3. Prints the fitted convergence order (error ~ N^-order)
+
+Usage:
+    python tests/benchmark_qmc_convergence.py [n_seeds]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.analysis.Derivative_basics import bsm_price_greeks
+from src.analysis.monte_carlo import price_european_mc, GENERATORS
+from src.analysis.pricing_engines import path_dependent_mc
+
+S0, K, T, R, SIGMA = 100.0, 105.0, 1.0, 0.05, 0.2
+EUROPEAN_PATHS = [2 ** k for k in range(10, 21, 2)]
+ASIAN_PATHS = [2 ** k for k in range(10, 17, 2)]
+
+
+def convergence_table(name, path_counts, price_fn, reference, n_seeds):
+    print("=" * 80)
+    print(f"{name}: reference {reference:.6f}, {n_seeds} seeds")
+    print("=" * 80)
+    print(f"{'generator':>10} {'paths':>10} {'rms error':>12} {'mean stderr':>12}")
+
+    for generator in GENERATORS:
+        errors = []
+        for n_paths in path_counts:
+            runs = [price_fn(n_paths, generator, seed) for seed in range(n_seeds)]
+            rms = np.sqrt(np.mean([(price - reference) ** 2 for price, _ in runs]))
+            stderr = np.mean([stderr for _, stderr in runs])
+            errors.append(rms)
+            print(f"{generator:>10} {n_paths:>10,} {rms:>12.2e} {stderr:>12.2e}")
+
+        order = -np.polyfit(np.log(path_counts), np.log(errors), 1)[0]
+        print(f"{generator:>10} convergence order: N^-{order:.2f}\n")
+
+
+def european_call(n_paths, generator, seed):
+    result = price_european_mc(S0, K, T, R, SIGMA, n_sim=n_paths, seed=seed,
+                               generator=generator, control_variate=False)
+    return result['call_price'], result['call_stderr']
+
+
+def asian_call(n_paths, generator, seed):
+    result = path_dependent_mc(S0, K, T, R, SIGMA, payoff='asian', n_paths=n_paths,
+                               n_steps=32, seed=seed, generator=generator)
+    return result['call']['price'], result['call']['stderr']
+
+
+if __name__ == '__main__':
+    n_seeds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    european_reference = float(bsm_price_greeks(S0, K, T, R, SIGMA)['call_price'])
+    convergence_table('European call', EUROPEAN_PATHS, european_call, european_reference, n_seeds)
+
+    # Asian reference from a large Sobol run
+    asian_reference = path_dependent_mc(S0, K, T, R, SIGMA, payoff='asian', n_paths=2 ** 20,
+                                        n_steps=32, seed=2024, generator='sobol')['call']['price']
+    convergence_table('Arithmetic Asian call', ASIAN_PATHS, asian_call, asian_reference, n_seeds)